@@ -0,0 +1,336 @@
+"""End-to-end benchmark of the extract -> translate -> render pipeline.
+
+Generates synthetic PDFs across page counts, block densities, scripts and
+image loads, runs each stage against the in-process fake backend, and writes
+a JSON report that can be compared between commits.
+
+Run from ``translator-backend/``::
+
+    python -m benchmarks.pipeline_benchmark --quick
+    python -m benchmarks.pipeline_benchmark --pages 10 100 --scripts latin cjk --baseline old.json
+"""
+import os
+
+# Benchmarks must measure the pipeline, not caches left over from earlier runs
+os.environ.setdefault("TRANSLATION_MEMORY_ENABLED", "false")
+os.environ.setdefault("EXTRACTION_CACHE_PERSIST", "false")
+
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import resource
+import tempfile
+import statistics
+import subprocess
+import itertools
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import fitz
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.pdf_processor import PDFProcessor, shutdown_pdf_executor  # noqa: E402
+from services.translation_backend import FakeBackend  # noqa: E402
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+SAMPLE_TEXT = {
+    "latin": "The parties agree that the supplier shall deliver the goods described in the annex within thirty days "
+             "of the order date, and that payment is due on receipt of a valid invoice.",
+    "devanagari": "दोनों पक्ष सहमत हैं कि आपूर्तिकर्ता आदेश की तारीख से तीस दिनों के भीतर अनुलग्नक में वर्णित माल "
+                  "की आपूर्ति करेगा और वैध चालान प्राप्त होने पर भुगतान देय होगा।",
+    "cjk": "双方同意供应商应在订单日期起三十天内交付附件中所述的货物，并在收到有效发票后支付款项。",
+}
+
+
+def load_font(script: str) -> fitz.Font:
+    if script == "devanagari":
+        return fitz.Font(script=fitz.UCDN_SCRIPT_DEVANAGARI)
+    if script == "cjk":
+        return fitz.Font("cjk")
+    return fitz.Font("helv")
+
+
+def generate_pdf(path: Path, pages: int, blocks_per_page: int, script: str, images_per_page: int, seed: int = 7) -> None:
+    """Write a synthetic document with the given shape"""
+    rng = random.Random(seed)
+    font = load_font(script)
+    words = SAMPLE_TEXT[script].split(" ") if script != "cjk" else list(SAMPLE_TEXT[script])
+    joiner = "" if script == "cjk" else " "
+
+    doc = fitz.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        writer = fitz.TextWriter(page.rect)
+        usable = page.rect.height - 144
+        block_height = usable / max(1, blocks_per_page)
+        for block in range(blocks_per_page):
+            top = 72 + block * block_height
+            lines = max(1, min(3, int(block_height // 14) - 1))
+            for line in range(lines):
+                count = rng.randint(4, 12) if script != "cjk" else rng.randint(10, 30)
+                start = rng.randint(0, max(0, len(words) - count))
+                text = joiner.join(words[start:start + count])
+                writer.append((72, top + 12 + line * 13), text, font=font, fontsize=10)
+        writer.append((page.rect.width / 2, page.rect.height - 40), str(page_number + 1), font=fitz.Font("helv"), fontsize=9)
+        writer.write_text(page)
+
+        for image in range(images_per_page):
+            pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 256, 256), False)
+            pix.set_rect(pix.irect, (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255)))
+            x = 72 + image * 120
+            page.insert_image(fitz.Rect(x, page.rect.height - 200, x + 100, page.rect.height - 100), pixmap=pix)
+
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 2) if samples else 0.0,
+    }
+
+
+class RssSampler:
+    """Tracks peak resident memory of this process and its PDF workers while running"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _rss_of(pid: int) -> int:
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return 0
+
+    def _current(self) -> int:
+        if not Path("/proc").exists():
+            # No procfs; fall back to the lifetime peak reported by the kernel (KB on Linux, bytes on macOS)
+            scale = 1 if sys.platform == "darwin" else 1024
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+        total = self._rss_of(os.getpid())
+        try:
+            children = Path(f"/proc/{os.getpid()}/task/{os.getpid()}/children").read_text().split()
+        except OSError:
+            children = []
+        return total + sum(self._rss_of(int(pid)) for pid in children)
+
+    async def _run(self) -> None:
+        while True:
+            self.peak_bytes = max(self.peak_bytes, self._current())
+            await asyncio.sleep(self.interval)
+
+    def __enter__(self) -> "RssSampler":
+        self.peak_bytes = self._current()
+        self._task = asyncio.ensure_future(self._run())
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+
+async def run_scenario(processor: PDFProcessor, backend: FakeBackend, pdf_path: Path, work_dir: Path,
+                       scenario: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    target_lang = "hi" if scenario["script"] != "devanagari" else "en"
+    extract_samples: List[float] = []
+    translate_page_samples: List[float] = []
+    translate_samples: List[float] = []
+    render_samples: List[float] = []
+    pipeline_samples: List[float] = []
+    calls_per_run: List[int] = []
+    pages = scenario["pages"]
+
+    async def timed_page(page: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        blocks = await processor.translate_page_blocks([dict(block) for block in page["text_blocks"]], "xx", target_lang)
+        translate_page_samples.append(time.perf_counter() - started)
+        return {
+            "page_number": page["page_number"],
+            "text_blocks": [
+                {
+                    "bbox": block["bbox"],
+                    "original_text": block["text"],
+                    "translated_text": block["translated_text"],
+                    "font_info": block["font_info"]
+                }
+                for block in blocks
+            ]
+        }
+
+    with RssSampler() as rss:
+        for run in range(repeat):
+            started = time.perf_counter()
+            extracted = await processor.extract_text_from_pdf(str(pdf_path))
+            extract_samples.append(time.perf_counter() - started)
+            if not extracted["success"]:
+                raise RuntimeError(f"Extraction failed: {extracted.get('error')}")
+
+            calls_before = backend.calls
+            started = time.perf_counter()
+            translated_pages = await asyncio.gather(*(timed_page(page) for page in extracted["pages"]))
+            translate_samples.append(time.perf_counter() - started)
+            calls_per_run.append(backend.calls - calls_before)
+
+            output_path = work_dir / f"{pdf_path.stem}_staged_{run}.pdf"
+            started = time.perf_counter()
+            await processor.create_translated_pdf(str(pdf_path), {"pages": translated_pages}, str(output_path))
+            render_samples.append(time.perf_counter() - started)
+
+            output_path = work_dir / f"{pdf_path.stem}_pipeline_{run}.pdf"
+            started = time.perf_counter()
+            await processor.translate_document(str(pdf_path), str(output_path), "xx", target_lang)
+            pipeline_samples.append(time.perf_counter() - started)
+
+    staged_total = [e + t + r for e, t, r in zip(extract_samples, translate_samples, render_samples)]
+    return {
+        **scenario,
+        "file_bytes": pdf_path.stat().st_size,
+        "pages_per_sec": {
+            "staged": round(pages / statistics.median(staged_total), 2),
+            "pipeline": round(pages / statistics.median(pipeline_samples), 2),
+        },
+        "stages": {
+            "extract": summarize(extract_samples),
+            "translate": summarize(translate_samples),
+            "translate_page": summarize(translate_page_samples),
+            "render": summarize(render_samples),
+            "pipeline": summarize(pipeline_samples),
+        },
+        "llm_calls_per_page": round(statistics.fmean(calls_per_run) / pages, 3) if pages else 0.0,
+        "peak_rss_mb": round(rss.peak_bytes / (1024 * 1024), 1),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: Dict[str, Any], baseline_path: Path) -> None:
+    """Print pipeline throughput and stage p95 against an earlier report"""
+    baseline = json.loads(baseline_path.read_text())
+    previous = {scenario["name"]: scenario for scenario in baseline["scenarios"]}
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('git_commit')}):")
+    for scenario in report["scenarios"]:
+        old = previous.get(scenario["name"])
+        if old is None:
+            continue
+        ratio = scenario["pages_per_sec"]["pipeline"] / max(old["pages_per_sec"]["pipeline"], 1e-9)
+        print(f"  {scenario['name']}: pipeline pages/sec x{ratio:.2f}")
+        for stage, stats in scenario["stages"].items():
+            old_p95 = old["stages"].get(stage, {}).get("p95_ms")
+            if old_p95:
+                print(f"    {stage:<15} p95 {old_p95:>9.1f}ms -> {stats['p95_ms']:>9.1f}ms")
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    backend = FakeBackend(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+    processor = PDFProcessor(backend=backend)
+    processor.memory = None
+
+    scenarios = [
+        {
+            "name": f"{script}-p{pages}-b{blocks}-i{images}",
+            "script": script,
+            "pages": pages,
+            "blocks_per_page": blocks,
+            "images_per_page": images,
+        }
+        for script, pages, blocks, images in itertools.product(args.scripts, args.pages, args.blocks, args.images)
+    ]
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+
+        # Start the worker pool and load the tokenizer outside of any measurement
+        warm_up_path = work_dir / "warm_up.pdf"
+        generate_pdf(warm_up_path, 1, 1, "latin", 0)
+        await processor.extract_text_from_pdf(str(warm_up_path))
+        processor.token_counter.count("warm up")
+
+        for scenario in scenarios:
+            pdf_path = work_dir / f"{scenario['name']}.pdf"
+            generate_pdf(pdf_path, scenario["pages"], scenario["blocks_per_page"], scenario["script"], scenario["images_per_page"])
+            result = await run_scenario(processor, backend, pdf_path, work_dir, scenario, args.repeat)
+            results.append(result)
+            print(
+                f"{scenario['name']:<28} pipeline {result['pages_per_sec']['pipeline']:>8.2f} pages/s  "
+                f"extract p95 {result['stages']['extract']['p95_ms']:>8.1f}ms  "
+                f"render p95 {result['stages']['render']['p95_ms']:>8.1f}ms  "
+                f"calls/page {result['llm_calls_per_page']:.2f}  rss {result['peak_rss_mb']}MB"
+            )
+
+    await backend.close()
+    shutdown_pdf_executor()
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "pymupdf": fitz.VersionBind,
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "repeat": args.repeat,
+        },
+        "scenarios": results,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--blocks", type=int, nargs="+", default=[5, 30], help="text blocks per page")
+    parser.add_argument("--scripts", nargs="+", default=["latin", "devanagari", "cjk"], choices=sorted(SAMPLE_TEXT))
+    parser.add_argument("--images", type=int, nargs="+", default=[0, 2], help="images per page")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="simulated model latency")
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--quick", action="store_true", help="one small scenario per script")
+    parser.add_argument("--output", type=Path, help="report path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, help="earlier report to compare against")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.pages, args.blocks, args.images, args.repeat = [10], [10], [1], 1
+    return args
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    report = asyncio.run(main(arguments))
+
+    output = arguments.output or RESULTS_DIR / f"{report['timestamp'].replace(':', '')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nWrote {output}")
+
+    if arguments.baseline:
+        compare(report, arguments.baseline)
@@ -0,0 +1,191 @@
+"""Cold-start benchmark of the API process.
+
+Starts the app in fresh interpreters, each in an empty working directory,
+and times how long it takes from launch to finish importing ``main``, to run
+the startup hook, to report ready on ``/api/ready``, and to answer a first
+upload and translation against the fake backend. Writes a JSON report that
+can be compared between commits.
+
+Run from ``translator-backend/``::
+
+    python -m benchmarks.startup_benchmark
+    python -m benchmarks.startup_benchmark --runs 10 --no-warm-up --baseline old.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).parent / "results"
+
+MILESTONES = ("imported", "started", "ready", "first_upload", "first_translation")
+
+
+def child() -> None:
+    """Run inside the measured interpreter: print the wall-clock time of each milestone as JSON"""
+    sys.path.insert(0, str(BACKEND_DIR))
+    times: Dict[str, float] = {}
+
+    import main  # noqa: E402
+    times["imported"] = time.time()
+
+    import fitz  # noqa: E402
+    from fastapi.testclient import TestClient  # noqa: E402
+
+    pdf_path = Path("sample.pdf")
+    doc = fitz.open()
+    for page_number in range(2):
+        doc.new_page().insert_text((72, 72), f"Cold start sample page {page_number + 1}", fontsize=12)
+    doc.save(pdf_path)
+    doc.close()
+
+    with TestClient(main.app) as client:
+        times["started"] = time.time()
+        while client.get("/api/ready").status_code != 200:
+            time.sleep(0.005)
+        times["ready"] = time.time()
+
+        with open(pdf_path, "rb") as f:
+            upload = client.post("/api/upload", files={"file": (pdf_path.name, f, "application/pdf")})
+        times["first_upload"] = time.time()
+        response = client.post(
+            "/api/translate", data={"file_id": upload.json()["file_id"], "source_lang": "en", "target_lang": "fr"}
+        )
+        times["first_translation"] = time.time()
+        if response.status_code != 200:
+            raise RuntimeError(f"Translation failed: {response.text}")
+
+    print(json.dumps(times))
+
+
+def run_once(warm_up: bool, latency_ms: float) -> Dict[str, float]:
+    """Seconds from launching a fresh interpreter to each milestone"""
+    env = dict(
+        os.environ,
+        TRANSLATION_BACKEND="fake",
+        FAKE_BACKEND_LATENCY_MS=str(latency_ms),
+        FAKE_BACKEND_JITTER_MS="0",
+        WARM_UP_ON_STARTUP="true" if warm_up else "false",
+    )
+    with tempfile.TemporaryDirectory() as work_dir:
+        launched = time.time()
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup_benchmark", "--child"],
+            cwd=work_dir, env={**env, "PYTHONPATH": str(BACKEND_DIR)}, capture_output=True, text=True
+        )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Benchmark process failed:\n{completed.stderr[-2000:]}")
+    times = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {milestone: times[milestone] - launched for milestone in MILESTONES}
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 1),
+        "p95_ms": round(p95 * 1000, 1),
+        "min_ms": round(ordered[0] * 1000, 1),
+    }
+
+
+def import_profile(top: int) -> List[Dict[str, Any]]:
+    """Slowest top-level imports of ``main``, by cumulative time, from ``python -X importtime``"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, env=dict(os.environ, TRANSLATION_BACKEND="fake"), capture_output=True, text=True
+    )
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit() and name.startswith("   ") and not name.startswith("    "):
+            modules.append({"module": name.strip(), "cumulative_ms": round(int(cumulative) / 1000, 1)})
+    return sorted(modules, key=lambda module: module["cumulative_ms"], reverse=True)[:top]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: Dict[str, Any], baseline_path: Path) -> None:
+    """Print milestone p50 against an earlier report"""
+    baseline = json.loads(baseline_path.read_text())
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('git_commit')}):")
+    for milestone, stats in report["milestones"].items():
+        old_p50 = baseline["milestones"].get(milestone, {}).get("p50_ms")
+        if old_p50:
+            print(f"  {milestone:<18} p50 {old_p50:>8.1f}ms -> {stats['p50_ms']:>8.1f}ms")
+
+
+def main(args: argparse.Namespace) -> Dict[str, Any]:
+    samples: Dict[str, List[float]] = {milestone: [] for milestone in MILESTONES}
+    # The first run also pays for filling the OS file cache, which is not what a cold start measures
+    run_once(not args.no_warm_up, args.latency_ms)
+    for run in range(args.runs):
+        for milestone, seconds in run_once(not args.no_warm_up, args.latency_ms).items():
+            samples[milestone].append(seconds)
+        print(f"run {run + 1}: " + "  ".join(f"{m} {samples[m][-1] * 1000:.0f}ms" for m in MILESTONES))
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "runs": args.runs,
+            "warm_up": not args.no_warm_up,
+            "latency_ms": args.latency_ms,
+            "pdf_workers": os.getenv("PDF_WORKERS"),
+        },
+        "milestones": {milestone: summarize(values) for milestone, values in samples.items()},
+        "slowest_imports": import_profile(args.top_imports),
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-warm-up", action="store_true", help="start with WARM_UP_ON_STARTUP=false")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated model latency")
+    parser.add_argument("--top-imports", type=int, default=10, help="slowest imports to include in the report")
+    parser.add_argument("--output", type=Path, help="report path (default: benchmarks/results/startup-<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, help="earlier report to compare against")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    if arguments.child:
+        child()
+        sys.exit(0)
+
+    report = main(arguments)
+    print("\n" + "\n".join(
+        f"{milestone:<18} p50 {stats['p50_ms']:>8.1f}ms  p95 {stats['p95_ms']:>8.1f}ms"
+        for milestone, stats in report["milestones"].items()
+    ))
+
+    output = arguments.output or RESULTS_DIR / f"startup-{report['timestamp'].replace(':', '')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nWrote {output}")
+
+    if arguments.baseline:
+        compare(report, arguments.baseline)
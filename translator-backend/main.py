@@ -1,13 +1,26 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Query, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+import os
+import time
 import uuid
+import asyncio
+import hashlib
+import json
+import re
 from pathlib import Path
 import logging
 import base64
 import fitz
+import aiofiles
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Tuple
 
-from services.pdf_processor import PDFProcessor
+from services import metrics
+from services.bulk_archive import BULK_MAX_DOCUMENTS, ArchiveError, extract_member, list_pdf_members, write_bundle
+from services.file_index import FILE_GC_INTERVAL_SECONDS, FileIndex
+from services.pdf_processor import RENDER_MODE, RENDER_MODES, PDFProcessor, shutdown_pdf_executor
+from services.job_manager import JobManager, JobQueueFull, TranslationJob
 
 # Configure logging
 logging.basicConfig(
@@ -16,7 +29,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="PDF Translation API", version="2.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global pdf_processor, job_manager, file_index, warm_up_task
+
+    # Services are built here rather than at import so that importing the app stays cheap
+    with metrics.span("startup"):
+        UPLOAD_DIR.mkdir(exist_ok=True)
+        TRANSLATED_DIR.mkdir(exist_ok=True)
+        BULK_DIR.mkdir(exist_ok=True)
+        pdf_processor = PDFProcessor()
+        job_manager = JobManager()
+        file_index = FileIndex()
+        for job_status in ("queued", "running"):
+            metrics.JOBS.labels(job_status).set_function(lambda status=job_status: job_manager.count(status))
+        if await asyncio.to_thread(file_index.count) == 0:
+            await asyncio.to_thread(file_index.import_existing, UPLOAD_DIR, TRANSLATED_DIR)
+
+    gc_task = asyncio.create_task(collect_expired_files())
+    # Requests are served while warming up; /api/ready reports when it has finished
+    warm_up_task = asyncio.create_task(pdf_processor.warm_up()) if WARM_UP_ON_STARTUP else None
+    yield
+    gc_task.cancel()
+    if warm_up_task is not None:
+        warm_up_task.cancel()
+    await pdf_processor.backend.close()
+    shutdown_pdf_executor()
+
+
+app = FastAPI(title="PDF Translation API", version="2.0.0", lifespan=lifespan)
 
 # CORS - Allow all origins and URLs
 app.add_middleware(
@@ -31,10 +73,60 @@ app.add_middleware(
 # Folders
 UPLOAD_DIR = Path("uploads")
 TRANSLATED_DIR = Path("translated")
-UPLOAD_DIR.mkdir(exist_ok=True)
-TRANSLATED_DIR.mkdir(exist_ok=True)
-
-pdf_processor = PDFProcessor()
+BULK_DIR = TRANSLATED_DIR / "bulk"
+
+LANG_DETECT_SAMPLE_PAGES = int(os.getenv("LANG_DETECT_SAMPLE_PAGES", "3"))
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+# Documents of one bulk request translated at the same time; their lines share model requests
+BULK_MAX_CONCURRENT_DOCUMENTS = int(os.getenv("BULK_MAX_CONCURRENT_DOCUMENTS", "8"))
+MAX_TARGET_LANGUAGES = int(os.getenv("MAX_TARGET_LANGUAGES", "10"))
+# Language codes end up in file names, so only plain codes like "fr" or "zh-TW" are accepted
+LANG_CODE = re.compile(r"^[A-Za-z]{2,3}(-[A-Za-z0-9]{2,8})?$")
+
+# Most pages rendered by one preview request, and the zoom range accepted
+PREVIEW_MAX_PAGES = int(os.getenv("PREVIEW_MAX_PAGES", "20"))
+PREVIEW_MIN_ZOOM = 0.25
+PREVIEW_MAX_ZOOM = 4.0
+PREVIEW_VARIANTS = ("original", "translated")
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+# Created by lifespan on startup
+pdf_processor: Optional[PDFProcessor] = None
+job_manager: Optional[JobManager] = None
+file_index: Optional[FileIndex] = None
+warm_up_task: Optional[asyncio.Task] = None
+
+
+def forget_file(file_id: str) -> None:
+    """Drop data derived from a deleted upload"""
+    pdf_processor.extraction_cache.invalidate(file_id)
+    pdf_processor.previews.invalidate(file_id)
+
+
+async def collect_expired_files() -> None:
+    """Periodically delete uploads and outputs past the retention period"""
+    while True:
+        try:
+            await asyncio.to_thread(
+                file_index.sweep, UPLOAD_DIR, TRANSLATED_DIR,
+                on_delete=forget_file,
+                keep=job_manager.active_file_ids()
+            )
+            await asyncio.to_thread(expire_bulk_bundles)
+        except Exception as e:
+            logger.error(f"File retention sweep failed: {e}")
+        await asyncio.sleep(FILE_GC_INTERVAL_SECONDS)
+
+
+def expire_bulk_bundles() -> None:
+    """Delete bulk result archives older than the retention period"""
+    if file_index.retention_hours <= 0:
+        return
+    cutoff = time.time() - file_index.retention_hours * 3600
+    # Archives of bulk jobs interrupted by a restart are left behind as .zip.part
+    for path in [*BULK_DIR.glob("*.zip"), *BULK_DIR.glob("*.zip.part")]:
+        if path.stat().st_mtime < cutoff:
+            path.unlink(missing_ok=True)
 
 
 @app.get("/api/health")
@@ -42,25 +134,139 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/api/ready")
+async def readiness_check():
+    """Whether startup and warm-up have finished, for load balancers to route traffic on"""
+    if pdf_processor is None or (warm_up_task is not None and not warm_up_task.done()):
+        return JSONResponse({"status": "starting"}, status_code=503)
+    return {"status": "ready"}
+
+
+@app.get("/api/cache/stats")
+async def translation_memory_stats():
+    """Translation memory size and hit rates"""
+    if pdf_processor.memory is None:
+        return {"enabled": False}
+    return {"enabled": True, **pdf_processor.memory.stats()}
+
+
+@app.get("/api/metrics")
+async def prometheus_metrics():
+    """Stage timings, model usage, cache hit and in-flight metrics in Prometheus text format"""
+    return Response(content=metrics.render_latest(), media_type=metrics.CONTENT_TYPE_LATEST)
+
+
 @app.get("/api/files")
-async def list_files():
-    """List all uploaded files and their translation status"""
+async def list_files(offset: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=500)):
+    """List uploaded files and their translation status, newest first"""
+    stored_files, total = await asyncio.to_thread(file_index.list, offset, limit)
+
     files = []
-    
-    for upload_file in UPLOAD_DIR.glob("*_*.pdf"):
-        file_id = upload_file.name.split("_")[0]
-        original_name = upload_file.name.replace(f"{file_id}_", "")
-        translated_file = TRANSLATED_DIR / f"{file_id}_translated.pdf"
-        
+    for stored in stored_files:
+        file_id = stored["file_id"]
+        translated_filename = f"{file_id}_translated.pdf"
+        translated_exists = translated_filename in stored["artifacts"]
         files.append({
             "file_id": file_id,
-            "original_name": original_name,
-            "upload_path": str(upload_file),
-            "translated_exists": translated_file.exists(),
-            "translated_path": str(translated_file) if translated_file.exists() else None
+            "original_name": stored["original_name"],
+            "upload_path": str(UPLOAD_DIR / stored["upload_filename"]),
+            "content_hash": stored["content_hash"],
+            "pages": stored["page_count"],
+            "detected_language": stored["detected_language"],
+            "uploaded_at": stored["created_at"],
+            "translated_exists": translated_exists,
+            "translated_path": str(TRANSLATED_DIR / translated_filename) if translated_exists else None,
+            "translations": [
+                {"target_lang": lang, "output_filename": filename} for filename, lang in stored["artifacts"].items()
+            ]
         })
-    
-    return {"files": files, "total": len(files)}
+
+    return {"files": files, "total": total, "offset": offset, "limit": limit}
+
+
+async def stream_to_disk(file: UploadFile, path: Path) -> Tuple[str, int]:
+    """Write an upload to ``path`` in chunks, returning its SHA-256 and size.
+
+    Streaming and hashing on the way keeps large uploads out of memory.
+    """
+    digest = hashlib.sha256()
+    size_bytes = 0
+    try:
+        async with aiofiles.open(path, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                digest.update(chunk)
+                size_bytes += len(chunk)
+                await f.write(chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return digest.hexdigest(), size_bytes
+
+
+async def register_upload(file_id: str, original_name: str, partial_path: Path, content_hash: str,
+                          size_bytes: int) -> Dict[str, Any]:
+    """Index a PDF written to ``partial_path`` and detect its language.
+
+    If a file with the same content was uploaded before, the new copy is
+    discarded and the earlier file_id returned with its outputs.
+    """
+    existing = await asyncio.to_thread(file_index.find_by_hash, content_hash)
+    if existing is not None and (UPLOAD_DIR / existing["upload_filename"]).exists():
+        partial_path.unlink(missing_ok=True)
+        await asyncio.to_thread(file_index.touch, existing["file_id"])
+        logger.info(f"Upload of {original_name} matches {existing['file_id']}, reusing it")
+        return {
+            "file_id": existing["file_id"],
+            "filename": existing["upload_filename"],
+            "detected_language": existing["detected_language"],
+            "pages": existing["page_count"],
+            "deduplicated": True,
+            "translations": [
+                {"target_lang": lang, "output_filename": output_filename}
+                for output_filename, lang in existing["artifacts"].items()
+            ],
+            "message": "Upload successful"
+        }
+
+    filename = f"{file_id}_{original_name}"
+    file_path = UPLOAD_DIR / filename
+    os.replace(partial_path, file_path)
+    await asyncio.to_thread(
+        file_index.add, file_id, original_name, filename, content_hash=content_hash, size_bytes=size_bytes
+    )
+
+    try:
+        # Only a few leading pages are needed for detection; the rest is parsed on translate
+        extracted = await pdf_processor.extract_text_from_pdf(
+            str(file_path), page_limit=LANG_DETECT_SAMPLE_PAGES, cache_key=file_id
+        )
+        if not extracted["success"]:
+            raise HTTPException(status_code=400, detail="Failed to process PDF")
+
+        sample_text = pdf_processor.sample_text(extracted["pages"])
+        detected_lang = await pdf_processor.detect_language(sample_text)
+        await asyncio.to_thread(
+            file_index.update, file_id, page_count=extracted["page_count"], detected_language=detected_lang
+        )
+    except BaseException as e:
+        # A broken upload must not stay listed, or be matched by hash when the same bytes are sent again
+        file_path.unlink(missing_ok=True)
+        await asyncio.to_thread(file_index.delete, file_id)
+        forget_file(file_id)
+        if isinstance(e, Exception) and not isinstance(e, HTTPException):
+            logger.error(f"Processing upload {original_name} failed: {e}")
+            raise HTTPException(status_code=400, detail="Failed to process PDF")
+        raise
+
+    return {
+        "file_id": file_id,
+        "filename": filename,
+        "detected_language": detected_lang,
+        "pages": extracted["page_count"],
+        "deduplicated": False,
+        "translations": [],
+        "message": "Upload successful"
+    }
 
 
 @app.post("/api/upload")
@@ -69,131 +275,622 @@ async def upload_pdf(file: UploadFile = File(...)):
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files allowed")
 
-    contents = await file.read()
     file_id = str(uuid.uuid4())
-    filename = f"{file_id}_{file.filename}"
-    file_path = UPLOAD_DIR / filename
+    partial_path = UPLOAD_DIR / f"{file_id}_{file.filename}.part"
+    with metrics.span("upload", file_id=file_id):
+        content_hash, size_bytes = await stream_to_disk(file, partial_path)
 
-    with open(file_path, "wb") as f:
-        f.write(contents)
+    return JSONResponse(await register_upload(file_id, file.filename, partial_path, content_hash, size_bytes))
 
-    extracted = await pdf_processor.extract_text_from_pdf(str(file_path))
-    if not extracted["success"]:
-        raise HTTPException(status_code=400, detail="Failed to process PDF")
 
-    first_text = ""
-    if extracted["pages"]:
-        for block in extracted["pages"][0]["text_blocks"]:
-            first_text += block["text"] + " "
+def check_render_mode(render_mode: Optional[str]) -> None:
+    if render_mode is not None and render_mode not in RENDER_MODES:
+        raise HTTPException(status_code=400, detail=f"render_mode must be one of: {', '.join(RENDER_MODES)}")
 
-    detected_lang = await pdf_processor.detect_language(first_text)
 
-    return JSONResponse({
-        "file_id": file_id,
-        "filename": filename,
-        "detected_language": detected_lang,
-        "pages": len(extracted["pages"]),
-        "message": "Upload successful"
-    })
+def check_lang_code(lang: str) -> None:
+    if not LANG_CODE.match(lang):
+        raise HTTPException(status_code=400, detail=f"Invalid language code: {lang}")
 
 
-@app.post("/api/translate")
-async def translate_pdf(file_id: str = Form(...), source_lang: str = Form(...), target_lang: str = Form(...)):
-    """Translate uploaded PDF"""
-    matches = list(UPLOAD_DIR.glob(f"{file_id}_*"))
-    if not matches:
+async def check_base_file(base_file_id: Optional[str]) -> None:
+    """Reject a ``base_file_id`` that does not name an indexed upload"""
+    if base_file_id and await asyncio.to_thread(file_index.get, base_file_id) is None:
+        raise HTTPException(status_code=404, detail="Base file not found")
+
+
+async def upload_path(file_id: str) -> Optional[Path]:
+    """Uploaded file of ``file_id``, or None if it is unknown or has been deleted"""
+    stored = await asyncio.to_thread(file_index.get, file_id)
+    if stored is None:
+        return None
+    path = UPLOAD_DIR / stored["upload_filename"]
+    return path if path.exists() else None
+
+
+async def find_upload(file_id: str) -> Path:
+    """Uploaded file to translate, marked as used so retention keeps it"""
+    path = await upload_path(file_id)
+    if path is None:
         raise HTTPException(status_code=404, detail="File not found")
+    await asyncio.to_thread(file_index.touch, file_id)
+    return path
 
-    original_file = matches[0]
-    logger.info(f"Starting translation: {source_lang} -> {target_lang} for file {original_file.name}")
-    
-    extracted = await pdf_processor.extract_text_from_pdf(str(original_file))
-    if not extracted["success"]:
-        raise HTTPException(status_code=400, detail="Failed to extract PDF")
 
-    total_blocks = sum(len(page["text_blocks"]) for page in extracted["pages"])
-    logger.info(f"Extracted {len(extracted['pages'])} pages with {total_blocks} text blocks")
+async def run_translation(file_id: str, original_file: Path, source_lang: str, target_lang: str,
+                          job: Optional[TranslationJob] = None, base_file_id: Optional[str] = None,
+                          render_mode: Optional[str] = None) -> Dict[str, Any]:
+    """Extract, translate and render one document, reporting progress to ``job`` if given.
 
-    translated_data = {"pages": []}
-    processed_pages = 0
-    
-    for page in extracted["pages"]:
-        processed_pages += 1
-        page_blocks = page["text_blocks"]
-        
-        logger.info(f"Translating page {processed_pages}/{len(extracted['pages'])} with {len(page_blocks)} blocks")
-        
-        # Translate entire page at once
-        translated_blocks = await pdf_processor.translate_page_blocks(page_blocks, source_lang, target_lang)
-        
-        # Prepare translated page data
-        translated_page = {
-            "page_number": page["page_number"], 
-            "text_blocks": [],
-            "images": page.get("images", [])
-        }
-        
-        for block in translated_blocks:
-            translated_page["text_blocks"].append({
-                "bbox": block["bbox"],
-                "original_text": block["text"],
-                "translated_text": block["translated_text"],
-                "font_info": block["font_info"]
-            })
-            
-        translated_data["pages"].append(translated_page)
-        logger.info(f"Page {processed_pages} translation completed")
+    ``base_file_id`` names an earlier upload this one revises; without it a
+    matching earlier translation is looked up by page fingerprints.
+    ``render_mode`` defaults to ``RENDER_MODE``.
+    """
+    logger.info(f"Starting translation: {source_lang} -> {target_lang} for file {original_file.name}")
 
     output_filename = f"{file_id}_translated.pdf"
     output_path = TRANSLATED_DIR / output_filename
-    
-    logger.info(f"Creating translated PDF: {output_path}")
-    success = await pdf_processor.create_translated_pdf(str(original_file), translated_data, str(output_path))
 
-    if not success:
+    if job is not None:
+        job.set_stage("extracting")
+    try:
+        with metrics.span("document", file_id=file_id, target_lang=target_lang):
+            summary = await pdf_processor.translate_document(
+                str(original_file), str(output_path), source_lang, target_lang,
+                cache_key=file_id,
+                on_page_count=(lambda count: job.set_stage("translating", pages_total=count)) if job is not None else None,
+                on_page_done=job.page_done if job is not None else None,
+                base_file_id=base_file_id,
+                render_mode=render_mode or RENDER_MODE
+            )
+    except fitz.FileDataError as e:
+        logger.error(f"Translation pipeline failed: {e}")
+        raise HTTPException(status_code=400, detail="Failed to extract PDF")
+
+    if not summary["success"]:
         logger.error("Failed to create translated PDF")
         raise HTTPException(status_code=500, detail="Failed to create translated PDF")
 
+    await asyncio.to_thread(file_index.add_artifact, file_id, target_lang, output_filename)
     logger.info(f"Translation completed successfully: {output_filename}")
     return {
         "success": True, 
         "output_filename": output_filename,
-        "total_blocks": total_blocks,
-        "pages": len(extracted["pages"]),
-        "processing_method": "page-by-page"
+        "total_blocks": summary["total_blocks"],
+        "reused_blocks": summary["reused_blocks"],
+        "revision_of": summary["revision_of"],
+        "pages": summary["pages"],
+        "processing_method": "streaming"
+    }
+
+
+def parse_target_langs(target_langs: str) -> List[str]:
+    """Split a comma-separated list of language codes, dropping duplicates"""
+    langs = list(dict.fromkeys(lang.strip() for lang in target_langs.split(",") if lang.strip()))
+    if not langs:
+        raise HTTPException(status_code=400, detail="target_langs must name at least one language")
+    for lang in langs:
+        check_lang_code(lang)
+    if len(langs) > MAX_TARGET_LANGUAGES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_TARGET_LANGUAGES} target languages per request")
+    return langs
+
+
+async def run_multi_translation(file_id: str, original_file: Path, source_lang: str, target_langs: List[str],
+                                job: Optional[TranslationJob] = None, base_file_id: Optional[str] = None,
+                                render_mode: Optional[str] = None) -> Dict[str, Any]:
+    """Extract one document once and translate it into every language in ``target_langs``"""
+    logger.info(f"Starting translation: {source_lang} -> {', '.join(target_langs)} for file {original_file.name}")
+
+    output_filenames = {lang: f"{file_id}_translated_{lang}.pdf" for lang in target_langs}
+    if job is not None:
+        job.set_stage("extracting")
+    try:
+        with metrics.span("document", file_id=file_id, target_lang=",".join(target_langs)):
+            summary = await pdf_processor.translate_document_targets(
+                str(original_file),
+                {lang: str(TRANSLATED_DIR / filename) for lang, filename in output_filenames.items()},
+                source_lang,
+                cache_key=file_id,
+                on_page_count=(
+                    lambda count: job.set_stage("translating", pages_total=count * len(target_langs))
+                ) if job is not None else None,
+                on_page_done=(lambda _, page_number: job.page_done(page_number)) if job is not None else None,
+                base_file_id=base_file_id,
+                render_mode=render_mode or RENDER_MODE
+            )
+    except fitz.FileDataError as e:
+        logger.error(f"Translation pipeline failed: {e}")
+        raise HTTPException(status_code=400, detail="Failed to extract PDF")
+
+    outputs = {
+        lang: {
+            "success": target["success"],
+            "output_filename": output_filenames[lang] if target["success"] else None,
+            "total_blocks": target["total_blocks"],
+            "reused_blocks": target["reused_blocks"],
+            "revision_of": target["revision_of"]
+        }
+        for lang, target in summary["targets"].items()
     }
+    if not any(output["success"] for output in outputs.values()):
+        logger.error("Failed to create any translated PDF")
+        raise HTTPException(status_code=500, detail="Failed to create translated PDF")
+
+    for lang, output in outputs.items():
+        if output["success"]:
+            await asyncio.to_thread(file_index.add_artifact, file_id, lang, output["output_filename"])
+    logger.info(f"Translation completed: {', '.join(lang for lang, output in outputs.items() if output['success'])}")
+    return {
+        "success": all(output["success"] for output in outputs.values()),
+        "outputs": outputs,
+        "pages": summary["pages"],
+        "processing_method": "streaming"
+    }
+
+
+@app.post("/api/translate")
+async def translate_pdf(file_id: str = Form(...), source_lang: str = Form(...), target_lang: str = Form(...),
+                        base_file_id: Optional[str] = Form(None), render_mode: Optional[str] = Form(None)):
+    """Translate uploaded PDF"""
+    check_render_mode(render_mode)
+    check_lang_code(source_lang)
+    check_lang_code(target_lang)
+    await check_base_file(base_file_id)
+    original_file = await find_upload(file_id)
+    return await run_translation(
+        file_id, original_file, source_lang, target_lang, base_file_id=base_file_id, render_mode=render_mode
+    )
+
+
+@app.post("/api/translate/multi")
+async def translate_pdf_multi(file_id: str = Form(...), source_lang: str = Form(...), target_langs: str = Form(...),
+                              base_file_id: Optional[str] = Form(None), render_mode: Optional[str] = Form(None)):
+    """Translate uploaded PDF into several languages with one extraction"""
+    check_render_mode(render_mode)
+    check_lang_code(source_lang)
+    langs = parse_target_langs(target_langs)
+    await check_base_file(base_file_id)
+    original_file = await find_upload(file_id)
+    return await run_multi_translation(
+        file_id, original_file, source_lang, langs, base_file_id=base_file_id, render_mode=render_mode
+    )
+
+
+@app.post("/api/jobs", status_code=202)
+async def submit_translation_job(file_id: str = Form(...), source_lang: str = Form(...), target_lang: str = Form(...),
+                                 base_file_id: Optional[str] = Form(None), render_mode: Optional[str] = Form(None)):
+    """Queue a translation job and return its id immediately"""
+    check_render_mode(render_mode)
+    check_lang_code(source_lang)
+    check_lang_code(target_lang)
+    await check_base_file(base_file_id)
+    original_file = await find_upload(file_id)
+
+    async def runner(job: TranslationJob) -> Dict[str, Any]:
+        return await run_translation(file_id, original_file, source_lang, target_lang, job, base_file_id, render_mode)
+
+    try:
+        job = job_manager.submit(file_id, {"source_lang": source_lang, "target_lang": target_lang, "render_mode": render_mode or RENDER_MODE}, runner)
+    except JobQueueFull:
+        raise HTTPException(status_code=429, detail="Too many translation jobs pending. Please retry later.")
+
+    return job.snapshot()
+
+
+@app.post("/api/jobs/multi", status_code=202)
+async def submit_multi_translation_job(file_id: str = Form(...), source_lang: str = Form(...),
+                                       target_langs: str = Form(...), base_file_id: Optional[str] = Form(None),
+                                       render_mode: Optional[str] = Form(None)):
+    """Queue one job translating a document into several languages"""
+    check_render_mode(render_mode)
+    check_lang_code(source_lang)
+    langs = parse_target_langs(target_langs)
+    await check_base_file(base_file_id)
+    original_file = await find_upload(file_id)
+
+    async def runner(job: TranslationJob) -> Dict[str, Any]:
+        return await run_multi_translation(file_id, original_file, source_lang, langs, job, base_file_id, render_mode)
+
+    params = {"source_lang": source_lang, "target_langs": langs, "render_mode": render_mode or RENDER_MODE}
+    try:
+        job = job_manager.submit(file_id, params, runner)
+    except JobQueueFull:
+        raise HTTPException(status_code=429, detail="Too many translation jobs pending. Please retry later.")
+
+    return job.snapshot()
+
+
+async def ingest_archive(archive_path: Path) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """Register every PDF in a ZIP archive as an upload; returns their file_ids and the members that failed"""
+    try:
+        members = await asyncio.to_thread(list_pdf_members, archive_path)
+    except ArchiveError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    semaphore = asyncio.Semaphore(BULK_MAX_CONCURRENT_DOCUMENTS)
+
+    async def ingest_one(member: str) -> Dict[str, Any]:
+        original_name = Path(member).name
+        file_id = str(uuid.uuid4())
+        partial_path = UPLOAD_DIR / f"{file_id}_{original_name}.part"
+        async with semaphore:
+            try:
+                content_hash, size_bytes = await asyncio.to_thread(extract_member, archive_path, member, partial_path)
+                registered = await register_upload(file_id, original_name, partial_path, content_hash, size_bytes)
+                return {"file_id": registered["file_id"]}
+            except Exception as e:
+                # register_upload removes the upload and its index row itself once it has moved the file
+                partial_path.unlink(missing_ok=True)
+                return {"name": member, "error": getattr(e, "detail", None) or str(e)}
+
+    results = await asyncio.gather(*(ingest_one(member) for member in members))
+    return [result["file_id"] for result in results if "file_id" in result], [r for r in results if "error" in r]
+
+
+async def run_bulk_translation(bulk_id: str, file_ids: List[str], source_lang: str, target_lang: str,
+                               archive_path: Optional[Path] = None, job: Optional[TranslationJob] = None,
+                               render_mode: Optional[str] = None) -> Dict[str, Any]:
+    """Translate many documents as one workload and bundle the outputs with a manifest.
+
+    PDFs in ``archive_path`` are registered as uploads first. Up to
+    ``BULK_MAX_CONCURRENT_DOCUMENTS`` documents run at once, largest first, so
+    their lines are coalesced into shared model requests by the batcher.
+    ``source_lang`` may be ``auto`` to use each document's detected language.
+    A failed document is reported in the manifest without stopping the rest.
+    """
+    started = time.perf_counter()
+    requests_before = pdf_processor.batcher.requests_sent
+    failures: List[Dict[str, Any]] = []
+
+    if job is not None:
+        job.set_stage("extracting")
+    if archive_path is not None:
+        try:
+            archive_ids, failures = await ingest_archive(archive_path)
+        finally:
+            archive_path.unlink(missing_ok=True)
+        file_ids = list(dict.fromkeys(file_ids + archive_ids))
+        if job is not None:
+            job.file_ids.update(archive_ids)
+
+    documents = []
+    for file_id in file_ids:
+        stored = await asyncio.to_thread(file_index.get, file_id)
+        if stored is None or not (UPLOAD_DIR / stored["upload_filename"]).exists():
+            failures.append({"file_id": file_id, "error": "File not found"})
+            continue
+        await asyncio.to_thread(file_index.touch, file_id)
+        documents.append(stored)
+    if not documents:
+        raise HTTPException(status_code=400, detail="No documents to translate")
+
+    # Longest documents first, so they are not left running alone at the end
+    documents.sort(key=lambda stored: stored["page_count"] or 0, reverse=True)
+    if job is not None:
+        job.set_stage("translating", pages_total=sum(stored["page_count"] or 0 for stored in documents))
+    semaphore = asyncio.Semaphore(BULK_MAX_CONCURRENT_DOCUMENTS)
+
+    async def translate_one(stored: Dict[str, Any]) -> Dict[str, Any]:
+        file_id = stored["file_id"]
+        document_source = (stored["detected_language"] or "en") if source_lang == "auto" else source_lang
+        output_filename = translated_path(file_id, target_lang).name
+        entry = {
+            "file_id": file_id,
+            "original_name": stored["original_name"],
+            "source_lang": document_source,
+            "success": False,
+            "output_filename": None,
+            "pages": stored["page_count"],
+            "total_blocks": 0,
+            "reused_blocks": 0,
+            "seconds": 0.0,
+            "error": None
+        }
+        async with semaphore:
+            document_started = time.perf_counter()
+            try:
+                with metrics.span("document", file_id=file_id, target_lang=target_lang):
+                    summary = await pdf_processor.translate_document(
+                        str(UPLOAD_DIR / stored["upload_filename"]), str(TRANSLATED_DIR / output_filename),
+                        document_source, target_lang,
+                        cache_key=file_id,
+                        on_page_done=job.page_done if job is not None else None,
+                        render_mode=render_mode or RENDER_MODE
+                    )
+                entry.update(
+                    success=summary["success"], pages=summary["pages"], total_blocks=summary["total_blocks"],
+                    reused_blocks=summary["reused_blocks"]
+                )
+                if summary["success"]:
+                    entry["output_filename"] = output_filename
+                    await asyncio.to_thread(file_index.add_artifact, file_id, target_lang, output_filename)
+                else:
+                    entry["error"] = "Failed to create translated PDF"
+            except Exception as e:
+                logger.error(f"Bulk translation of {file_id} failed: {e}")
+                entry["error"] = str(e)
+            entry["seconds"] = round(time.perf_counter() - document_started, 3)
+        return entry
+
+    entries = await asyncio.gather(*(translate_one(stored) for stored in documents))
+
+    # Name outputs after their originals, keeping names unique inside the archive
+    bundle_files: Dict[str, Path] = {}
+    for entry in entries:
+        if entry["success"]:
+            stem = Path(entry["original_name"]).stem
+            name = f"translated_{stem}.pdf"
+            counter = 1
+            while name in bundle_files:
+                counter += 1
+                name = f"translated_{stem}_{counter}.pdf"
+            bundle_files[name] = TRANSLATED_DIR / entry["output_filename"]
+            entry["archive_name"] = name
+
+    elapsed = time.perf_counter() - started
+    succeeded = [entry for entry in entries if entry["success"]]
+    pages = sum(entry["pages"] or 0 for entry in succeeded)
+    manifest = {
+        "bulk_id": bulk_id,
+        "source_lang": source_lang,
+        "target_lang": target_lang,
+        "documents": entries,
+        "failed": failures,
+        "throughput": {
+            "documents": len(entries),
+            "succeeded": len(succeeded),
+            "failed": len(entries) - len(succeeded) + len(failures),
+            "pages": pages,
+            "blocks": sum(entry["total_blocks"] for entry in succeeded),
+            "seconds": round(elapsed, 3),
+            "pages_per_sec": round(pages / elapsed, 2) if elapsed else 0.0,
+            "documents_per_min": round(len(succeeded) * 60 / elapsed, 2) if elapsed else 0.0,
+            # Counts every request sent meanwhile, including other clients' translations
+            "model_requests": pdf_processor.batcher.requests_sent - requests_before
+        }
+    }
+
+    archive_filename = f"{bulk_id}.zip"
+    await asyncio.to_thread(write_bundle, BULK_DIR / archive_filename, bundle_files, manifest)
+    logger.info(
+        f"Bulk translation {bulk_id}: {len(succeeded)}/{len(entries)} documents, "
+        f"{manifest['throughput']['pages_per_sec']} pages/s"
+    )
+    return {
+        "success": bool(succeeded) and not manifest["throughput"]["failed"],
+        "bulk_id": bulk_id,
+        "archive_filename": archive_filename,
+        "download_url": f"/api/bulk/{bulk_id}/download",
+        "manifest": manifest
+    }
+
+
+async def prepare_bulk(bulk_id: str, file_ids: Optional[str], archive: Optional[UploadFile]) -> Tuple[List[str], Optional[Path]]:
+    """Validate a bulk request's file_ids and store its archive, if any, for ``run_bulk_translation``"""
+    ids = list(dict.fromkeys(file_id.strip() for file_id in (file_ids or "").split(",") if file_id.strip()))
+    if len(ids) > BULK_MAX_DOCUMENTS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_DOCUMENTS} documents per request")
+    if archive is None or not archive.filename:
+        if not ids:
+            raise HTTPException(status_code=400, detail="Send file_ids, a ZIP archive of PDFs, or both")
+        return ids, None
+
+    if not archive.filename.lower().endswith(".zip"):
+        raise HTTPException(status_code=400, detail="Only ZIP archives allowed")
+    archive_path = BULK_DIR / f"{bulk_id}_archive.zip.part"
+    with metrics.span("upload", file_id=bulk_id):
+        await stream_to_disk(archive, archive_path)
+    return ids, archive_path
+
+
+@app.post("/api/bulk")
+async def translate_bulk(target_lang: str = Form(...), source_lang: str = Form("auto"),
+                         file_ids: Optional[str] = Form(None), archive: Optional[UploadFile] = File(None),
+                         render_mode: Optional[str] = Form(None)):
+    """Translate many documents, given as file_ids and/or a ZIP of PDFs, into one archive"""
+    check_render_mode(render_mode)
+    check_lang_code(target_lang)
+    if source_lang != "auto":
+        check_lang_code(source_lang)
+    bulk_id = str(uuid.uuid4())
+    ids, archive_path = await prepare_bulk(bulk_id, file_ids, archive)
+    return await run_bulk_translation(bulk_id, ids, source_lang, target_lang, archive_path, render_mode=render_mode)
+
+
+@app.post("/api/jobs/bulk", status_code=202)
+async def submit_bulk_translation_job(target_lang: str = Form(...), source_lang: str = Form("auto"),
+                                      file_ids: Optional[str] = Form(None), archive: Optional[UploadFile] = File(None),
+                                      render_mode: Optional[str] = Form(None)):
+    """Queue a bulk translation; the archive is unpacked and registered by the job"""
+    check_render_mode(render_mode)
+    check_lang_code(target_lang)
+    if source_lang != "auto":
+        check_lang_code(source_lang)
+    bulk_id = str(uuid.uuid4())
+    ids, archive_path = await prepare_bulk(bulk_id, file_ids, archive)
+
+    async def runner(job: TranslationJob) -> Dict[str, Any]:
+        return await run_bulk_translation(bulk_id, ids, source_lang, target_lang, archive_path, job, render_mode)
+
+    def remove_archive(_: TranslationJob) -> None:
+        # The runner deletes the archive itself, but never runs for a job cancelled while queued
+        if archive_path is not None:
+            archive_path.unlink(missing_ok=True)
+
+    params = {"source_lang": source_lang, "target_lang": target_lang, "render_mode": render_mode or RENDER_MODE}
+    try:
+        job = job_manager.submit(bulk_id, params, runner, file_ids=ids, on_finish=remove_archive)
+    except JobQueueFull:
+        if archive_path is not None:
+            archive_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=429, detail="Too many translation jobs pending. Please retry later.")
+
+    return job.snapshot()
+
+
+@app.get("/api/bulk/{bulk_id}/download")
+async def download_bulk_translation(bulk_id: str):
+    """Download the ZIP of translated PDFs and manifest of a bulk translation"""
+    try:
+        uuid.UUID(bulk_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Bulk translation not found")
+    bundle_path = BULK_DIR / f"{bulk_id}.zip"
+    if not bundle_path.exists():
+        raise HTTPException(status_code=404, detail="Bulk translation not found")
+    return FileResponse(path=bundle_path, filename=f"translated_{bulk_id}.zip", media_type="application/zip")
+
+
+def get_job_or_404(job_id: str) -> TranslationJob:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_translation_job(job_id: str):
+    """Current status and per-page progress of a job"""
+    return get_job_or_404(job_id).snapshot()
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_translation_job(job_id: str):
+    """Stream job progress as server-sent events until the job finishes"""
+    job = get_job_or_404(job_id)
+
+    async def event_stream():
+        async for snapshot in job.events():
+            yield f"event: progress\ndata: {json.dumps(snapshot)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_translation_job(job_id: str):
+    """Cancel a queued or running job"""
+    job = get_job_or_404(job_id)
+    if not job_manager.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+    return {"job_id": job_id, "cancelled": True}
 
 
 @app.get("/api/preview/{file_id}/original")
 async def preview_original_pdf(file_id: str):
     """Preview original PDF"""
-    matches = list(UPLOAD_DIR.glob(f"{file_id}_*"))
-    if not matches:
+    path = await upload_path(file_id)
+    if path is None:
         raise HTTPException(status_code=404, detail="Original file not found")
-    return FileResponse(path=matches[0], media_type="application/pdf")
+    return FileResponse(path=path, media_type="application/pdf")
+
+
+def translated_path(file_id: str, lang: Optional[str] = None) -> Path:
+    """Output of ``/api/translate``, or of one language of ``/api/translate/multi`` when ``lang`` is given"""
+    if lang:
+        check_lang_code(lang)
+        return TRANSLATED_DIR / f"{file_id}_translated_{lang}.pdf"
+    return TRANSLATED_DIR / f"{file_id}_translated.pdf"
 
 
 @app.get("/api/preview/{file_id}/translated")
-async def preview_translated_pdf(file_id: str):
+async def preview_translated_pdf(file_id: str, lang: Optional[str] = None):
     """Preview translated PDF"""
-    file_path = TRANSLATED_DIR / f"{file_id}_translated.pdf"
+    file_path = translated_path(file_id, lang)
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="Translated file not found. Please translate the document first.")
     return FileResponse(path=file_path, media_type="application/pdf")
 
 
+async def preview_source(file_id: str, variant: str, lang: Optional[str]) -> Tuple[Path, str]:
+    """PDF shown by a page preview and the cache variant its images are stored under"""
+    if variant not in PREVIEW_VARIANTS:
+        raise HTTPException(status_code=400, detail=f"variant must be one of: {', '.join(PREVIEW_VARIANTS)}")
+    if variant == "original":
+        path = await upload_path(file_id)
+        if path is None:
+            raise HTTPException(status_code=404, detail="Original file not found")
+        return path, variant
+    path = translated_path(file_id, lang)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Translated file not found. Please translate the document first.")
+    return path, f"translated_{lang}" if lang else variant
+
+
+@app.get("/api/preview/{file_id}/pages")
+async def preview_pages(file_id: str, variant: str = "original", lang: Optional[str] = None,
+                        start: int = Query(1, ge=1), end: Optional[int] = Query(None, ge=1),
+                        zoom: float = Query(1.0, ge=PREVIEW_MIN_ZOOM, le=PREVIEW_MAX_ZOOM), inline: bool = True):
+    """Render a range of pages to images for side-by-side viewing.
+
+    At most ``PREVIEW_MAX_PAGES`` pages are returned, from ``start`` up to
+    ``end`` (inclusive). Each page comes with the URL of its cached image and,
+    unless ``inline`` is false, the image itself as a data URI.
+    """
+    pdf_path, cache_variant = await preview_source(file_id, variant, lang)
+    zoom = round(zoom, 2)
+    total_pages = await pdf_processor.get_page_count(str(pdf_path), cache_key=file_id if variant == "original" else None)
+    if start > total_pages:
+        raise HTTPException(status_code=416, detail=f"Document has {total_pages} pages")
+    last = min(total_pages, end or total_pages, start + PREVIEW_MAX_PAGES - 1)
+    if last < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+
+    page_numbers = list(range(start, last + 1))
+    images = await pdf_processor.render_page_previews(str(pdf_path), file_id, cache_variant, page_numbers, zoom)
+
+    media_type = pdf_processor.previews.media_type
+    pages = []
+    for page_number in page_numbers:
+        query = f"variant={variant}&zoom={zoom}" + (f"&lang={lang}" if lang else "")
+        page = {"page_number": page_number, "url": f"/api/preview/{file_id}/pages/{page_number}?{query}"}
+        if inline:
+            data = await asyncio.to_thread(images[page_number].read_bytes)
+            page["image_data"] = f"data:{media_type};base64,{base64.b64encode(data).decode()}"
+        pages.append(page)
+
+    return {"success": True, "pages": pages, "total_pages": total_pages}
+
+
+@app.get("/api/preview/{file_id}/pages/{page_number}")
+async def preview_page_image(request: Request, file_id: str, page_number: int, variant: str = "original",
+                             lang: Optional[str] = None,
+                             zoom: float = Query(1.0, ge=PREVIEW_MIN_ZOOM, le=PREVIEW_MAX_ZOOM)):
+    """One rendered page image, with an ETag for conditional requests and byte range support"""
+    pdf_path, cache_variant = await preview_source(file_id, variant, lang)
+    zoom = round(zoom, 2)
+    # The cache file name encodes file, page, zoom and source version, so the ETag is known before rendering
+    image_path = await pdf_processor.preview_path(str(pdf_path), file_id, cache_variant, page_number, zoom)
+    etag = f'"{file_id}-{image_path.stem}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=3600"}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    total_pages = await pdf_processor.get_page_count(str(pdf_path), cache_key=file_id if variant == "original" else None)
+    if not 1 <= page_number <= total_pages:
+        raise HTTPException(status_code=404, detail="Page not found")
+
+    images = await pdf_processor.render_page_previews(str(pdf_path), file_id, cache_variant, [page_number], zoom)
+    image_path = images[page_number]
+    return FileResponse(path=image_path, media_type=pdf_processor.previews.media_type, headers=headers)
+
+
 @app.get("/api/download/{file_id}")
-async def download_translated_pdf(file_id: str):
+async def download_translated_pdf(file_id: str, lang: Optional[str] = None):
     """Download translated PDF"""
-    file_path = TRANSLATED_DIR / f"{file_id}_translated.pdf"
+    file_path = translated_path(file_id, lang)
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="Translated file not found. Please translate the document first.")
     
     # Get original filename for better download name
-    original_matches = list(UPLOAD_DIR.glob(f"{file_id}_*"))
-    if original_matches:
-        original_name = original_matches[0].name.replace(f"{file_id}_", "")
-        download_name = f"translated_{original_name}"
+    stored = await asyncio.to_thread(file_index.get, file_id)
+    if stored is not None:
+        original_name = stored["original_name"]
+        download_name = f"translated_{lang}_{original_name}" if lang else f"translated_{original_name}"
     else:
         download_name = f"translated_{file_id}.pdf"
     
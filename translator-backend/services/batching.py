@@ -0,0 +1,216 @@
+import os
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import regex
+
+logger = logging.getLogger(__name__)
+
+MODEL_CONTEXT_WINDOW = int(os.getenv("MODEL_CONTEXT_WINDOW", "8192"))
+# Expected output tokens per input token; scripts like Devanagari expand a lot
+OUTPUT_TOKEN_RATIO = float(os.getenv("OUTPUT_TOKEN_RATIO", "2.0"))
+# Tokens reserved for the instructions wrapped around the lines
+PROMPT_OVERHEAD_TOKENS = int(os.getenv("PROMPT_OVERHEAD_TOKENS", "256"))
+BATCH_LINGER_MS = int(os.getenv("BATCH_LINGER_MS", "50"))
+# Tokens spent on the id and JSON punctuation wrapped around each line
+SEGMENT_OVERHEAD_TOKENS = 8
+
+SENTENCE_BREAK = regex.compile(r"(?<=[.!?;:。！？।])\s+")
+
+
+class TokenCounter:
+    """Counts tokens with tiktoken, falling back to a character estimate.
+
+    The encoding is loaded on first use; if the model is unknown to tiktoken
+    ``cl100k_base`` is used, and if no encoding can be loaded at all (for
+    example offline, before tiktoken has cached its files) four characters
+    count as one token.
+    """
+
+    def __init__(self, model: Optional[str] = None):
+        self.model = model
+        self._encoding = None
+        self._loaded = False
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            import tiktoken
+            try:
+                self._encoding = tiktoken.encoding_for_model(self.model or "")
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.warning(f"tiktoken unavailable, estimating tokens from length: {e}")
+
+    def count(self, text: str) -> int:
+        if not self._loaded:
+            self._load()
+        if self._encoding is None:
+            return len(text) // 4 + 1
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+def input_token_budget(context_window: int = MODEL_CONTEXT_WINDOW) -> int:
+    """Input tokens per request that leave room for the prompt and the reply"""
+    return max(64, int((context_window - PROMPT_OVERHEAD_TOKENS) / (1 + OUTPUT_TOKEN_RATIO)))
+
+
+def split_oversized(text: str, max_tokens: int, counter: TokenCounter) -> List[str]:
+    """Split a single line that exceeds ``max_tokens`` at sentence, then word, boundaries"""
+    if counter.count(text) <= max_tokens:
+        return [text]
+
+    pieces = SENTENCE_BREAK.split(text)
+    if len(pieces) == 1:
+        pieces = text.split(" ")
+    if len(pieces) == 1:
+        # No boundary at all; cut by characters
+        step = max(1, len(text) * max_tokens // counter.count(text))
+        return [text[i:i + step] for i in range(0, len(text), step)]
+
+    parts: List[str] = []
+    current = ""
+    for piece in pieces:
+        candidate = f"{current} {piece}" if current else piece
+        if current and counter.count(candidate) > max_tokens:
+            parts.append(current)
+            current = piece
+        else:
+            current = candidate
+    if current:
+        parts.append(current)
+
+    # A single sentence may still be too long; split it further by words
+    result: List[str] = []
+    for part in parts:
+        if part != text and counter.count(part) > max_tokens:
+            result.extend(split_oversized(part, max_tokens, counter))
+        else:
+            result.append(part)
+    return result
+
+
+def plan_batches(items: List[Tuple[str, int]], budget: int) -> List[List[int]]:
+    """Pack ``(text, tokens)`` items, in order, into batches of at most ``budget`` tokens.
+
+    Returns the item indices of each batch. Items are expected to fit the
+    budget on their own (see ``split_oversized``); one that does not still
+    gets a batch to itself.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for index, (_, tokens) in enumerate(items):
+        if current and current_tokens + tokens + SEGMENT_OVERHEAD_TOKENS > budget:
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(index)
+        current_tokens += tokens + SEGMENT_OVERHEAD_TOKENS
+    if current:
+        batches.append(current)
+    return batches
+
+
+class _PendingLine:
+    __slots__ = ("text", "tokens", "future")
+
+    def __init__(self, text: str, tokens: int, future: asyncio.Future):
+        self.text = text
+        self.tokens = tokens
+        self.future = future
+
+
+class RequestBatcher:
+    """Coalesces lines from many concurrent callers into token-budgeted requests.
+
+    Callers hand over the lines of one page with ``translate``. Lines queue up
+    per language pair and are sent as soon as a full request's worth of
+    tokens is waiting, or after ``linger_ms`` otherwise, so sparse pages share
+    requests and dense pages are split across several. Identical lines within
+    a request are sent once.
+    """
+
+    def __init__(self, translate_fn: Callable[[List[str], str, str, int], Awaitable[List[str]]],
+                 counter: TokenCounter, budget: Optional[int] = None, linger_ms: int = BATCH_LINGER_MS):
+        self.translate_fn = translate_fn
+        self.counter = counter
+        self.budget = budget or input_token_budget()
+        self.linger = linger_ms / 1000.0
+        self._queues: Dict[Tuple[str, str], List[_PendingLine]] = {}
+        self._queued_tokens: Dict[Tuple[str, str], int] = {}
+        self._timers: Dict[Tuple[str, str], asyncio.TimerHandle] = {}
+        self._tasks: set = set()
+        self.requests_sent = 0
+
+    async def translate(self, lines: List[str], source_lang: str, target_lang: str) -> List[str]:
+        """Translate ``lines``, returning one translated line per input line"""
+        loop = asyncio.get_running_loop()
+        key = (source_lang, target_lang)
+        queue = self._queues.setdefault(key, [])
+
+        line_futures: List[List[asyncio.Future]] = []
+        for line in lines:
+            futures = []
+            tokens = self.counter.count(line)
+            if tokens <= self.budget:
+                parts = [(line, tokens)]
+            else:
+                parts = [(part, self.counter.count(part)) for part in split_oversized(line, self.budget, self.counter)]
+            for part, tokens in parts:
+                future = loop.create_future()
+                queue.append(_PendingLine(part, tokens, future))
+                self._queued_tokens[key] = self._queued_tokens.get(key, 0) + tokens + SEGMENT_OVERHEAD_TOKENS
+                futures.append(future)
+            line_futures.append(futures)
+
+        if self._queued_tokens.get(key, 0) >= self.budget:
+            self._flush(key, full_only=True)
+        if self._queues.get(key) and key not in self._timers:
+            self._timers[key] = loop.call_later(self.linger, self._flush, key)
+
+        translated = []
+        for futures in line_futures:
+            parts = await asyncio.gather(*futures)
+            translated.append(" ".join(parts))
+        return translated
+
+    def _flush(self, key: Tuple[str, str], full_only: bool = False) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+        queue = self._queues.pop(key, [])
+        self._queued_tokens.pop(key, None)
+        batches = plan_batches([(item.text, item.tokens) for item in queue], self.budget)
+
+        if full_only and batches:
+            # Keep a partly filled last batch waiting for more lines
+            last = [queue[i] for i in batches[-1]]
+            last_tokens = sum(item.tokens + SEGMENT_OVERHEAD_TOKENS for item in last)
+            if last_tokens < self.budget:
+                batches = batches[:-1]
+                self._queues[key] = last
+                self._queued_tokens[key] = last_tokens
+
+        for batch in batches:
+            task = asyncio.ensure_future(self._send([queue[i] for i in batch], key))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[_PendingLine], key: Tuple[str, str]) -> None:
+        unique_texts = list(dict.fromkeys(item.text for item in batch))
+        input_tokens = sum(item.tokens for item in batch)
+        self.requests_sent += 1
+        try:
+            translated = await self.translate_fn(unique_texts, key[0], key[1], input_tokens)
+            by_text = dict(zip(unique_texts, translated))
+        except Exception as e:
+            logger.error(f"Batch translation failed: {e}")
+            by_text = {}
+
+        for item in batch:
+            if not item.future.done():
+                item.future.set_result(by_text.get(item.text, item.text))
@@ -0,0 +1,65 @@
+"""Reading PDF archives for bulk translation and bundling their outputs."""
+import os
+import hashlib
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import orjson
+
+BULK_MAX_DOCUMENTS = int(os.getenv("BULK_MAX_DOCUMENTS", "500"))
+# Uncompressed size accepted from one archive, so a small upload cannot expand without bound
+BULK_MAX_ARCHIVE_BYTES = int(os.getenv("BULK_MAX_ARCHIVE_BYTES", str(4 * 1024 * 1024 * 1024)))
+
+COPY_CHUNK_BYTES = 1024 * 1024
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+def list_pdf_members(archive_path: Path) -> List[str]:
+    """Names of the PDFs in a ZIP archive, checked against the document and size limits"""
+    try:
+        with zipfile.ZipFile(archive_path) as archive:
+            members = [
+                info for info in archive.infolist()
+                if not info.is_dir() and info.filename.lower().endswith(".pdf")
+                and not Path(info.filename).name.startswith(".")
+            ]
+    except zipfile.BadZipFile as e:
+        raise ArchiveError(f"Not a ZIP archive: {e}")
+
+    if not members:
+        raise ArchiveError("Archive contains no PDF files")
+    if len(members) > BULK_MAX_DOCUMENTS:
+        raise ArchiveError(f"Archive holds {len(members)} PDFs, at most {BULK_MAX_DOCUMENTS} are accepted")
+    if sum(info.file_size for info in members) > BULK_MAX_ARCHIVE_BYTES:
+        raise ArchiveError("Archive is too large once uncompressed")
+    return [info.filename for info in members]
+
+
+def extract_member(archive_path: Path, member: str, output_path: Path) -> Tuple[str, int]:
+    """Copy one archive member to ``output_path`` in chunks; returns its SHA-256 and size"""
+    digest = hashlib.sha256()
+    size_bytes = 0
+    with zipfile.ZipFile(archive_path) as archive, archive.open(member) as source, open(output_path, "wb") as target:
+        while chunk := source.read(COPY_CHUNK_BYTES):
+            digest.update(chunk)
+            size_bytes += len(chunk)
+            target.write(chunk)
+    return digest.hexdigest(), size_bytes
+
+
+def write_bundle(bundle_path: Path, files: Dict[str, Path], manifest: Dict[str, Any]) -> None:
+    """Write the translated PDFs and ``manifest.json`` into one ZIP.
+
+    PDFs are already compressed, so they are stored rather than deflated.
+    """
+    tmp_path = bundle_path.with_suffix(".tmp")
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_STORED) as bundle:
+        bundle.writestr("manifest.json", orjson.dumps(manifest, option=orjson.OPT_INDENT_2),
+                        compress_type=zipfile.ZIP_DEFLATED)
+        for name, path in files.items():
+            bundle.write(path, name)
+    tmp_path.replace(bundle_path)
@@ -0,0 +1,119 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR", "extraction_cache")
+EXTRACTION_CACHE_PERSIST = os.getenv("EXTRACTION_CACHE_PERSIST", "true").lower() in ("1", "true", "yes")
+
+
+class CachedExtraction:
+    """Parsed pages of one uploaded file; may hold only some of its pages"""
+
+    def __init__(self, page_count: int, pages: Optional[Dict[int, Dict[str, Any]]] = None, size_bytes: int = 0):
+        self.page_count = page_count
+        self.pages = pages or {}
+        self.size_bytes = size_bytes
+
+    @property
+    def complete(self) -> bool:
+        return len(self.pages) >= self.page_count
+
+
+class ExtractionCache:
+    """Per-file_id cache of extracted page records.
+
+    Entries live in an in-memory LRU bounded by their serialized size and,
+    when ``persist_dir`` is set, are also written there as orjson files so a
+    restart or another worker can reuse them. Uploaded files never change
+    under a file_id, so entries are only dropped by eviction or ``invalidate``.
+    """
+
+    def __init__(self, max_bytes: int = EXTRACTION_CACHE_MAX_BYTES,
+                 persist_dir: Optional[str] = EXTRACTION_CACHE_DIR if EXTRACTION_CACHE_PERSIST else None):
+        self.max_bytes = max_bytes
+        self.persist_dir = Path(persist_dir) if persist_dir else None
+        if self.persist_dir is not None:
+            self.persist_dir.mkdir(exist_ok=True)
+        self._entries: "OrderedDict[str, CachedExtraction]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _disk_path(self, file_id: str) -> Optional[Path]:
+        if self.persist_dir is None:
+            return None
+        return self.persist_dir / f"{file_id}.json"
+
+    def get(self, file_id: str) -> Optional[CachedExtraction]:
+        with self._lock:
+            entry = self._entries.get(file_id)
+            if entry is not None:
+                self._entries.move_to_end(file_id)
+                return entry
+
+        path = self._disk_path(file_id)
+        if path is None or not path.exists():
+            return None
+        try:
+            payload = path.read_bytes()
+            data = orjson.loads(payload)
+            entry = CachedExtraction(
+                data["page_count"],
+                {int(number): page for number, page in data["pages"].items()},
+                len(payload)
+            )
+        except Exception as e:
+            logger.warning(f"Discarding unreadable extraction cache for {file_id}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        self._remember(file_id, entry)
+        return entry
+
+    def update(self, file_id: str, page_count: int, pages: Dict[int, Dict[str, Any]]) -> None:
+        """Merge newly extracted pages into the entry for ``file_id``"""
+        existing = self.get(file_id)
+        merged = dict(existing.pages) if existing is not None else {}
+        merged.update(pages)
+
+        payload = orjson.dumps({"page_count": page_count, "pages": {str(n): page for n, page in merged.items()}})
+        if len(payload) > self.max_bytes:
+            logger.info(f"Extraction of {file_id} is larger than the cache budget, not caching")
+            return
+
+        self._remember(file_id, CachedExtraction(page_count, merged, len(payload)))
+
+        path = self._disk_path(file_id)
+        if path is not None:
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(payload)
+            tmp_path.replace(path)
+
+    def invalidate(self, file_id: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(file_id, None)
+            if entry is not None:
+                self._size -= entry.size_bytes
+        path = self._disk_path(file_id)
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def _remember(self, file_id: str, entry: CachedExtraction) -> None:
+        with self._lock:
+            previous = self._entries.pop(file_id, None)
+            if previous is not None:
+                self._size -= previous.size_bytes
+            self._entries[file_id] = entry
+            self._size += entry.size_bytes
+
+            # Evict from memory only; the disk copy stays for later reloads
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size_bytes
@@ -0,0 +1,216 @@
+import os
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Float, ForeignKey, Integer, String, create_engine, delete, func, select, update
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+logger = logging.getLogger(__name__)
+
+FILE_INDEX_PATH = os.getenv("FILE_INDEX_PATH", "file_index.db")
+# Uploads unused for this long are deleted with their outputs; 0 keeps files forever
+FILE_RETENTION_HOURS = float(os.getenv("FILE_RETENTION_HOURS", "168"))
+FILE_GC_INTERVAL_SECONDS = float(os.getenv("FILE_GC_INTERVAL_SECONDS", "3600"))
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class StoredFile(Base):
+    __tablename__ = "files"
+
+    file_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    original_name: Mapped[str] = mapped_column(String(512))
+    upload_filename: Mapped[str] = mapped_column(String(600))
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), index=True, nullable=True)
+    size_bytes: Mapped[int] = mapped_column(Integer, default=0)
+    page_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    detected_language: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
+    created_at: Mapped[float] = mapped_column(Float, index=True)
+    last_used: Mapped[float] = mapped_column(Float, index=True)
+
+
+class FileArtifact(Base):
+    __tablename__ = "artifacts"
+
+    output_filename: Mapped[str] = mapped_column(String(600), primary_key=True)
+    file_id: Mapped[str] = mapped_column(String(64), ForeignKey("files.file_id"), index=True)
+    target_lang: Mapped[str] = mapped_column(String(16))
+    created_at: Mapped[float] = mapped_column(Float)
+
+
+class FileIndex:
+    """Metadata of uploads and their translated outputs, keyed by file_id.
+
+    Replaces scanning the upload and output directories: lookups are primary
+    key reads and listings are paginated queries. ``sweep`` deletes uploads
+    that have not been used for ``retention_hours``, together with their
+    outputs and index rows.
+    """
+
+    def __init__(self, path: str = FILE_INDEX_PATH, retention_hours: float = FILE_RETENTION_HOURS):
+        self.retention_hours = retention_hours
+        self.engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(self.engine)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _file_dict(stored: StoredFile, artifacts: Iterable[FileArtifact]) -> Dict[str, Any]:
+        return {
+            "file_id": stored.file_id,
+            "original_name": stored.original_name,
+            "upload_filename": stored.upload_filename,
+            "content_hash": stored.content_hash,
+            "size_bytes": stored.size_bytes,
+            "page_count": stored.page_count,
+            "detected_language": stored.detected_language,
+            "created_at": stored.created_at,
+            "last_used": stored.last_used,
+            "artifacts": {artifact.output_filename: artifact.target_lang for artifact in artifacts}
+        }
+
+    def add(self, file_id: str, original_name: str, upload_filename: str, content_hash: Optional[str] = None,
+            size_bytes: int = 0, page_count: Optional[int] = None, detected_language: Optional[str] = None,
+            created_at: Optional[float] = None) -> None:
+        now = created_at or time.time()
+        with self._lock, Session(self.engine) as session:
+            session.merge(StoredFile(
+                file_id=file_id,
+                original_name=original_name,
+                upload_filename=upload_filename,
+                content_hash=content_hash,
+                size_bytes=size_bytes,
+                page_count=page_count,
+                detected_language=detected_language,
+                created_at=now,
+                last_used=now
+            ))
+            session.commit()
+
+    def update(self, file_id: str, **fields: Any) -> None:
+        """Set ``page_count``, ``detected_language`` or other columns of one file"""
+        with self._lock, Session(self.engine) as session:
+            session.execute(update(StoredFile).where(StoredFile.file_id == file_id).values(**fields))
+            session.commit()
+
+    def get(self, file_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock, Session(self.engine) as session:
+            stored = session.get(StoredFile, file_id)
+            if stored is None:
+                return None
+            artifacts = session.scalars(select(FileArtifact).where(FileArtifact.file_id == file_id)).all()
+            return self._file_dict(stored, artifacts)
+
+    def find_by_hash(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Newest fully processed file with this content, if any"""
+        with self._lock, Session(self.engine) as session:
+            stored = session.scalars(
+                select(StoredFile)
+                .where(StoredFile.content_hash == content_hash, StoredFile.detected_language.is_not(None))
+                .order_by(StoredFile.created_at.desc())
+                .limit(1)
+            ).first()
+            if stored is None:
+                return None
+            artifacts = session.scalars(select(FileArtifact).where(FileArtifact.file_id == stored.file_id)).all()
+            return self._file_dict(stored, artifacts)
+
+    def delete(self, file_id: str) -> None:
+        """Remove one file and its artifacts from the index; the files on disk are left to the caller"""
+        with self._lock, Session(self.engine) as session:
+            session.execute(delete(FileArtifact).where(FileArtifact.file_id == file_id))
+            session.execute(delete(StoredFile).where(StoredFile.file_id == file_id))
+            session.commit()
+
+    def touch(self, file_id: str) -> None:
+        """Mark a file as used now, postponing its expiry"""
+        self.update(file_id, last_used=time.time())
+
+    def add_artifact(self, file_id: str, target_lang: str, output_filename: str) -> None:
+        now = time.time()
+        with self._lock, Session(self.engine) as session:
+            session.merge(FileArtifact(
+                output_filename=output_filename, file_id=file_id, target_lang=target_lang, created_at=now
+            ))
+            session.execute(update(StoredFile).where(StoredFile.file_id == file_id).values(last_used=now))
+            session.commit()
+
+    def list(self, offset: int = 0, limit: int = 50) -> Tuple[List[Dict[str, Any]], int]:
+        """One page of files, newest first, and the total number of files"""
+        with self._lock, Session(self.engine) as session:
+            total = session.scalar(select(func.count(StoredFile.file_id)))
+            stored_files = session.scalars(
+                select(StoredFile).order_by(StoredFile.created_at.desc()).offset(offset).limit(limit)
+            ).all()
+            artifacts: Dict[str, List[FileArtifact]] = {stored.file_id: [] for stored in stored_files}
+            if artifacts:
+                for artifact in session.scalars(
+                    select(FileArtifact).where(FileArtifact.file_id.in_(list(artifacts)))
+                ):
+                    artifacts[artifact.file_id].append(artifact)
+            return [self._file_dict(stored, artifacts[stored.file_id]) for stored in stored_files], total
+
+    def count(self) -> int:
+        with self._lock, Session(self.engine) as session:
+            return session.scalar(select(func.count(StoredFile.file_id)))
+
+    def import_existing(self, upload_dir: Path, translated_dir: Path) -> int:
+        """Index uploads and outputs written before the index existed; returns the number of files added"""
+        added = 0
+        for upload_file in upload_dir.glob("*_*.pdf"):
+            file_id, original_name = upload_file.name.split("_", 1)
+            if self.get(file_id) is not None:
+                continue
+            stat = upload_file.stat()
+            self.add(file_id, original_name, upload_file.name, size_bytes=stat.st_size, created_at=stat.st_mtime)
+            for output in translated_dir.glob(f"{file_id}_translated*.pdf"):
+                lang = output.stem[len(f"{file_id}_translated"):].lstrip("_")
+                self.add_artifact(file_id, lang, output.name)
+            added += 1
+        if added:
+            logger.info(f"Indexed {added} existing uploads")
+        return added
+
+    def sweep(self, upload_dir: Path, translated_dir: Path,
+              on_delete: Optional[Callable[[str], None]] = None,
+              keep: Iterable[str] = ()) -> int:
+        """Delete files unused for ``retention_hours`` along with their outputs; returns how many were deleted.
+
+        file_ids in ``keep`` are skipped. ``on_delete`` is called with each
+        deleted file_id so callers can drop derived data such as caches.
+        """
+        if self.retention_hours <= 0:
+            return 0
+
+        cutoff = time.time() - self.retention_hours * 3600
+        keep = set(keep)
+        with self._lock, Session(self.engine) as session:
+            expired = [
+                stored for stored in session.scalars(select(StoredFile).where(StoredFile.last_used < cutoff))
+                if stored.file_id not in keep
+            ]
+            if not expired:
+                return 0
+            expired_ids = [stored.file_id for stored in expired]
+            outputs = session.scalars(
+                select(FileArtifact.output_filename).where(FileArtifact.file_id.in_(expired_ids))
+            ).all()
+
+            for stored in expired:
+                (upload_dir / stored.upload_filename).unlink(missing_ok=True)
+            for output_filename in outputs:
+                (translated_dir / output_filename).unlink(missing_ok=True)
+
+            session.execute(delete(FileArtifact).where(FileArtifact.file_id.in_(expired_ids)))
+            session.execute(delete(StoredFile).where(StoredFile.file_id.in_(expired_ids)))
+            session.commit()
+
+        if on_delete is not None:
+            for file_id in expired_ids:
+                on_delete(file_id)
+        logger.info(f"Deleted {len(expired_ids)} expired uploads and {len(outputs)} translated files")
+        return len(expired_ids)
@@ -0,0 +1,186 @@
+import os
+import time
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "2"))
+MAX_QUEUED_JOBS = int(os.getenv("MAX_QUEUED_JOBS", "50"))
+JOB_HISTORY_LIMIT = int(os.getenv("JOB_HISTORY_LIMIT", "200"))
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+
+class TranslationJob:
+    """State of one background translation, published to subscribers on every change"""
+
+    def __init__(self, file_id: str, params: Dict[str, Any], file_ids: Iterable[str] = ()):
+        self.job_id = str(uuid.uuid4())
+        self.file_id = file_id
+        # Every upload the job reads, kept from retention until it finishes
+        self.file_ids: Set[str] = {file_id, *file_ids}
+        self.params = params
+        self.status = "queued"
+        self.stage = "queued"
+        self.pages_total = 0
+        self.pages_done = 0
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.task: Optional[asyncio.Task] = None
+        self._subscribers: List[asyncio.Queue] = []
+
+    @property
+    def progress(self) -> float:
+        if self.status == "completed":
+            return 1.0
+        if not self.pages_total:
+            return 0.0
+        return round(self.pages_done / self.pages_total, 4)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "file_id": self.file_id,
+            "status": self.status,
+            "stage": self.stage,
+            "pages_total": self.pages_total,
+            "pages_done": self.pages_done,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            **self.params
+        }
+
+    def _publish(self) -> None:
+        self.updated_at = time.time()
+        snapshot = self.snapshot()
+        for queue in self._subscribers:
+            queue.put_nowait(snapshot)
+
+    def set_stage(self, stage: str, pages_total: Optional[int] = None) -> None:
+        self.status = "running"
+        self.stage = stage
+        if pages_total is not None:
+            self.pages_total = pages_total
+        self._publish()
+
+    def page_done(self, page_number: int) -> None:
+        self.pages_done += 1
+        self._publish()
+
+    def finish(self, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        self.status = status
+        self.stage = status
+        self.result = result
+        self.error = error
+        self._publish()
+
+    async def events(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the current state, then every change until the job finishes"""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        try:
+            snapshot = self.snapshot()
+            yield snapshot
+            while snapshot["status"] not in TERMINAL_STATUSES:
+                snapshot = await queue.get()
+                yield snapshot
+        finally:
+            self._subscribers.remove(queue)
+
+
+class JobManager:
+    """Runs translation jobs in the background with a cap on concurrent jobs.
+
+    Submitted jobs wait on a semaphore, so at most ``max_concurrent`` run at a
+    time and the rest stay queued. Finished jobs are kept for polling up to
+    ``history_limit`` entries, oldest first out.
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_JOBS, max_queued: int = MAX_QUEUED_JOBS,
+                 history_limit: int = JOB_HISTORY_LIMIT):
+        self.max_queued = max_queued
+        self.history_limit = history_limit
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        self._jobs: "OrderedDict[str, TranslationJob]" = OrderedDict()
+
+    def submit(self, file_id: str, params: Dict[str, Any],
+               runner: Callable[[TranslationJob], Awaitable[Dict[str, Any]]],
+               file_ids: Iterable[str] = (),
+               on_finish: Optional[Callable[[TranslationJob], None]] = None) -> TranslationJob:
+        """Queue ``runner`` as a job.
+
+        ``file_ids`` lists further uploads the job reads besides ``file_id``.
+        ``on_finish`` is called once the job ends for any reason, including
+        cancellation before it started, so it can release what was prepared
+        for it.
+        """
+        pending = sum(1 for job in self._jobs.values() if not job.finished)
+        if pending >= self.max_queued:
+            raise JobQueueFull(f"{pending} jobs already pending")
+
+        job = TranslationJob(file_id, params, file_ids)
+        self._jobs[job.job_id] = job
+        job.task = asyncio.create_task(self._run(job, runner, on_finish))
+        self._trim_history()
+        return job
+
+    def get(self, job_id: str) -> Optional[TranslationJob]:
+        return self._jobs.get(job_id)
+
+    def count(self, status: str) -> int:
+        return sum(1 for job in self._jobs.values() if job.status == status)
+
+    def active_file_ids(self) -> Set[str]:
+        """file_ids of jobs that are queued or running"""
+        return {file_id for job in self._jobs.values() if not job.finished for file_id in job.file_ids}
+
+    def cancel(self, job_id: str) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or job.finished or job.task is None:
+            return False
+        job.task.cancel()
+        return True
+
+    async def _run(self, job: TranslationJob, runner: Callable[[TranslationJob], Awaitable[Dict[str, Any]]],
+                   on_finish: Optional[Callable[[TranslationJob], None]] = None) -> None:
+        try:
+            async with self._semaphore:
+                logger.info(f"Job {job.job_id} started for file {job.file_id}")
+                result = await runner(job)
+            job.finish("completed", result=result)
+            logger.info(f"Job {job.job_id} completed")
+        except asyncio.CancelledError:
+            job.finish("cancelled")
+            logger.info(f"Job {job.job_id} cancelled")
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e)
+            job.finish("failed", error=detail)
+            logger.error(f"Job {job.job_id} failed: {detail}")
+        finally:
+            if on_finish is not None:
+                try:
+                    on_finish(job)
+                except Exception as e:
+                    logger.error(f"Cleanup of job {job.job_id} failed: {e}")
+
+    def _trim_history(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.history_limit)]:
+            del self._jobs[job_id]
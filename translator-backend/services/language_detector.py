@@ -0,0 +1,102 @@
+import json
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import regex
+
+logger = logging.getLogger(__name__)
+
+PROFILES_PATH = Path(__file__).parent / "data" / "language_profiles.json"
+
+# Latin-script text needs this much evidence (profile word hits, plus weighted n-gram hits) before a guess is trusted fully
+MIN_WORD_HITS = 8
+# An n-gram hit counts this much towards scores and evidence compared with a whole function word
+NGRAM_WEIGHT = 0.25
+
+WORD_PATTERN = regex.compile(r"\p{L}+")
+
+
+class LanguageDetector:
+    """Offline language detector driven by the bundled profile file.
+
+    Non-Latin scripts are identified from Unicode ranges. Latin-script text is
+    scored against per-language lists of frequent function words and of
+    characteristic character n-grams (``_`` marks a word boundary), weighting
+    each by how many languages share it. N-grams let titles and short lines
+    without function words be recognized. ``detect`` returns the ISO code and
+    a confidence between 0 and 1.
+    """
+
+    def __init__(self, profiles_path: Path = PROFILES_PATH):
+        with open(profiles_path, encoding="utf-8") as f:
+            model = json.load(f)
+
+        self.script_ranges: List[Tuple[int, int, str]] = [
+            (int(start, 16), int(end, 16), lang) for lang, start, end in model["scripts"]
+        ]
+        self.word_weights = self._shared_weights(model["latin_words"])
+        self.ngram_weights = self._shared_weights(model.get("latin_ngrams", {}))
+        self.ngram_lengths = sorted({len(ngram) for ngram in self.ngram_weights})
+        self.latin_languages = list(model["latin_words"])
+
+    @staticmethod
+    def _shared_weights(features: Dict[str, List[str]]) -> Dict[str, Dict[str, float]]:
+        """Weight of each feature per language: 1 split evenly among the languages listing it"""
+        owners: Dict[str, List[str]] = {}
+        for lang, items in features.items():
+            for item in items:
+                owners.setdefault(item, []).append(lang)
+        return {item: {lang: 1.0 / len(langs) for lang in langs} for item, langs in owners.items()}
+
+    def _script_of(self, char: str) -> Optional[str]:
+        code = ord(char)
+        if code < 0x0370:
+            # Basic Latin and Latin extensions
+            return None
+        for start, end, lang in self.script_ranges:
+            if start <= code <= end:
+                return lang
+        return None
+
+    def detect(self, text: str) -> Tuple[str, float]:
+        letters = [char for char in text if char.isalpha()]
+        if not letters:
+            return "en", 0.0
+
+        scripts = Counter(lang for lang in map(self._script_of, letters) if lang is not None)
+        non_latin = sum(scripts.values())
+
+        if non_latin / len(letters) >= 0.3:
+            # Japanese mixes kana with Han characters; any real share of kana means ja, not zh
+            if scripts.get("ja", 0) >= 0.05 * (scripts.get("ja", 0) + scripts.get("zh", 0)):
+                scripts["ja"] += scripts.pop("zh", 0)
+            lang, count = scripts.most_common(1)[0]
+            return lang, round(count / len(letters), 3)
+
+        scores = dict.fromkeys(self.latin_languages, 0.0)
+        hits = 0.0
+        for word in WORD_PATTERN.findall(text.lower()):
+            weights = self.word_weights.get(word)
+            if weights:
+                hits += 1
+                for lang, weight in weights.items():
+                    scores[lang] += weight
+            padded = f"_{word}_"
+            for n in self.ngram_lengths:
+                for start in range(len(padded) - n + 1):
+                    weights = self.ngram_weights.get(padded[start:start + n])
+                    if weights:
+                        hits += NGRAM_WEIGHT
+                        for lang, weight in weights.items():
+                            scores[lang] += NGRAM_WEIGHT * weight
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        best_lang, best = ranked[0]
+        if best == 0:
+            return "en", 0.0
+        second = ranked[1][1] if len(ranked) > 1 else 0.0
+
+        confidence = (best - second) / best * min(1.0, hits / MIN_WORD_HITS)
+        return best_lang, round(confidence, 3)
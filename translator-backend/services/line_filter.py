@@ -0,0 +1,69 @@
+"""Local classification of lines that need no translation.
+
+Page numbers, figures, dates, URLs, e-mail addresses, codes and lines
+already written in the target script are copied through unchanged instead
+of being sent to the model.
+"""
+import os
+from typing import Optional
+
+import regex
+
+PASSTHROUGH_FILTER_ENABLED = os.getenv("PASSTHROUGH_FILTER_ENABLED", "true").lower() in ("1", "true", "yes")
+
+LETTER = regex.compile(r"\p{L}")
+URL = regex.compile(r"^(?:[a-z][a-z0-9+.-]*://|www\.)\S+$", regex.IGNORECASE)
+EMAIL = regex.compile(r"^(?:mailto:)?[\w.+-]+@[\w-]+(?:\.[\w-]+)+$")
+FILE_NAME = regex.compile(
+    r"^[\w./\\:-]+\.(?:pdf|docx?|xlsx?|pptx?|csv|txt|json|xml|html?|ya?ml|md|png|jpe?g|gif|svg|zip|tar|gz|py|js|ts)$",
+    regex.IGNORECASE
+)
+# One token mixing letters and digits that reads as an identifier rather than a word: "INV-2024-0012", "v2.3.1", "Q3".
+# A plain word of three or more letters after a separator means a heading like "1.Introduction", not a code
+CODE = regex.compile(
+    r"^(?=\S*\d)(?!\S*[-_/.:#]\p{L}{3,}(?:[-_/.:#]|$))"
+    r"(?:[\p{Lu}\p{N}]+|[\p{L}\p{N}]*[-_/.:#][\p{L}\p{N}_/.:#-]*)$"
+)
+
+# Scripts that identify a target language on their own; Latin-script languages cannot be told apart this way
+SCRIPT_CLASSES = {
+    "hi": r"\p{Devanagari}",
+    "ar": r"\p{Arabic}",
+    "ru": r"\p{Cyrillic}",
+    "zh": r"\p{Han}",
+    "ja": r"[\p{Han}\p{Hiragana}\p{Katakana}]",
+    "ko": r"\p{Hangul}",
+}
+LATIN_CLASS = r"\p{Latin}"
+_script_patterns = {
+    script_class: regex.compile(rf"^(?:\P{{L}}|{script_class})*$")
+    for script_class in list(SCRIPT_CLASSES.values()) + [LATIN_CLASS]
+}
+
+
+def written_in(text: str, lang: str) -> bool:
+    """Whether every letter of ``text`` belongs to the script ``lang`` is written in"""
+    return bool(_script_patterns[SCRIPT_CLASSES.get(lang, LATIN_CLASS)].match(text))
+
+
+def passthrough_reason(line: str, source_lang: str, target_lang: str) -> Optional[str]:
+    """Why ``line`` can be kept as it is, or None if it should be translated"""
+    text = line.strip()
+    if not text:
+        return "blank"
+    if not LETTER.search(text):
+        # Page numbers, amounts, percentages, dates, table figures, bullets
+        return "no_letters"
+    if " " not in text:
+        if URL.match(text):
+            return "url"
+        if EMAIL.match(text):
+            return "email"
+        if FILE_NAME.match(text):
+            return "file_name"
+        if CODE.match(text):
+            return "code"
+    if (target_lang in SCRIPT_CLASSES and written_in(text, target_lang)
+            and not written_in(text, source_lang)):
+        return "target_script"
+    return None
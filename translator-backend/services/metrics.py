@@ -0,0 +1,96 @@
+import time
+import logging
+from contextlib import contextmanager
+from typing import Iterator
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+logger = logging.getLogger(__name__)
+
+# Stage latencies range from sub-millisecond cache hits to multi-minute documents
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+STAGE_SECONDS = Histogram(
+    "pdf_translation_stage_seconds",
+    "Time spent in each processing stage",
+    ["stage"],
+    buckets=STAGE_BUCKETS
+)
+MODEL_REQUESTS = Counter(
+    "pdf_translation_model_requests_total",
+    "Requests sent to the translation backend",
+    ["kind", "outcome"]
+)
+MODEL_TOKENS = Counter(
+    "pdf_translation_model_tokens_total",
+    "Tokens sent to and received from the translation backend, as counted locally",
+    ["kind", "direction"]
+)
+SEGMENTS = Counter(
+    "pdf_translation_segments_total",
+    "Lines to translate, by outcome; passthrough lines are kept as they are without a model call",
+    ["outcome"]
+)
+CACHE_LOOKUPS = Counter(
+    "pdf_translation_cache_lookups_total",
+    "Cache lookups by cache and result",
+    ["cache", "result"]
+)
+PAGES = Counter(
+    "pdf_translation_pages_total",
+    "Pages that went through a stage",
+    ["stage"]
+)
+BLOCKS_RENDERED = Counter(
+    "pdf_translation_blocks_rendered_total",
+    "Text blocks drawn into translated PDFs",
+    ["outcome"]
+)
+REVISION_BLOCKS = Counter(
+    "pdf_translation_revision_blocks_total",
+    "Blocks reused from an earlier version of a document or translated anew",
+    ["outcome"]
+)
+MODEL_REQUESTS_IN_FLIGHT = Gauge(
+    "pdf_translation_model_requests_in_flight",
+    "Requests currently waiting on the translation backend"
+)
+PDF_TASKS_IN_FLIGHT = Gauge(
+    "pdf_translation_pdf_tasks_in_flight",
+    "PyMuPDF tasks submitted to the worker pool and not yet finished"
+)
+JOBS = Gauge(
+    "pdf_translation_jobs",
+    "Translation jobs by status",
+    ["status"]
+)
+
+
+@contextmanager
+def span(stage: str, **fields: object) -> Iterator[None]:
+    """Time a block as ``stage`` in ``pdf_translation_stage_seconds``.
+
+    The duration is also logged at debug level together with ``fields``,
+    one ``key=value`` pair each, so individual slow operations can be traced.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.labels(stage).observe(elapsed)
+        if logger.isEnabledFor(logging.DEBUG):
+            details = " ".join(f"{key}={value}" for key, value in fields.items())
+            logger.debug(f"span stage={stage} seconds={elapsed:.4f} {details}".rstrip())
+
+
+def count_lookups(cache: str, hits: int, total: int) -> None:
+    if hits:
+        CACHE_LOOKUPS.labels(cache, "hit").inc(hits)
+    if total > hits:
+        CACHE_LOOKUPS.labels(cache, "miss").inc(total - hits)
+
+
+def render_latest() -> bytes:
+    """All metrics in the Prometheus text exposition format"""
+    return generate_latest()
@@ -0,0 +1,101 @@
+import os
+import json
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+OCR_ENABLED = os.getenv("OCR_ENABLED", "true").lower() in ("1", "true", "yes")
+OCR_MODEL = os.getenv("OCR_MODEL", "granite3.2-vision")
+OCR_DPI = int(os.getenv("OCR_DPI", "150"))
+OCR_MAX_CONCURRENCY = int(os.getenv("OCR_MAX_CONCURRENCY", "2"))
+# Pages with less text than this whose images cover at least OCR_MIN_IMAGE_COVERAGE of the page are OCR'd
+OCR_MIN_TEXT_CHARS = int(os.getenv("OCR_MIN_TEXT_CHARS", "20"))
+OCR_MIN_IMAGE_COVERAGE = float(os.getenv("OCR_MIN_IMAGE_COVERAGE", "0.5"))
+OCR_MAX_TOKENS = int(os.getenv("OCR_MAX_TOKENS", "4096"))
+
+OCR_PROMPT = """Read all text on this scanned page.
+Reply with JSON of the form {"blocks": [{"text": "...", "bbox": [x0, y0, x1, y1]}]}
+- One entry per paragraph, heading or table cell, in reading order
+- Keep line breaks inside a block as \\n
+- bbox is the block's position as fractions of the page width and height, from the top left, between 0 and 1
+- Reply {"blocks": []} if the page has no text"""
+
+
+class VisionOCR:
+    """Recovers text blocks from scanned pages with a vision model.
+
+    ``complete`` sends one chat-completion request and returns the reply
+    text. Requests are limited to ``max_concurrency`` at a time, separately
+    from translation requests, so a scanned document cannot starve them.
+    """
+
+    def __init__(self, complete: Callable[[str, Dict[str, Any]], Awaitable[str]], model: str = OCR_MODEL,
+                 max_concurrency: int = OCR_MAX_CONCURRENCY):
+        self.complete = complete
+        self.model = model
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def recognize(self, image_png_b64: str, page_rect: Tuple[float, float, float, float]) -> List[Dict[str, Any]]:
+        """Text blocks of one page image, with bboxes in page coordinates"""
+        request = {
+            "model": self.model,
+            "messages": [{
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": OCR_PROMPT},
+                    {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image_png_b64}"}}
+                ]
+            }],
+            "max_tokens": OCR_MAX_TOKENS,
+            "temperature": 0.0
+        }
+        async with self._semaphore:
+            content = await self.complete("ocr", request)
+        return self.parse_blocks(content, page_rect)
+
+    @staticmethod
+    def parse_blocks(content: str, page_rect: Tuple[float, float, float, float]) -> List[Dict[str, Any]]:
+        """Turn the model's reply into page blocks, stacking blocks without a usable bbox down the page"""
+        start = content.find("{")
+        end = content.rfind("}")
+        try:
+            data = json.loads(content[start:end + 1]) if 0 <= start < end else {}
+        except json.JSONDecodeError:
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+        if not data.get("blocks") and content.strip() and start < 0:
+            # Some models ignore the format and answer with plain text
+            data = {"blocks": [{"text": content.strip()}]}
+
+        x0, y0, x1, y1 = page_rect
+        width, height = x1 - x0, y1 - y0
+        margin = 36.0
+        next_top = y0 + margin
+
+        blocks = []
+        for item in data.get("blocks", []):
+            if not isinstance(item, dict) or not isinstance(item.get("text"), str) or not item["text"].strip():
+                continue
+            text = item["text"].strip()
+            lines = text.count("\n") + 1
+
+            bbox = item.get("bbox")
+            if (isinstance(bbox, list) and len(bbox) == 4 and all(isinstance(v, (int, float)) for v in bbox)
+                    and 0 <= bbox[0] < bbox[2] <= 1 and 0 <= bbox[1] < bbox[3] <= 1):
+                rect = (x0 + bbox[0] * width, y0 + bbox[1] * height, x0 + bbox[2] * width, y0 + bbox[3] * height)
+            else:
+                block_height = lines * 14.0
+                rect = (x0 + margin, next_top, x1 - margin, min(y1 - margin, next_top + block_height))
+            next_top = max(next_top, rect[3] + 6.0)
+
+            font_size = max(6.0, min(24.0, (rect[3] - rect[1]) / lines / 1.2))
+            blocks.append({
+                "text": text,
+                "bbox": rect,
+                "font_info": {"size": round(font_size, 2), "font": None, "color": 0, "flags": 0},
+                "source": "ocr"
+            })
+        return blocks
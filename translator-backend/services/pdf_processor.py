@@ -1,158 +1,411 @@
 import os
-import base64
-import fitz  # PyMuPDF
+import json
+import asyncio
 import logging
+import tempfile
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from collections import deque
+from typing import Dict, Any, AsyncIterator, Callable, List, Optional, Tuple
 
-import tiktoken
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
-from langchain.prompts import PromptTemplate
 
-# Set up font for Hindi support
-fitz.TOOLS.set_small_glyph_heights(True)
-
-# Load environment variables
+# Load environment variables before the service modules read their settings
 load_dotenv()
 
+from services import metrics, pdf_workers
+from services.extraction_cache import ExtractionCache
+from services.line_filter import PASSTHROUGH_FILTER_ENABLED, passthrough_reason
+from services.language_detector import LanguageDetector
+from services.preview_cache import PREVIEW_JPEG_QUALITY, PreviewCache, source_version
+from services.ocr import OCR_DPI, OCR_ENABLED, OCR_MIN_IMAGE_COVERAGE, OCR_MIN_TEXT_CHARS, VisionOCR
+from services.batching import (
+    MODEL_CONTEXT_WINDOW, OUTPUT_TOKEN_RATIO, PROMPT_OVERHEAD_TOKENS, RequestBatcher, TokenCounter
+)
+from services.revision_store import (
+    INCREMENTAL_TRANSLATION_ENABLED, REVISION_SAMPLE_PAGES, RevisionSnapshot, RevisionStore,
+    block_fingerprint, page_fingerprint
+)
+from services.scheduler import RequestScheduler
+from services.translation_backend import TranslationBackend, create_backend
+from services.translation_memory import TRANSLATION_MEMORY_ENABLED, TranslationMemory
+
 logger = logging.getLogger(__name__)
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL")
 
-client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+# Worker processes for PyMuPDF work; 0 runs it on a thread instead
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+PDF_PAGES_PER_TASK = max(1, int(os.getenv("PDF_PAGES_PER_TASK", "16")))
+# Page ranges extracted ahead of the consumer, and translated pages held before rendering
+PDF_PREFETCH_TASKS = max(1, int(os.getenv("PDF_PREFETCH_TASKS", str(max(2, PDF_WORKERS)))))
+PIPELINE_WINDOW = max(1, int(os.getenv("PIPELINE_WINDOW", "64")))
+# Fonts each PDF worker loads during warm-up; the others are loaded on first use
+PDF_WARM_UP_FONTS = [name.strip() for name in os.getenv("PDF_WARM_UP_FONTS", "helv").split(",") if name.strip()]
+
+# "blank" redraws only text on empty pages; "overlay" keeps the original pages and replaces their text in place
+RENDER_MODES = ("blank", "overlay")
+RENDER_MODE = os.getenv("RENDER_MODE", "blank")
+
+# Local language guesses below this confidence are confirmed with the model
+LANG_DETECT_MIN_CONFIDENCE = float(os.getenv("LANG_DETECT_MIN_CONFIDENCE", "0.35"))
+
+_pdf_executor: Optional[Executor] = None
+
+
+def get_pdf_executor() -> Executor:
+    """Executor for CPU-bound PyMuPDF work, created on first use"""
+    global _pdf_executor
+    if _pdf_executor is None:
+        if PDF_WORKERS > 0:
+            _pdf_executor = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            _pdf_executor = ThreadPoolExecutor(max_workers=1)
+    return _pdf_executor
+
+
+def shutdown_pdf_executor() -> None:
+    global _pdf_executor
+    if _pdf_executor is not None:
+        _pdf_executor.shutdown(wait=False, cancel_futures=True)
+        _pdf_executor = None
+
+# Bump whenever the translation prompt changes so cached translations are not reused
+PROMPT_VERSION = "2"
+
+LANGUAGE_NAMES = {
+    'en': 'English', 'es': 'Spanish', 'fr': 'French', 'de': 'German',
+    'hi': 'Hindi', 'zh': 'Chinese', 'ja': 'Japanese', 'ko': 'Korean',
+    'ar': 'Arabic', 'ru': 'Russian', 'pt': 'Portuguese', 'it': 'Italian'
+}
+
+# "json_schema" (structured outputs), "json_object" (JSON mode) or "none" for endpoints without either
+TRANSLATION_RESPONSE_FORMAT = os.getenv("TRANSLATION_RESPONSE_FORMAT", "json_schema")
+TRANSLATION_MAX_RETRIES = int(os.getenv("TRANSLATION_MAX_RETRIES", "2"))
+
+SEGMENTS_SCHEMA = {
+    "name": "translated_segments",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "segments": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "string"},
+                        "text": {"type": "string"}
+                    },
+                    "required": ["id", "text"],
+                    "additionalProperties": False
+                }
+            }
+        },
+        "required": ["segments"],
+        "additionalProperties": False
+    }
+}
 
 
 class PDFProcessor:
-    def __init__(self):
+    def __init__(self, backend: Optional[TranslationBackend] = None):
         self.model = OPENAI_MODEL
+        self.backend = backend or create_backend()
+        self.scheduler = RequestScheduler()
+        self.memory = TranslationMemory() if TRANSLATION_MEMORY_ENABLED else None
+        self.extraction_cache = ExtractionCache()
+        self.revisions = RevisionStore() if INCREMENTAL_TRANSLATION_ENABLED else None
+        self.language_detector = LanguageDetector()
+        self.token_counter = TokenCounter(self.model)
+        self.batcher = RequestBatcher(self._translate_batch, self.token_counter)
+        self.ocr = VisionOCR(self._complete) if OCR_ENABLED else None
+        self.previews = PreviewCache()
+
+    async def warm_up(self) -> None:
+        """Start the PDF workers with their fonts, load the tokenizer and open backend connections.
+
+        Failures are logged rather than raised; whatever did not warm up is
+        loaded on first use instead.
+        """
+        async def warm_workers() -> None:
+            workers = max(1, PDF_WORKERS)
+            # Submitting one task per worker at once makes the pool start all of them
+            pids = await asyncio.gather(*(
+                self._run_in_pool(pdf_workers.warm_up, PDF_WARM_UP_FONTS) for _ in range(workers)
+            ))
+            logger.info(f"Warmed up {len(set(pids))} PDF workers")
+
+        with metrics.span("warm_up"):
+            results = await asyncio.gather(
+                warm_workers(),
+                asyncio.to_thread(self.token_counter.count, "warm up"),
+                self.backend.warm_up(),
+                return_exceptions=True
+            )
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning(f"Warm-up step failed: {result}")
 
-    def _split_text_into_chunks(self, text: str, max_chars: int = 1500) -> list[str]:
-        """Split text into manageable chunks while preserving structure."""
-        if len(text) <= max_chars:
-            return [text]
-        
-        chunks = []
-        lines = text.split('\n')
-        current_chunk = ""
-        
-        for line in lines:
-            # If adding this line would exceed the limit
-            if len(current_chunk) + len(line) + 1 > max_chars:
-                if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
-                current_chunk = line
+    async def _run_in_pool(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run blocking PyMuPDF work off the event loop"""
+        loop = asyncio.get_running_loop()
+        try:
+            with metrics.PDF_TASKS_IN_FLIGHT.track_inprogress():
+                return await loop.run_in_executor(get_pdf_executor(), func, *args)
+        except BrokenProcessPool:
+            # A crashed worker poisons the pool; start a fresh one for the next call
+            shutdown_pdf_executor()
+            raise
+
+    async def iter_pages(self, pdf_path: str, page_count: Optional[int] = None, include_images: bool = False,
+                         page_limit: Optional[int] = None, cache_key: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield compact per-page records in document order as workers finish them.
+
+        Only ``PDF_PREFETCH_TASKS`` page ranges are extracted ahead of the
+        consumer, so memory stays bounded regardless of document length.
+        ``page_limit`` stops after the first N pages. With ``cache_key``, pages
+        already in the extraction cache are served from it and newly extracted
+        pages are added to it once iteration completes.
+        """
+        cached = None
+        if cache_key is not None and not include_images:
+            cached = await asyncio.to_thread(self.extraction_cache.get, cache_key)
+        cached_pages = cached.pages if cached is not None else {}
+
+        if page_count is None:
+            if cached is not None:
+                page_count = cached.page_count
             else:
-                if current_chunk:
-                    current_chunk += "\n" + line
-                else:
-                    current_chunk = line
-        
-        # Add the last chunk
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-        
-        return chunks if chunks else [text]
-
-    async def extract_text_from_pdf(self, pdf_path: str) -> Dict[str, Any]:
-        """Extract text and structure from PDF"""
+                page_count = await self._run_in_pool(pdf_workers.count_pages, pdf_path)
+        end = min(page_count, page_limit) if page_limit is not None else page_count
+        if cache_key is not None and not include_images:
+            metrics.count_lookups("extraction", sum(1 for number in range(1, end + 1) if number in cached_pages), end)
+
+        # Group pages missing from the cache into contiguous worker ranges
+        ranges: deque = deque()
+        for index in range(end):
+            if index + 1 in cached_pages:
+                continue
+            if ranges and ranges[-1][1] == index and ranges[-1][1] - ranges[-1][0] < PDF_PAGES_PER_TASK:
+                ranges[-1][1] = index + 1
+            else:
+                ranges.append([index, index + 1])
+
+        collect = cached is not None or (cache_key is not None and not include_images)
+        extracted: Dict[int, Dict[str, Any]] = {}
+        collected_bytes = 0
+        in_flight: deque = deque()
         try:
-            doc = fitz.open(pdf_path)
-            pages_data = []
-
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                text_dict = page.get_text("dict")
-
-                blocks = []
-                for block in text_dict.get("blocks", []):
-                    if "lines" in block:
-                        block_text = ""
-                        font_info: Optional[Dict[str, Any]] = None
-                        for line in block["lines"]:
-                            line_text = ""
-                            for span in line.get("spans", []):
-                                line_text += span["text"]
-                                if font_info is None:
-                                    font_info = span
-                            if line_text.strip():
-                                block_text += line_text + "\n"
-
-                        if block_text.strip():
-                            blocks.append({
-                                "text": block_text.strip(),
-                                "bbox": block["bbox"],
-                                "font_info": font_info
-                            })
-
-                # Extract images
-                images = []
-                for img_index, img in enumerate(page.get_images(full=True)):
-                    try:
-                        xref = img[0]
-                        pix = fitz.Pixmap(doc, xref)
-                        if pix.n - pix.alpha < 4:
-                            img_data = pix.tobytes("png")
-                            img_rect = page.get_image_rects(xref)
-                            bbox = img_rect[0] if img_rect else [0, 0, 100, 100]
-                            images.append({
-                                "index": img_index,
-                                "data": base64.b64encode(img_data).decode(),
-                                "bbox": bbox
-                            })
-                    except Exception as e:
-                        logger.warning(f"Image processing error on page {page_num+1}: {e}")
-                        continue
+            index = 0
+            while index < end:
+                if index + 1 in cached_pages:
+                    yield cached_pages[index + 1]
+                    index += 1
+                    continue
+
+                while ranges and len(in_flight) < PDF_PREFETCH_TASKS:
+                    start, stop = ranges.popleft()
+                    in_flight.append(asyncio.ensure_future(
+                        self._extract_range(pdf_path, start, stop, include_images)
+                    ))
+                for page in await in_flight.popleft():
+                    if collect:
+                        extracted[page["page_number"]] = page
+                        collected_bytes += sum(len(block["text"]) * 2 + 128 for block in page["text_blocks"])
+                        if collected_bytes > self.extraction_cache.max_bytes:
+                            # Too large to cache; stop holding pages so memory stays flat
+                            collect = False
+                            extracted.clear()
+                    yield page
+                    index = page["page_number"]
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+        if extracted:
+            try:
+                await asyncio.to_thread(self.extraction_cache.update, cache_key, page_count, extracted)
+            except Exception as e:
+                logger.warning(f"Could not cache extraction for {cache_key}: {e}")
+
+    async def _extract_range(self, pdf_path: str, start: int, stop: int, include_images: bool) -> List[Dict[str, Any]]:
+        """Extract a page range, sending only the pages triaged as scanned through OCR"""
+        ocr_min_chars = OCR_MIN_TEXT_CHARS if self.ocr is not None else 0
+        with metrics.span("extraction", pages=stop - start):
+            pages = await self._run_in_pool(
+                pdf_workers.extract_page_range, pdf_path, start, stop, include_images,
+                ocr_min_chars, OCR_MIN_IMAGE_COVERAGE
+            )
+        metrics.PAGES.labels("extracted").inc(len(pages))
 
-                pages_data.append({
-                    "page_number": page_num + 1,
-                    "text_blocks": blocks,
-                    "images": images,
-                    "page_rect": page.rect
-                })
+        scanned = [page for page in pages if page.get("needs_ocr")]
+        if scanned:
+            await asyncio.gather(*(self._ocr_page(pdf_path, page) for page in scanned))
+        return pages
 
-            doc.close()
-            return {"success": True, "pages": pages_data}
+    async def _ocr_page(self, pdf_path: str, page: Dict[str, Any]) -> None:
+        """Replace a scanned page's text blocks with those the vision model reads from it"""
+        try:
+            with metrics.span("ocr", page=page["page_number"]):
+                image = await self._run_in_pool(pdf_workers.render_page_image, pdf_path, page["page_number"], OCR_DPI)
+                blocks = await self.ocr.recognize(image, page["page_rect"])
+        except Exception as e:
+            logger.warning(f"OCR of page {page['page_number']} failed: {e}")
+            return
+
+        metrics.PAGES.labels("ocr").inc()
+        if blocks:
+            page["text_blocks"] = blocks
+        logger.info(f"OCR recovered {len(blocks)} blocks on page {page['page_number']}")
+
+    async def extract_text_from_pdf(self, pdf_path: str, include_images: bool = False,
+                                    page_limit: Optional[int] = None, cache_key: Optional[str] = None) -> Dict[str, Any]:
+        """Extract text and structure from PDF.
+
+        Images are skipped unless ``include_images`` is set, and even then only
+        their xrefs and placements are recorded.
+        ``page_limit`` and ``cache_key`` are passed through to ``iter_pages``.
+        """
+        try:
+            page_count = await self.get_page_count(pdf_path, cache_key)
+            pages_data = [
+                page async for page in self.iter_pages(
+                    pdf_path, page_count, include_images=include_images,
+                    page_limit=page_limit, cache_key=cache_key
+                )
+            ]
+            return {"success": True, "pages": pages_data, "page_count": page_count}
 
         except Exception as e:
             logger.error(f"PDF extraction failed: {e}")
             return {"success": False, "error": str(e)}
 
+    async def preview_path(self, pdf_path: str, file_id: str, variant: str, page_number: int, zoom: float) -> Path:
+        """Where the preview of one page is cached for the PDF's current version, without rendering it"""
+        version = await asyncio.to_thread(source_version, pdf_path)
+        return self.previews.path_for(file_id, variant, page_number, zoom, version)
+
+    async def render_page_previews(self, pdf_path: str, file_id: str, variant: str, page_numbers: List[int],
+                                   zoom: float) -> Dict[int, Path]:
+        """Cached image of each page in ``page_numbers``, rendering the ones not cached yet.
+
+        ``variant`` names which PDF of ``file_id`` is shown (original or a
+        translation). Cache entries are keyed on the file's current version, so
+        a re-translated PDF never serves stale images. Missing pages are
+        rendered in chunks of ``PDF_PAGES_PER_TASK`` across the worker pool.
+        """
+        version = await asyncio.to_thread(source_version, pdf_path)
+        paths = {
+            page_number: self.previews.path_for(file_id, variant, page_number, zoom, version)
+            for page_number in page_numbers
+        }
+        # The first lookup scans the cache directory, so lookups run off the event loop
+        cached = await asyncio.to_thread(
+            lambda: {page_number: path for page_number, path in paths.items() if self.previews.get(path) is not None}
+        )
+        missing = [page_number for page_number in page_numbers if page_number not in cached]
+        metrics.count_lookups("preview", len(cached), len(page_numbers))
+        if not missing:
+            return cached
+
+        chunks = [missing[i:i + PDF_PAGES_PER_TASK] for i in range(0, len(missing), PDF_PAGES_PER_TASK)]
+        with metrics.span("preview", file_id=file_id, pages=len(missing)):
+            rendered = await asyncio.gather(*(
+                self._run_in_pool(
+                    pdf_workers.render_page_previews, pdf_path, chunk, zoom,
+                    self.previews.image_format, PREVIEW_JPEG_QUALITY
+                )
+                for chunk in chunks
+            ))
+        for chunk, images in zip(chunks, rendered):
+            for page_number, image in zip(chunk, images):
+                cached[page_number] = await asyncio.to_thread(self.previews.put, paths[page_number], image)
+        return cached
+
+    async def get_page_count(self, pdf_path: str, cache_key: Optional[str] = None) -> int:
+        if cache_key is not None:
+            cached = await asyncio.to_thread(self.extraction_cache.get, cache_key)
+            if cached is not None:
+                return cached.page_count
+        return await self._run_in_pool(pdf_workers.count_pages, pdf_path)
+
+    @staticmethod
+    def sample_text(pages: List[Dict[str, Any]], max_chars: int = 2000) -> str:
+        """Take an even share of text from each page for language detection"""
+        if not pages:
+            return ""
+        per_page = max(1, max_chars // len(pages))
+        samples = []
+        for page in pages:
+            page_text = " ".join(block["text"] for block in page["text_blocks"])
+            samples.append(page_text[:per_page])
+        return " ".join(samples)
+
     async def detect_language(self, text: str) -> str:
-        """Detect language with model"""
+        """Detect language locally, asking the model only when the local guess is uncertain"""
         if not text.strip():
             return "en"
 
+        with metrics.span("detection", chars=len(text)):
+            lang_code, confidence = self.language_detector.detect(text)
+            if confidence >= LANG_DETECT_MIN_CONFIDENCE:
+                return lang_code
+
+            logger.info(f"Local language detection unsure ({lang_code}, {confidence}), asking model")
+            return await self._detect_language_with_model(text, fallback=lang_code)
+
+    async def _detect_language_with_model(self, text: str, fallback: str = "en") -> str:
+        """Detect language with model"""
         prompt = f"Detect the language of this text and respond with only the 2-letter ISO code (en, es, hi, fr, etc.):\n\n{text[:500]}"
 
         try:
-            response = await client.chat.completions.create(
-                model=self.model,
-                messages=[
+            content = await self._complete("detect", {
+                "model": self.model,
+                "messages": [
                     {"role": "system", "content": "You are a language detector. Return only the 2-letter ISO language code."},
                     {"role": "user", "content": prompt}
                 ],
-                max_tokens=10,
-                temperature=0
-            )
-
-            content = response.choices[0].message.content
-            if isinstance(content, list):
-                lang_code = content[0].text.strip().lower()
-            else:
-                lang_code = str(content).strip().lower()
+                "max_tokens": 10,
+                "temperature": 0
+            })
+            lang_code = content.strip().lower()
 
             # Extract just the language code if there's extra text
-            lang_code = lang_code.split()[0] if lang_code else "en"
+            lang_code = lang_code.split()[0] if lang_code else fallback
             
             if len(lang_code) == 2 and lang_code.isalpha():
                 return lang_code
-            return "en"
+            return fallback
 
         except Exception as e:
             logger.error(f"Language detection error: {e}")
-            return "en"
+            return fallback
+
+    async def _complete(self, kind: str, request: Dict[str, Any]) -> str:
+        """Send one request to the backend, recording its outcome and token counts"""
+        prompt_tokens = 0
+        for message in request["messages"]:
+            content = message["content"]
+            if isinstance(content, list):
+                # Only the text parts of multimodal messages are counted
+                content = " ".join(part.get("text", "") for part in content)
+            prompt_tokens += self.token_counter.count(content)
+        metrics.MODEL_TOKENS.labels(kind, "input").inc(prompt_tokens)
+        try:
+            with metrics.MODEL_REQUESTS_IN_FLIGHT.track_inprogress():
+                content = await self.backend.complete(request)
+        except Exception:
+            metrics.MODEL_REQUESTS.labels(kind, "error").inc()
+            raise
+        metrics.MODEL_REQUESTS.labels(kind, "ok").inc()
+        metrics.MODEL_TOKENS.labels(kind, "output").inc(self.token_counter.count(content))
+        return content
 
     async def translate_page_blocks(self, page_blocks: list, source_lang: str, target_lang: str) -> list:
         """Translate all text blocks from a page together maintaining line structure"""
@@ -179,14 +432,10 @@ class PDFProcessor:
                     block["translated_text"] = block["text"]
                 return page_blocks
             
-            # Combine lines with newlines for translation
-            combined_text = "\n".join(lines_to_translate)
-            
-            # Translate the entire page content
-            translated_text = await self._translate_page_content(combined_text, source_lang, target_lang)
-            
-            # Split translated text back into lines
-            translated_lines = translated_text.split("\n")
+            # Translate the page, reusing whatever the translation memory already knows
+            translated_lines = await self._translate_lines_with_memory(
+                page_blocks, lines_to_translate, source_lang, target_lang
+            )
             
             # Map translated lines back to original blocks
             line_index = 0
@@ -218,195 +467,507 @@ class PDFProcessor:
                 block["translated_text"] = block["text"]
             return page_blocks
 
-    async def _translate_page_content(self, text: str, source_lang: str, target_lang: str) -> str:
-        """Translate page content maintaining exact line structure"""
-        if not text.strip():
-            return text
-            
-        # Get language names for better prompting
-        lang_names = {
-            'en': 'English', 'es': 'Spanish', 'fr': 'French', 'de': 'German',
-            'hi': 'Hindi', 'zh': 'Chinese', 'ja': 'Japanese', 'ko': 'Korean',
-            'ar': 'Arabic', 'ru': 'Russian', 'pt': 'Portuguese', 'it': 'Italian'
+    def _memory_key(self, text: str, source_lang: str, target_lang: str) -> str:
+        return TranslationMemory.make_key(text, source_lang, target_lang, self.model, PROMPT_VERSION)
+
+    async def _memory_lookup(self, keys: List[str], level: str) -> Dict[str, str]:
+        if self.memory is None or not keys:
+            return {}
+        try:
+            found = await asyncio.to_thread(self.memory.get_many, keys, level)
+        except Exception as e:
+            logger.warning(f"Translation memory lookup failed: {e}")
+            return {}
+        metrics.count_lookups(f"memory_{level}", len(found), len(keys))
+        return found
+
+    async def _memory_store(self, entries: Dict[str, str], source_lang: str, target_lang: str) -> None:
+        if self.memory is None or not entries:
+            return
+        try:
+            await asyncio.to_thread(self.memory.put_many, entries, source_lang, target_lang)
+        except Exception as e:
+            logger.warning(f"Translation memory store failed: {e}")
+
+    async def _translate_lines_with_memory(self, page_blocks: list, page_lines: List[str], source_lang: str, target_lang: str) -> List[str]:
+        """Translate a page's lines, checking the memory at page, block and line level.
+
+        Lines that need no translation (numbers, dates, URLs, codes, text
+        already in the target script) are kept as they are without a lookup.
+        Only lines that miss at every level are sent to the model. New
+        translations are written back at all three levels; lines the model
+        left unchanged (including failed requests) are not stored, and neither
+        is any block or page containing one, so they are retried next time.
+        """
+        combined_text = "\n".join(page_lines)
+        page_key = self._memory_key(combined_text, source_lang, target_lang)
+        cached_page = await self._memory_lookup([page_key], "page")
+        if page_key in cached_page:
+            return cached_page[page_key].split("\n")
+
+        text_blocks = [block for block in page_blocks if block["text"].strip()]
+        block_keys = [self._memory_key(block["text"], source_lang, target_lang) for block in text_blocks]
+        cached_blocks = await self._memory_lookup(block_keys, "block")
+
+        # Collect lines of blocks the memory could not answer as a whole
+        line_keys: Dict[str, str] = {}
+        passthrough: Dict[str, str] = {}
+        for block, block_key in zip(text_blocks, block_keys):
+            if block_key not in cached_blocks:
+                for line in block["text"].split("\n"):
+                    if not line.strip() or line in line_keys or line in passthrough:
+                        continue
+                    if PASSTHROUGH_FILTER_ENABLED and passthrough_reason(line, source_lang, target_lang):
+                        passthrough[line] = line
+                    else:
+                        line_keys[line] = self._memory_key(line, source_lang, target_lang)
+        if passthrough:
+            metrics.SEGMENTS.labels("passthrough").inc(len(passthrough))
+        cached_lines = await self._memory_lookup(list(line_keys.values()), "line")
+
+        line_translations = {line: cached_lines[key] for line, key in line_keys.items() if key in cached_lines}
+        line_translations.update(passthrough)
+        pending = [line for line in line_keys if line not in line_translations]
+        # Lines that came back from the model unchanged or empty count as failed
+        failed_lines = set()
+        new_entries: Dict[str, str] = {}
+
+        if pending:
+            translated_pending = await self.batcher.translate(pending, source_lang, target_lang)
+            for line, translated in zip(pending, translated_pending):
+                line_translations[line] = translated
+                if translated.strip() and translated != line:
+                    new_entries[line_keys[line]] = translated
+                else:
+                    failed_lines.add(line)
+
+        translated_lines = []
+        page_complete = True
+        for block, block_key in zip(text_blocks, block_keys):
+            block_lines = block["text"].split("\n")
+            if block_key in cached_blocks:
+                cached = cached_blocks[block_key].split("\n")
+                if len(cached) == len(block_lines):
+                    translated_lines.extend(cached)
+                    continue
+            block_translated = [line_translations.get(line, line) for line in block_lines]
+            if not all(
+                not line.strip() or (line in line_translations and line not in failed_lines) for line in block_lines
+            ):
+                page_complete = False
+            elif block_translated != block_lines:
+                new_entries[block_key] = "\n".join(block_translated)
+            translated_lines.extend(block_translated)
+
+        if page_complete and translated_lines != page_lines:
+            new_entries[page_key] = "\n".join(translated_lines)
+        await self._memory_store(new_entries, source_lang, target_lang)
+
+        return translated_lines
+
+    async def _translate_batch(self, lines: List[str], source_lang: str, target_lang: str, input_tokens: int) -> List[str]:
+        """Translate one planned batch of lines as ID-tagged segments.
+
+        Segments missing from the reply, or coming back empty, are requested
+        again on their own up to ``TRANSLATION_MAX_RETRIES`` times; anything
+        still missing after that keeps its original text. The rest of the
+        batch is never re-translated.
+        """
+        pending = {str(index): line for index, line in enumerate(lines) if line.strip()}
+        translated: Dict[str, str] = {}
+
+        for attempt in range(TRANSLATION_MAX_RETRIES + 1):
+            if not pending:
+                break
+            if attempt:
+                logger.warning(f"Retrying {len(pending)} misaligned segments (attempt {attempt + 1})")
+                metrics.SEGMENTS.labels("retried").inc(len(pending))
+
+            tokens = input_tokens if attempt == 0 else sum(self.token_counter.count(text) for text in pending.values())
+            room = MODEL_CONTEXT_WINDOW - PROMPT_OVERHEAD_TOKENS - tokens
+            max_tokens = max(64, min(room, int(tokens * OUTPUT_TOKEN_RATIO) + 16 * len(pending)))
+
+            received = await self._translate_segments(pending, source_lang, target_lang, max_tokens)
+            for segment_id, text in self._validate_segments(pending, received).items():
+                translated[segment_id] = text
+                del pending[segment_id]
+
+        metrics.SEGMENTS.labels("translated").inc(len(translated))
+        if pending:
+            metrics.SEGMENTS.labels("failed").inc(len(pending))
+            logger.error(f"{len(pending)} segments left untranslated after {TRANSLATION_MAX_RETRIES} retries")
+
+        return [translated.get(str(index), line) for index, line in enumerate(lines)]
+
+    @staticmethod
+    def _validate_segments(sent: Dict[str, str], received: Dict[str, str]) -> Dict[str, str]:
+        """Keep only replies that answer a segment we sent with a non-empty single line"""
+        valid = {}
+        for segment_id, text in received.items():
+            if segment_id not in sent or not isinstance(text, str):
+                continue
+            text = " ".join(text.split("\n")).strip()
+            if text:
+                valid[segment_id] = text
+        return valid
+
+    @staticmethod
+    def _parse_segments(content: str) -> Dict[str, str]:
+        """Read ``{"segments": [{"id", "text"}]}`` from a reply, tolerating code fences or chatter"""
+        start = content.find("{")
+        end = content.rfind("}")
+        if start < 0 or end <= start:
+            return {}
+        try:
+            data = json.loads(content[start:end + 1])
+        except json.JSONDecodeError:
+            return {}
+
+        segments = data.get("segments", []) if isinstance(data, dict) else []
+        return {
+            str(segment["id"]): segment["text"]
+            for segment in segments
+            if isinstance(segment, dict) and "id" in segment and "text" in segment
         }
-        
-        source_name = lang_names.get(source_lang, source_lang)
-        target_name = lang_names.get(target_lang, target_lang)
-        
-        prompt = f"""Translate this text from {source_name} to {target_name}.
+
+    async def _translate_segments(self, segments: Dict[str, str], source_lang: str, target_lang: str,
+                                  max_tokens: int) -> Dict[str, str]:
+        """Send ID-tagged segments to the model and return the translations it gave back by ID"""
+        source_name = LANGUAGE_NAMES.get(source_lang, source_lang)
+        target_name = LANGUAGE_NAMES.get(target_lang, target_lang)
+
+        payload = json.dumps(
+            {"segments": [{"id": segment_id, "text": text} for segment_id, text in segments.items()]},
+            ensure_ascii=False
+        )
+        prompt = f"""Translate the "text" of every segment from {source_name} to {target_name}.
 CRITICAL Rules:
-- Translate line by line, maintaining EXACT same number of lines
-- Each line in output must correspond to each line in input
+- Reply with JSON of the form {{"segments": [{{"id": "...", "text": "..."}}]}}
+- Return exactly one entry per input segment, with the same id
+- Translate each segment on its own; never merge, split or drop segments
 - Do NOT translate URLs, file names, or technical references
-- Preserve line breaks exactly as they appear
-- Return ONLY the translated text with same line structure
-- If a line is empty, keep it empty
-
-Text to translate:
-{text}"""
+- Keep each translation on a single line
+
+Input:
+{payload}"""
+
+        # Special handling for Hindi and other complex scripts
+        if target_lang == 'hi':
+            system_msg = "You are a professional translator. Translate to Hindi (हिन्दी) using Devanagari script. Reply only with the requested JSON."
+        else:
+            system_msg = f"You are a professional translator. Translate to {target_name}. Reply only with the requested JSON."
+
+        request: Dict[str, Any] = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_msg},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": max_tokens,
+            "temperature": 0.0,
+        }
+        if TRANSLATION_RESPONSE_FORMAT == "json_schema":
+            request["response_format"] = {"type": "json_schema", "json_schema": SEGMENTS_SCHEMA}
+        elif TRANSLATION_RESPONSE_FORMAT == "json_object":
+            request["response_format"] = {"type": "json_object"}
 
         try:
-            # Special handling for Hindi and other complex scripts
-            if target_lang == 'hi':
-                system_msg = "You are a professional translator. Translate to Hindi (हिन्दी) using Devanagari script. MAINTAIN EXACT LINE STRUCTURE - same number of lines in output as input."
-            else:
-                system_msg = f"You are a professional translator. Translate to {target_name}. MAINTAIN EXACT LINE STRUCTURE - same number of lines in output as input."
-            
-            response = await client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_msg},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=4000,
-                temperature=0.0,
+            expected_tokens = self.token_counter.count(prompt) + max_tokens // 2
+            async with self.scheduler.slot(expected_tokens):
+                with metrics.span("translation_request", segments=len(segments), max_tokens=max_tokens):
+                    content = await self._complete("translate", request)
+            return self._parse_segments(content)
+
+        except Exception as e:
+            logger.error(f"Segment translation error: {e}")
+            return {}
+
+    @property
+    def revision_version(self) -> str:
+        """Translations made with another model or prompt are never reused"""
+        return f"{self.model or ''}:{PROMPT_VERSION}"
+
+    async def _load_revision_base(self, pdf_path: str, page_count: int, source_lang: str, target_lang: str,
+                                  cache_key: Optional[str] = None,
+                                  base_file_id: Optional[str] = None) -> Optional[RevisionSnapshot]:
+        """Find the earlier translation this document is a revision of, if any.
+
+        ``base_file_id`` names it explicitly; otherwise the leading pages are
+        fingerprinted and matched against earlier translations of the same
+        language pair by other documents. The document's own snapshot is only
+        used when named explicitly, so re-translating it refreshes every block.
+        """
+        if self.revisions is None or source_lang == target_lang:
+            return None
+
+        if not base_file_id:
+            if cache_key is None:
+                # Unnamed documents are never saved as snapshots, so only explicit bases apply
+                return None
+            sample = []
+            async for page in self.iter_pages(pdf_path, page_count, page_limit=REVISION_SAMPLE_PAGES, cache_key=cache_key):
+                sample.append(page_fingerprint([block_fingerprint(block["text"]) for block in page["text_blocks"]]))
+            base_file_id = await asyncio.to_thread(
+                self.revisions.find_base, sample, source_lang, target_lang, self.revision_version, cache_key
             )
-            
-            content = response.choices[0].message.content
-            if isinstance(content, list):
-                translated = content[0].text.strip()
-            else:
-                translated = str(content).strip() if content else ""
-            
-            # Validate line count matches
-            original_lines = text.split('\n')
-            translated_lines = translated.split('\n') if translated else []
-            
-            # If line counts don't match, pad or truncate
-            if len(translated_lines) != len(original_lines):
-                if len(translated_lines) < len(original_lines):
-                    # Pad with original lines if translation is shorter
-                    while len(translated_lines) < len(original_lines):
-                        idx = len(translated_lines)
-                        translated_lines.append(original_lines[idx] if idx < len(original_lines) else "")
+            if base_file_id is None:
+                return None
+
+        base = await asyncio.to_thread(self.revisions.load, base_file_id, source_lang, target_lang)
+        if base is None or base.version != self.revision_version:
+            return None
+        logger.info(f"Translating {cache_key} as a revision of {base_file_id}")
+        return base
+
+    async def _translate_page_record(self, page: Dict[str, Any], source_lang: str, target_lang: str,
+                                     on_page_done: Optional[Callable[[int], None]],
+                                     base: Optional[RevisionSnapshot] = None,
+                                     snapshot: Optional[RevisionSnapshot] = None) -> Dict[str, Any]:
+        # Work on copies: page records may be shared through the extraction cache
+        blocks = [dict(block) for block in page["text_blocks"]]
+        reused_blocks = 0
+        if snapshot is None:
+            translated_blocks = await self.translate_page_blocks(blocks, source_lang, target_lang)
+        else:
+            fingerprints = [block_fingerprint(block["text"]) for block in blocks]
+            reused_page = base.pages.get(page_fingerprint(fingerprints)) if base is not None else None
+
+            # Only blocks the base translation does not know go to the model
+            changed = []
+            for index, (block, fingerprint) in enumerate(zip(blocks, fingerprints)):
+                if reused_page is not None:
+                    block["translated_text"] = reused_page[index]
+                elif base is not None and fingerprint in base.blocks:
+                    block["translated_text"] = base.blocks[fingerprint]
                 else:
-                    # Truncate if translation is longer
-                    translated_lines = translated_lines[:len(original_lines)]
-                
-                translated = '\n'.join(translated_lines)
-            
-            return translated if translated else text
-                
-        except Exception as e:
-            logger.error(f"Page translation error: {e}")
-            return text
+                    changed.append(block)
+            reused_blocks = len(blocks) - len(changed)
+            if changed:
+                await self.translate_page_blocks(changed, source_lang, target_lang)
+            metrics.REVISION_BLOCKS.labels("reused").inc(reused_blocks)
+            metrics.REVISION_BLOCKS.labels("translated").inc(len(changed))
+
+            translated_blocks = blocks
+            snapshot.add_page(
+                page["page_number"], fingerprints,
+                [block["translated_text"] for block in blocks],
+                # Failed translations come back as the original text and must not be reused
+                [not block["text"].strip() or block["translated_text"] != block["text"] for block in blocks]
+            )
+        metrics.PAGES.labels("translated").inc()
+        if on_page_done is not None:
+            on_page_done(page["page_number"])
+        return {
+            "page_number": page["page_number"],
+            "text_blocks": [
+                {
+                    "bbox": block["bbox"],
+                    "original_text": block["text"],
+                    "translated_text": block["translated_text"],
+                    "font_info": block["font_info"],
+                    "source": block.get("source", "text")
+                }
+                for block in translated_blocks
+            ],
+            "reused_blocks": reused_blocks
+        }
+
+    async def _render_part(self, pdf_path: str, pages: List[Dict[str, Any]], part_path: str,
+                           render_mode: str = RENDER_MODE, subset_fonts: bool = True) -> Tuple[int, int]:
+        with metrics.span("render", pages=len(pages), mode=render_mode):
+            render = pdf_workers.render_pages_overlay if render_mode == "overlay" else pdf_workers.render_pages
+            total, successful = await self._run_in_pool(render, pdf_path, pages, part_path, subset_fonts)
+        metrics.PAGES.labels("rendered").inc(len(pages))
+        metrics.BLOCKS_RENDERED.labels("inserted").inc(successful)
+        metrics.BLOCKS_RENDERED.labels("failed").inc(total - successful)
+        return total, successful
+
+    async def _merge_parts(self, part_paths: List[str], output_path: str, subset_fonts: bool = True) -> None:
+        with metrics.span("merge", parts=len(part_paths)):
+            await self._run_in_pool(pdf_workers.merge_pdfs, part_paths, output_path, subset_fonts)
+
+    async def translate_document(self, pdf_path: str, output_path: str, source_lang: str, target_lang: str,
+                                 cache_key: Optional[str] = None,
+                                 on_page_count: Optional[Callable[[int], None]] = None,
+                                 on_page_done: Optional[Callable[[int], None]] = None,
+                                 base_file_id: Optional[str] = None,
+                                 render_mode: str = RENDER_MODE) -> Dict[str, Any]:
+        """Extract, translate and render a PDF as one streaming pipeline.
+
+        Pages are translated as soon as they are extracted, with at most
+        ``PIPELINE_WINDOW`` pages waiting on the model. Translated pages are
+        collected in document order and every ``PDF_PAGES_PER_TASK`` of them
+        are rendered to a partial PDF, then dropped from memory. The parts are
+        merged into ``output_path`` at the end.
+
+        If the document is a revision of an earlier translated upload (found
+        by fingerprint or given as ``base_file_id``), unchanged blocks reuse
+        the earlier translation and only changed blocks are translated.
+
+        ``render_mode`` is one of ``RENDER_MODES``. Fonts are subset once, in
+        the part itself for single-part documents and after merging otherwise.
+        """
+        summaries = await self.translate_document_targets(
+            pdf_path, {target_lang: output_path}, source_lang,
+            cache_key=cache_key,
+            on_page_count=on_page_count,
+            on_page_done=(lambda _, page_number: on_page_done(page_number)) if on_page_done is not None else None,
+            base_file_id=base_file_id,
+            render_mode=render_mode
+        )
+        return {"pages": summaries["pages"], **summaries["targets"][target_lang]}
+
+    async def translate_document_targets(self, pdf_path: str, outputs: Dict[str, str], source_lang: str,
+                                         cache_key: Optional[str] = None,
+                                         on_page_count: Optional[Callable[[int], None]] = None,
+                                         on_page_done: Optional[Callable[[str, int], None]] = None,
+                                         base_file_id: Optional[str] = None,
+                                         render_mode: str = RENDER_MODE) -> Dict[str, Any]:
+        """Translate a PDF into several languages with a single extraction.
+
+        ``outputs`` maps each target language to its output path. Every
+        extracted page is fanned out to all targets at once; the targets share
+        the request scheduler and batcher, so one rate limit covers them all.
+        Each target renders and merges its own parts as in
+        ``translate_document``. ``on_page_done`` is called with the language
+        and page number.
+
+        Returns ``{"pages": page_count, "targets": {lang: summary}}``.
+        """
+        page_count = await self.get_page_count(pdf_path, cache_key)
+        if on_page_count is not None:
+            on_page_count(page_count)
+        single_part = page_count <= PDF_PAGES_PER_TASK
+
+        targets = {}
+        for target_lang, output_path in outputs.items():
+            base = await self._load_revision_base(pdf_path, page_count, source_lang, target_lang, cache_key, base_file_id)
+            snapshot = None
+            if self.revisions is not None and cache_key is not None and source_lang != target_lang:
+                snapshot = RevisionSnapshot(cache_key, source_lang, target_lang, self.revision_version)
+            targets[target_lang] = {
+                "output_path": output_path,
+                "base": base,
+                "snapshot": snapshot,
+                "pending": deque(),
+                "ready": [],
+                "render_tasks": [],
+                "reused_blocks": 0,
+                "page_done": (lambda page_number, lang=target_lang: on_page_done(lang, page_number))
+                if on_page_done is not None else None
+            }
+
+        total_blocks = 0
+        with tempfile.TemporaryDirectory(dir=Path(next(iter(outputs.values()))).parent) as parts_dir:
+            def flush_ready(target_lang: str) -> None:
+                target = targets[target_lang]
+                part_path = str(Path(parts_dir) / f"{target_lang}_part_{len(target['render_tasks']):05d}.pdf")
+                target["render_tasks"].append((part_path, asyncio.ensure_future(
+                    self._render_part(pdf_path, list(target["ready"]), part_path, render_mode, single_part)
+                )))
+                target["ready"].clear()
+
+            async def collect_head(target_lang: str) -> None:
+                target = targets[target_lang]
+                record = await target["pending"].popleft()
+                target["reused_blocks"] += record.pop("reused_blocks")
+                target["ready"].append(record)
+                if len(target["ready"]) >= PDF_PAGES_PER_TASK:
+                    flush_ready(target_lang)
 
-    async def create_translated_pdf(self, original_pdf_path: str, translated_data: Dict[str, Any], output_path: str) -> bool:
-        """Create new blank PDF with translated content"""
-        try:
-            # Open original to get page dimensions
-            original_doc = fitz.open(original_pdf_path)
-            
-            # Create new blank document
-            new_doc = fitz.open()
-            
-            # Try to embed a font that supports Hindi
             try:
-                # Check if we have Hindi text to determine font needs
-                has_hindi_content = any(
-                    any('\u0900' <= char <= '\u097F' for char in block.get('translated_text', ''))
-                    for page_data in translated_data["pages"]
-                    for block in page_data["text_blocks"]
+                async for page in self.iter_pages(pdf_path, page_count, cache_key=cache_key):
+                    total_blocks += len(page["text_blocks"])
+                    for target_lang, target in targets.items():
+                        target["pending"].append(asyncio.ensure_future(self._translate_page_record(
+                            page, source_lang, target_lang, target["page_done"], target["base"], target["snapshot"]
+                        )))
+                    for target_lang, target in targets.items():
+                        pending = target["pending"]
+                        while pending and (pending[0].done() or len(pending) >= PIPELINE_WINDOW):
+                            await collect_head(target_lang)
+
+                for target_lang, target in targets.items():
+                    while target["pending"]:
+                        await collect_head(target_lang)
+                    if target["ready"]:
+                        flush_ready(target_lang)
+
+                for target in targets.values():
+                    target["counts"] = await asyncio.gather(*(task for _, task in target["render_tasks"]))
+            finally:
+                for target in targets.values():
+                    for task in list(target["pending"]) + [task for _, task in target["render_tasks"]]:
+                        task.cancel()
+
+            for target in targets.values():
+                part_paths = [part_path for part_path, _ in target["render_tasks"]]
+                if len(part_paths) == 1:
+                    os.replace(part_paths[0], target["output_path"])
+                elif part_paths:
+                    await self._merge_parts(part_paths, target["output_path"])
+
+        summaries: Dict[str, Dict[str, Any]] = {}
+        for target_lang, target in targets.items():
+            successful_blocks = sum(successful for _, successful in target["counts"])
+            logger.info(f"PDF Creation Summary ({target_lang}): {successful_blocks}/{total_blocks} text blocks inserted")
+
+            snapshot = target["snapshot"]
+            if snapshot is not None and successful_blocks > 0:
+                try:
+                    await asyncio.to_thread(self.revisions.save, snapshot)
+                except Exception as e:
+                    logger.warning(f"Could not save revision snapshot for {cache_key}: {e}")
+
+            summaries[target_lang] = {
+                "total_blocks": total_blocks,
+                "successful_blocks": successful_blocks,
+                "reused_blocks": target["reused_blocks"],
+                "revision_of": target["base"].file_id if target["base"] is not None else None,
+                "success": successful_blocks > 0
+            }
+        return {"pages": page_count, "targets": summaries}
+
+    async def create_translated_pdf(self, original_pdf_path: str, translated_data: Dict[str, Any], output_path: str,
+                                    render_mode: str = RENDER_MODE) -> bool:
+        """Create a PDF with translated content, on blank pages or over the originals per ``render_mode``.
+
+        Page ranges are rendered into partial PDFs in parallel and then merged
+        in document order.
+        """
+        try:
+            pages = translated_data["pages"]
+            if len(pages) <= PDF_PAGES_PER_TASK:
+                total_blocks, successful_blocks = await self._render_part(
+                    original_pdf_path, pages, output_path, render_mode
                 )
-                logger.info(f"Document contains Hindi content: {has_hindi_content}")
-            except Exception as e:
-                logger.warning(f"Could not check for Hindi content: {e}")
-                has_hindi_content = False
-            total_blocks = 0
-            successful_blocks = 0
-
-            for page_data in translated_data["pages"]:
-                original_page = original_doc[page_data["page_number"] - 1]
-                page_rect = original_page.rect
-                
-                # Create new blank page with same dimensions
-                new_page = new_doc.new_page(width=page_rect.width, height=page_rect.height)
-
-                for block in page_data["text_blocks"]:
-                    total_blocks += 1
-                    translated_text = block.get("translated_text", "")
-                    original_text = block.get("text", "")
-                    
-                    # Use translated text if available, otherwise original
-                    text_to_use = translated_text.strip() if translated_text else original_text.strip()
-                    
-                    logger.info(f"Processing block {total_blocks}: '{text_to_use[:50]}...' (translated: {bool(translated_text)}, bbox: {block['bbox']})")
-                    
-                    if text_to_use and len(text_to_use.strip()) > 0:
-                        bbox = fitz.Rect(block["bbox"])
-                        font_info = block.get("font_info", {})
-                        font_size = max(8, min(font_info.get("size", 12) if font_info else 12, 16))
-                        
-                        # Ensure bbox is valid
-                        if bbox.width <= 0 or bbox.height <= 0:
-                            bbox = fitz.Rect(bbox.x0, bbox.y0, bbox.x0 + 200, bbox.y0 + font_size * 2)
-                        
-                        try:
-                            # Check if text contains Hindi/Devanagari characters
-                            has_hindi = any('\u0900' <= char <= '\u097F' for char in text_to_use)
-                            
-                            if has_hindi:
-                                # Use textbox for Hindi with better font support
-                                result = new_page.insert_textbox(
-                                    bbox,
-                                    text_to_use,
-                                    fontsize=font_size,
-                                    fontname="cjk",  # Better Unicode support
-                                    color=(0, 0, 0),
-                                    align=0
-                                )
-                                if result >= 0:
-                                    successful_blocks += 1
-                                    logger.info(f"Successfully inserted Hindi text block {successful_blocks}")
-                                else:
-                                    raise Exception("Textbox insertion failed")
-                            else:
-                                # Regular text insertion for English/Latin
-                                lines = text_to_use.split('\n')
-                                line_height = font_size * 1.2
-                                
-                                for i, line in enumerate(lines):
-                                    if line.strip():
-                                        y_pos = bbox.y0 + (i * line_height) + font_size
-                                        new_page.insert_text(
-                                            (bbox.x0, y_pos),
-                                            line.strip(),
-                                            fontsize=font_size,
-                                            color=(0, 0, 0)
-                                        )
-                                
-                                successful_blocks += 1
-                                logger.info(f"Successfully inserted text block {successful_blocks}")
-                            
-                        except Exception as e:
-                            logger.error(f"Text insertion failed: {e}")
-                            # Fallback with different font
-                            try:
-                                new_page.insert_text(
-                                    (bbox.x0, bbox.y0 + font_size),
-                                    text_to_use.replace('\n', ' '),
-                                    fontsize=max(6, font_size * 0.8),
-                                    color=(0, 0, 0)
-                                )
-                                successful_blocks += 1
-                                logger.info(f"Fallback insertion successful")
-                            except Exception as e2:
-                                logger.error(f"All insertion methods failed: {e2}")
+            else:
+                with tempfile.TemporaryDirectory(dir=Path(output_path).parent) as parts_dir:
+                    part_paths = []
+                    tasks = []
+                    for index, start in enumerate(range(0, len(pages), PDF_PAGES_PER_TASK)):
+                        part_path = str(Path(parts_dir) / f"part_{index:05d}.pdf")
+                        part_paths.append(part_path)
+                        tasks.append(self._render_part(
+                            original_pdf_path, pages[start:start + PDF_PAGES_PER_TASK], part_path,
+                            render_mode, subset_fonts=False
+                        ))
+                    counts = await asyncio.gather(*tasks)
+                    await self._merge_parts(part_paths, output_path)
+
+                total_blocks = sum(total for total, _ in counts)
+                successful_blocks = sum(successful for _, successful in counts)
 
             logger.info(f"PDF Creation Summary: {successful_blocks}/{total_blocks} text blocks inserted")
             
             if successful_blocks == 0:
                 logger.error("No text blocks were inserted! PDF will be blank.")
                 # Add debug info
-                for i, page_data in enumerate(translated_data["pages"]):
+                for i, page_data in enumerate(pages):
                     logger.error(f"Page {i+1}: {len(page_data['text_blocks'])} blocks")
                     for j, block in enumerate(page_data['text_blocks'][:3]):  # Show first 3 blocks
                         logger.error(f"  Block {j+1}: '{block.get('translated_text', '')[:50]}...'")
             
-            new_doc.save(output_path)
-            new_doc.close()
-            original_doc.close()
-            
             return successful_blocks > 0
 
         except Exception as e:
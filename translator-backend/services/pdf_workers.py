@@ -0,0 +1,316 @@
+"""PyMuPDF work that runs inside worker processes.
+
+Everything here is a plain module-level function taking and returning
+picklable values, so it can be submitted to a ``ProcessPoolExecutor``.
+"""
+import os
+import base64
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from services.text_fitting import fit_text, width_table, write_fitted
+
+# Set up font for Hindi support
+fitz.TOOLS.set_small_glyph_heights(True)
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up(font_names: List[str]) -> int:
+    """Load fonts and their width tables ahead of the first render; returns the worker's pid"""
+    for font_name in font_names:
+        width_table(font_name)
+        fit_text("Warm up", font_name, 100.0, 20.0, 12.0)
+    return os.getpid()
+
+
+def count_pages(pdf_path: str) -> int:
+    with fitz.open(pdf_path) as doc:
+        return len(doc)
+
+
+def compact_font_info(span: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Keep only the span attributes rendering needs"""
+    if span is None:
+        return None
+    return {
+        "size": span.get("size", 12),
+        "font": span.get("font"),
+        "color": span.get("color", 0),
+        "flags": span.get("flags", 0)
+    }
+
+
+def image_coverage(page: fitz.Page, image_infos: Optional[List[Dict[str, Any]]] = None) -> float:
+    """Share of the page area covered by images, counting overlaps more than once (capped at 1)"""
+    page_area = abs(page.rect) or 1.0
+    infos = image_infos if image_infos is not None else page.get_image_info()
+    covered = sum(abs(fitz.Rect(info["bbox"]) & page.rect) for info in infos)
+    return min(1.0, covered / page_area)
+
+
+def extract_page_range(pdf_path: str, start: int, end: int, include_images: bool = False,
+                       ocr_min_chars: int = 0, ocr_min_image_coverage: float = 1.0) -> List[Dict[str, Any]]:
+    """Extract text blocks for pages ``start`` to ``end`` (exclusive, zero-based).
+
+    With ``include_images`` each page also lists its image placements by xref,
+    without decoding any pixel data. Pages with fewer than ``ocr_min_chars``
+    characters of text whose images cover at least ``ocr_min_image_coverage``
+    of the page are flagged ``needs_ocr``; image placements are only looked
+    at for such low-text pages.
+    """
+    pages_data = []
+
+    with fitz.open(pdf_path) as doc:
+        for page_num in range(start, min(end, len(doc))):
+            page = doc[page_num]
+            text_dict = page.get_text("dict")
+
+            blocks = []
+            for block in text_dict.get("blocks", []):
+                if "lines" in block:
+                    block_text = ""
+                    font_info: Optional[Dict[str, Any]] = None
+                    for line in block["lines"]:
+                        line_text = ""
+                        for span in line.get("spans", []):
+                            line_text += span["text"]
+                            if font_info is None:
+                                font_info = span
+                        if line_text.strip():
+                            block_text += line_text + "\n"
+
+                    if block_text.strip():
+                        blocks.append({
+                            "text": block_text.strip(),
+                            "bbox": tuple(block["bbox"]),
+                            "font_info": compact_font_info(font_info)
+                        })
+
+            # Record image references only; pixels are never decoded here
+            images = []
+            image_infos = page.get_image_info(xrefs=True) if include_images else None
+            if include_images:
+                for img_index, info in enumerate(image_infos):
+                    images.append({
+                        "index": img_index,
+                        "xref": info["xref"],
+                        "bbox": tuple(info["bbox"]),
+                        "width": info["width"],
+                        "height": info["height"]
+                    })
+
+            needs_ocr = False
+            if sum(len(block["text"]) for block in blocks) < ocr_min_chars:
+                needs_ocr = image_coverage(page, image_infos) >= ocr_min_image_coverage
+
+            pages_data.append({
+                "page_number": page_num + 1,
+                "text_blocks": blocks,
+                "images": images,
+                "page_rect": tuple(page.rect),
+                "needs_ocr": needs_ocr
+            })
+
+    return pages_data
+
+
+def render_page_image(pdf_path: str, page_number: int, dpi: int) -> str:
+    """Rasterize one page (1-based) at ``dpi`` and return it as base64 PNG"""
+    with fitz.open(pdf_path) as doc:
+        pix = doc[page_number - 1].get_pixmap(dpi=dpi, colorspace=fitz.csRGB, alpha=False)
+        return base64.b64encode(pix.tobytes("png")).decode()
+
+
+def render_page_previews(pdf_path: str, page_numbers: List[int], zoom: float, image_format: str = "jpeg",
+                         jpeg_quality: int = 80) -> List[bytes]:
+    """Rasterize pages (1-based) at ``zoom`` into compressed images, opening the document once"""
+    images = []
+    with fitz.open(pdf_path) as doc:
+        matrix = fitz.Matrix(zoom, zoom)
+        for page_number in page_numbers:
+            pix = doc[page_number - 1].get_pixmap(matrix=matrix, colorspace=fitz.csRGB, alpha=False)
+            if image_format == "png":
+                images.append(pix.tobytes("png"))
+            else:
+                images.append(pix.tobytes("jpeg", jpg_quality=jpeg_quality))
+    return images
+
+
+def render_pages(original_pdf_path: str, pages: List[Dict[str, Any]], output_path: str,
+                 subset_fonts: bool = True) -> Tuple[int, int]:
+    """Draw translated blocks onto blank pages sized like the originals.
+
+    Each block is fitted to its bbox by ``write_fitted`` and written with one
+    ``TextWriter`` per page. With ``subset_fonts`` the embedded fonts are cut
+    down to the glyphs used.
+
+    Returns ``(total_blocks, successful_blocks)`` for the pages rendered.
+    """
+    original_doc = fitz.open(original_pdf_path)
+    new_doc = fitz.open()
+    # Per-block logging costs a format call per block; only pay for it when debugging
+    log_blocks = logger.isEnabledFor(logging.DEBUG)
+    total_blocks = 0
+    successful_blocks = 0
+
+    for page_data in pages:
+        original_page = original_doc[page_data["page_number"] - 1]
+        page_rect = original_page.rect
+
+        # Create new blank page with same dimensions
+        new_page = new_doc.new_page(width=page_rect.width, height=page_rect.height)
+        writer = fitz.TextWriter(new_page.rect)
+
+        for block in page_data["text_blocks"]:
+            total_blocks += 1
+            translated_text = block.get("translated_text", "")
+            original_text = block.get("original_text", block.get("text", ""))
+
+            # Use translated text if available, otherwise original
+            text_to_use = translated_text.strip() if translated_text else original_text.strip()
+            if not text_to_use:
+                continue
+
+            bbox = fitz.Rect(block["bbox"])
+            font_info = block.get("font_info") or {}
+            font_size = font_info.get("size", 12)
+
+            # Ensure bbox is valid
+            if bbox.width <= 0 or bbox.height <= 0:
+                bbox = fitz.Rect(bbox.x0, bbox.y0, bbox.x0 + 200, bbox.y0 + font_size * 2)
+
+            try:
+                fitted_size = write_fitted(writer, text_to_use, bbox, font_size)
+                successful_blocks += 1
+                if log_blocks:
+                    logger.debug(f"Wrote block {total_blocks} at {fitted_size:.2f}pt: '{text_to_use[:50]}...'")
+            except Exception as e:
+                logger.error(f"Text insertion failed: {e}")
+
+        writer.write_text(new_page, color=(0, 0, 0))
+
+    if subset_fonts:
+        new_doc.subset_fonts()
+    new_doc.save(output_path, garbage=3, deflate=True)
+    new_doc.close()
+    original_doc.close()
+
+    return total_blocks, successful_blocks
+
+
+def render_pages_overlay(original_pdf_path: str, pages: List[Dict[str, Any]], output_path: str,
+                         subset_fonts: bool = True) -> Tuple[int, int]:
+    """Copy the original pages and replace their text with the translation in place.
+
+    Images, vector graphics and layout are kept: only the text under each
+    block is redacted. Translated text is fitted to each block's bbox and
+    written with one ``TextWriter`` per page and colour, so each font is
+    embedded once per document; with ``subset_fonts`` the embedded fonts are
+    then cut down to the glyphs used.
+
+    Returns ``(total_blocks, successful_blocks)`` for the pages rendered.
+    """
+    original_doc = fitz.open(original_pdf_path)
+    new_doc = fitz.open()
+    log_blocks = logger.isEnabledFor(logging.DEBUG)
+    total_blocks = 0
+    successful_blocks = 0
+
+    for page_data in pages:
+        page_index = page_data["page_number"] - 1
+        new_doc.insert_pdf(original_doc, from_page=page_index, to_page=page_index)
+        new_page = new_doc[-1]
+
+        blocks = page_data["text_blocks"]
+        for block in blocks:
+            # Text recovered by OCR is part of an image, so cover it instead of removing it
+            fill = (1, 1, 1) if block.get("source") == "ocr" else False
+            new_page.add_redact_annot(fitz.Rect(block["bbox"]), fill=fill, cross_out=False)
+        if blocks:
+            new_page.apply_redactions(
+                images=fitz.PDF_REDACT_IMAGE_NONE,
+                graphics=fitz.PDF_REDACT_LINE_ART_NONE,
+                text=fitz.PDF_REDACT_TEXT_REMOVE
+            )
+
+        writers: Dict[int, fitz.TextWriter] = {}
+        for block in blocks:
+            total_blocks += 1
+            translated_text = block.get("translated_text", "")
+            original_text = block.get("original_text", block.get("text", ""))
+            text_to_use = translated_text.strip() if translated_text else original_text.strip()
+            if not text_to_use:
+                continue
+
+            font_info = block.get("font_info") or {}
+            color = font_info.get("color", 0)
+            writer = writers.get(color)
+            if writer is None:
+                writer = writers[color] = fitz.TextWriter(new_page.rect)
+
+            try:
+                fitted_size = write_fitted(writer, text_to_use, fitz.Rect(block["bbox"]), font_info.get("size", 12))
+                successful_blocks += 1
+                if log_blocks:
+                    logger.debug(f"Wrote block {total_blocks} at {fitted_size:.2f}pt: '{text_to_use[:50]}...'")
+            except Exception as e:
+                logger.error(f"Text insertion failed: {e}")
+
+        for color, writer in writers.items():
+            writer.write_text(new_page, color=fitz.sRGB_to_pdf(color))
+
+    if subset_fonts:
+        new_doc.subset_fonts()
+    new_doc.save(output_path, garbage=3, deflate=True)
+    new_doc.close()
+    original_doc.close()
+
+    return total_blocks, successful_blocks
+
+
+def share_fonts(doc: fitz.Document) -> int:
+    """Point every page at one copy of each embedded font; returns how many references were moved.
+
+    Parts are rendered separately, so each embeds its own copy of a font.
+    Copies are matched by name and font file content; the unreferenced ones
+    are dropped when the document is saved with ``garbage``.
+    """
+    first_xref: Dict[Tuple[str, str], int] = {}
+    moved = 0
+    for page in doc:
+        for xref, ext, _, basefont, resource_name, _, referencer in page.get_fonts(full=True):
+            if ext == "n/a" or referencer:
+                continue
+            font_buffer = doc.extract_font(xref)[3]
+            key = (basefont, hashlib.sha256(font_buffer).hexdigest())
+            shared_xref = first_xref.setdefault(key, xref)
+            if shared_xref == xref:
+                continue
+            kind, value = doc.xref_get_key(page.xref, "Resources/Font")
+            if kind == "xref":
+                doc.xref_set_key(int(value.split()[0]), resource_name, f"{shared_xref} 0 R")
+            else:
+                doc.xref_set_key(page.xref, f"Resources/Font/{resource_name}", f"{shared_xref} 0 R")
+            moved += 1
+    return moved
+
+
+def merge_pdfs(part_paths: List[str], output_path: str, subset_fonts: bool = False) -> None:
+    """Concatenate partial PDFs, in order, into one document.
+
+    Fonts embedded by several parts are shared, so each is stored once. With
+    ``subset_fonts`` they are then subset once for the whole document.
+    """
+    merged = fitz.open()
+    for part_path in part_paths:
+        with fitz.open(part_path) as part:
+            merged.insert_pdf(part)
+    share_fonts(merged)
+    if subset_fonts:
+        merged.subset_fonts()
+    merged.save(output_path, garbage=3, deflate=True)
+    merged.close()
@@ -0,0 +1,100 @@
+import os
+import shutil
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_CACHE_DIR = os.getenv("PREVIEW_CACHE_DIR", "preview_cache")
+PREVIEW_CACHE_MAX_BYTES = int(os.getenv("PREVIEW_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# "jpeg" is far smaller for scanned and image-heavy pages; "png" is lossless
+PREVIEW_IMAGE_FORMAT = os.getenv("PREVIEW_IMAGE_FORMAT", "jpeg")
+PREVIEW_JPEG_QUALITY = int(os.getenv("PREVIEW_JPEG_QUALITY", "80"))
+
+MEDIA_TYPES = {"jpeg": "image/jpeg", "png": "image/png"}
+
+
+def source_version(pdf_path: str) -> str:
+    """Version of a PDF on disk; changes whenever the file is rewritten, e.g. by a new translation"""
+    stat = os.stat(pdf_path)
+    return f"{stat.st_mtime_ns:x}{stat.st_size:x}"
+
+
+class PreviewCache:
+    """Rendered page images on disk, keyed by file, variant, page, zoom and source version.
+
+    Images of one file live in their own directory so ``invalidate`` can drop
+    them at once. Entries are evicted least recently used first once their
+    total size exceeds ``max_bytes``; the order is rebuilt from modification
+    times after a restart.
+    """
+
+    def __init__(self, directory: str = PREVIEW_CACHE_DIR, max_bytes: int = PREVIEW_CACHE_MAX_BYTES,
+                 image_format: str = PREVIEW_IMAGE_FORMAT):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.image_format = image_format if image_format in MEDIA_TYPES else "jpeg"
+        self._lock = threading.Lock()
+        self._entries: Optional["OrderedDict[Path, int]"] = None
+        self._size = 0
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES[self.image_format]
+
+    def path_for(self, file_id: str, variant: str, page_number: int, zoom: float, version: str) -> Path:
+        extension = "jpg" if self.image_format == "jpeg" else "png"
+        return self.directory / file_id / f"{variant}-{version}-p{page_number}-z{zoom:.2f}.{extension}"
+
+    def _load_entries(self) -> "OrderedDict[Path, int]":
+        if self._entries is None:
+            self.directory.mkdir(exist_ok=True)
+            found = []
+            for path in self.directory.glob("*/*"):
+                if path.suffix in (".jpg", ".png"):
+                    stat = path.stat()
+                    found.append((stat.st_mtime, path, stat.st_size))
+            self._entries = OrderedDict((path, size) for _, path, size in sorted(found))
+            self._size = sum(self._entries.values())
+        return self._entries
+
+    def get(self, path: Path) -> Optional[Path]:
+        """``path`` if it is cached, marking it as recently used"""
+        with self._lock:
+            entries = self._load_entries()
+            if path not in entries:
+                return None
+            if not path.exists():
+                self._size -= entries.pop(path)
+                return None
+            entries.move_to_end(path)
+            return path
+
+    def put(self, path: Path, data: bytes) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+
+        with self._lock:
+            entries = self._load_entries()
+            self._size -= entries.pop(path, 0)
+            entries[path] = len(data)
+            self._size += len(data)
+            while self._size > self.max_bytes and len(entries) > 1:
+                evicted, size = entries.popitem(last=False)
+                self._size -= size
+                evicted.unlink(missing_ok=True)
+        return path
+
+    def invalidate(self, file_id: str) -> None:
+        """Drop every cached image of ``file_id``"""
+        file_dir = self.directory / file_id
+        with self._lock:
+            entries = self._load_entries()
+            for path in [path for path in entries if path.parent == file_dir]:
+                self._size -= entries.pop(path)
+        shutil.rmtree(file_dir, ignore_errors=True)
@@ -0,0 +1,189 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+
+from services.translation_memory import normalize_text
+
+logger = logging.getLogger(__name__)
+
+INCREMENTAL_TRANSLATION_ENABLED = os.getenv("INCREMENTAL_TRANSLATION_ENABLED", "true").lower() in ("1", "true", "yes")
+REVISION_STORE_DIR = os.getenv("REVISION_STORE_DIR", "revisions")
+# Leading pages compared when looking for an earlier version of an upload
+REVISION_SAMPLE_PAGES = max(1, int(os.getenv("REVISION_SAMPLE_PAGES", "3")))
+# Share of sampled pages that must match for an earlier translation to be used as the base
+REVISION_MIN_OVERLAP = float(os.getenv("REVISION_MIN_OVERLAP", "0.5"))
+REVISION_HISTORY_LIMIT = int(os.getenv("REVISION_HISTORY_LIMIT", "500"))
+
+INDEX_FILE = "index.json"
+
+
+def block_fingerprint(text: str) -> str:
+    """Fingerprint of a block's text, ignoring layout-only whitespace differences"""
+    return hashlib.blake2b(normalize_text(text).encode("utf-8"), digest_size=12).hexdigest()
+
+
+def page_fingerprint(block_fingerprints: List[str]) -> str:
+    """Fingerprint of a page: its blocks' fingerprints in reading order"""
+    return hashlib.blake2b("\x1f".join(block_fingerprints).encode("ascii"), digest_size=12).hexdigest()
+
+
+class RevisionSnapshot:
+    """Translated text of one document, addressable by page and block fingerprint"""
+
+    def __init__(self, file_id: str, source_lang: str, target_lang: str, version: str,
+                 page_fingerprints: Optional[List[str]] = None, pages: Optional[Dict[str, List[str]]] = None,
+                 blocks: Optional[Dict[str, str]] = None):
+        self.file_id = file_id
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.version = version
+        self.page_fingerprints = page_fingerprints or []
+        self.pages = pages or {}
+        self.blocks = blocks or {}
+
+    def add_page(self, page_number: int, block_fingerprints: List[str], translations: List[str],
+                 translated: List[bool]) -> None:
+        """Record a page's translations; blocks flagged as not ``translated`` are left out"""
+        fingerprint = page_fingerprint(block_fingerprints)
+        if len(self.page_fingerprints) < page_number:
+            self.page_fingerprints.extend([""] * (page_number - len(self.page_fingerprints)))
+        self.page_fingerprints[page_number - 1] = fingerprint
+        if all(translated):
+            self.pages[fingerprint] = translations
+        for block_fp, text, ok in zip(block_fingerprints, translations, translated):
+            if ok:
+                self.blocks[block_fp] = text
+
+    def to_json(self) -> bytes:
+        return orjson.dumps({
+            "file_id": self.file_id,
+            "source_lang": self.source_lang,
+            "target_lang": self.target_lang,
+            "version": self.version,
+            "page_fingerprints": self.page_fingerprints,
+            "pages": self.pages,
+            "blocks": self.blocks
+        })
+
+    @classmethod
+    def from_json(cls, payload: bytes) -> "RevisionSnapshot":
+        data = orjson.loads(payload)
+        return cls(data["file_id"], data["source_lang"], data["target_lang"], data["version"],
+                   data["page_fingerprints"], data["pages"], data["blocks"])
+
+
+class RevisionStore:
+    """Translations of earlier uploads, kept so a revised upload only pays for its diff.
+
+    Each finished translation is saved as a snapshot mapping page and block
+    fingerprints to translated text. A small index of every snapshot's
+    leading page fingerprints lets ``find_base`` pick the earlier upload that
+    shares the most of them with a new one. Only the newest
+    ``history_limit`` snapshots are kept.
+    """
+
+    def __init__(self, directory: str = REVISION_STORE_DIR, history_limit: int = REVISION_HISTORY_LIMIT):
+        self.directory = Path(directory)
+        self.directory.mkdir(exist_ok=True)
+        self.history_limit = history_limit
+        self._lock = threading.Lock()
+        self._index: Optional["OrderedDict[str, Dict]"] = None
+
+    @staticmethod
+    def _snapshot_name(file_id: str, source_lang: str, target_lang: str) -> str:
+        return f"{file_id}.{source_lang}-{target_lang}"
+
+    def _snapshot_path(self, name: str) -> Path:
+        """Path of snapshot ``name``, refusing names that would leave the store directory"""
+        path = self.directory / f"{name}.json"
+        if path.resolve().parent != self.directory.resolve():
+            raise ValueError(f"Invalid revision snapshot name: {name!r}")
+        return path
+
+    def _load_index(self) -> "OrderedDict[str, Dict]":
+        if self._index is None:
+            self._index = OrderedDict()
+            path = self.directory / INDEX_FILE
+            if path.exists():
+                try:
+                    self._index.update(orjson.loads(path.read_bytes()))
+                except Exception as e:
+                    logger.warning(f"Discarding unreadable revision index: {e}")
+        return self._index
+
+    def _write_index(self) -> None:
+        path = self.directory / INDEX_FILE
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(orjson.dumps(self._index))
+        tmp_path.replace(path)
+
+    def find_base(self, sample_fingerprints: List[str], source_lang: str, target_lang: str,
+                  version: str, exclude_file_id: Optional[str] = None) -> Optional[str]:
+        """file_id of the earlier translation whose leading pages best match ``sample_fingerprints``.
+
+        ``exclude_file_id`` is skipped, so a document is never matched against its own snapshot.
+        """
+        sample = set(fingerprint for fingerprint in sample_fingerprints if fingerprint)
+        if not sample:
+            return None
+
+        best: Tuple[float, Optional[str]] = (0.0, None)
+        with self._lock:
+            for entry in reversed(self._load_index().values()):
+                if (entry["source_lang"], entry["target_lang"], entry["version"]) != (source_lang, target_lang, version):
+                    continue
+                if entry["file_id"] == exclude_file_id:
+                    continue
+                overlap = len(sample.intersection(entry["sample"])) / len(sample)
+                if overlap > best[0]:
+                    best = (overlap, entry["file_id"])
+
+        if best[0] < REVISION_MIN_OVERLAP:
+            return None
+        return best[1]
+
+    def load(self, file_id: str, source_lang: str, target_lang: str) -> Optional[RevisionSnapshot]:
+        try:
+            path = self._snapshot_path(self._snapshot_name(file_id, source_lang, target_lang))
+        except ValueError as e:
+            logger.warning(str(e))
+            return None
+        if not path.exists():
+            return None
+        try:
+            return RevisionSnapshot.from_json(path.read_bytes())
+        except Exception as e:
+            logger.warning(f"Discarding unreadable revision snapshot {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def save(self, snapshot: RevisionSnapshot) -> None:
+        name = self._snapshot_name(snapshot.file_id, snapshot.source_lang, snapshot.target_lang)
+        path = self._snapshot_path(name)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(snapshot.to_json())
+        tmp_path.replace(path)
+
+        with self._lock:
+            index = self._load_index()
+            index.pop(name, None)
+            index[name] = {
+                "file_id": snapshot.file_id,
+                "source_lang": snapshot.source_lang,
+                "target_lang": snapshot.target_lang,
+                "version": snapshot.version,
+                "sample": snapshot.page_fingerprints[:REVISION_SAMPLE_PAGES]
+            }
+            while len(index) > self.history_limit:
+                evicted, _ = index.popitem(last=False)
+                try:
+                    self._snapshot_path(evicted).unlink(missing_ok=True)
+                except ValueError as e:
+                    logger.warning(str(e))
+            self._write_index()
@@ -0,0 +1,68 @@
+import os
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "8"))
+TOKENS_PER_MINUTE = int(os.getenv("TOKENS_PER_MINUTE", "90000"))
+
+
+class RequestScheduler:
+    """Caps in-flight model requests and tokens sent per minute.
+
+    Concurrency is bounded with a semaphore; throughput is bounded with a
+    token bucket that refills continuously at ``tokens_per_minute / 60``
+    tokens per second. A ``tokens_per_minute`` of 0 disables the token limit.
+    """
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENT_REQUESTS, tokens_per_minute: int = TOKENS_PER_MINUTE):
+        self.max_concurrency = max(1, max_concurrency)
+        self.tokens_per_minute = max(0, tokens_per_minute)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._bucket_lock = asyncio.Lock()
+        self._available = float(self.tokens_per_minute)
+        self._updated = time.monotonic()
+        self.in_flight = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._available = min(
+            float(self.tokens_per_minute),
+            self._available + elapsed * self.tokens_per_minute / 60.0
+        )
+
+    async def _acquire_tokens(self, tokens: int) -> None:
+        """Wait until the bucket holds enough tokens, then take them"""
+        if not self.tokens_per_minute:
+            return
+
+        # A single request larger than the whole budget would wait forever
+        tokens = min(tokens, self.tokens_per_minute)
+
+        async with self._bucket_lock:
+            while True:
+                self._refill()
+                if self._available >= tokens:
+                    self._available -= tokens
+                    return
+                deficit = tokens - self._available
+                wait = deficit * 60.0 / self.tokens_per_minute
+                logger.debug(f"Token budget exhausted, waiting {wait:.2f}s for {tokens} tokens")
+                await asyncio.sleep(wait)
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int) -> AsyncIterator[None]:
+        """Reserve token budget and an in-flight slot for one model request"""
+        await self._acquire_tokens(estimated_tokens)
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
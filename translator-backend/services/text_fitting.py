@@ -0,0 +1,172 @@
+"""Fitting translated text into the bounding box of the block it replaces.
+
+Used by the renderers in ``pdf_workers``, so everything here is cached per
+worker process.
+"""
+import os
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import fitz  # PyMuPDF
+import regex
+
+FIT_MIN_FONT_SIZE = float(os.getenv("FIT_MIN_FONT_SIZE", "4"))
+FIT_MAX_FONT_SIZE = float(os.getenv("FIT_MAX_FONT_SIZE", "72"))
+# Font sizes are searched down to this step, in points
+FIT_PRECISION = 0.25
+# Slack, in points, for measured widths that differ from the extracted bbox by rounding
+FIT_TOLERANCE = 0.5
+LINE_SPACING = 1.2
+
+# Text in these scripts can be drawn with the built-in Helvetica, which also covers Greek and Cyrillic
+HELVETICA_TEXT = regex.compile(r"^[\p{Latin}\p{Greek}\p{Cyrillic}\p{Common}\p{Inherited}]*$")
+DEVANAGARI_TEXT = regex.compile(r"\p{Devanagari}")
+ARABIC_TEXT = regex.compile(r"\p{Arabic}")
+
+_fonts: Dict[str, fitz.Font] = {}
+_width_tables: Dict[str, "WidthTable"] = {}
+
+
+def load_font(name: str) -> fitz.Font:
+    """Built-in font by name, loaded once per process"""
+    font = _fonts.get(name)
+    if font is None:
+        if name == "devanagari":
+            font = fitz.Font(script=fitz.UCDN_SCRIPT_DEVANAGARI)
+        elif name == "arabic":
+            font = fitz.Font(script=fitz.UCDN_SCRIPT_ARABIC)
+        else:
+            font = fitz.Font(name)
+        _fonts[name] = font
+    return font
+
+
+def font_for_text(text: str) -> Tuple[str, bool]:
+    """Name of a font covering ``text`` and whether it is written right to left"""
+    if HELVETICA_TEXT.match(text):
+        return "helv", False
+    if DEVANAGARI_TEXT.search(text):
+        return "devanagari", False
+    if ARABIC_TEXT.search(text):
+        return "arabic", True
+    # Droid Sans Fallback covers CJK and most other scripts
+    return "cjk", False
+
+
+class WidthTable:
+    """Glyph advances of one font at size 1, filled in as characters are first seen"""
+
+    def __init__(self, font: fitz.Font):
+        self.font = font
+        self.ascender = font.ascender
+        self.descender = font.descender
+        self._advances: Dict[str, float] = {}
+
+    def width(self, text: str) -> float:
+        advances = self._advances
+        total = 0.0
+        for char in text:
+            advance = advances.get(char)
+            if advance is None:
+                advance = advances[char] = self.font.glyph_advance(ord(char))
+            total += advance
+        return total
+
+
+def width_table(font_name: str) -> WidthTable:
+    table = _width_tables.get(font_name)
+    if table is None:
+        table = _width_tables[font_name] = WidthTable(load_font(font_name))
+    return table
+
+
+def _tokenize(text: str, table: WidthTable) -> List[Tuple[str, float, List[Tuple[str, float]]]]:
+    """Split each paragraph into words (or characters, for text without spaces) with their widths at size 1"""
+    space = table.width(" ")
+    paragraphs = []
+    for paragraph in text.split("\n"):
+        if " " in paragraph:
+            paragraphs.append((" ", space, [(word, table.width(word)) for word in paragraph.split(" ")]))
+        else:
+            paragraphs.append(("", 0.0, [(char, table.width(char)) for char in paragraph]))
+    return paragraphs
+
+
+def _wrap(paragraphs: List[Tuple[str, float, List[Tuple[str, float]]]], max_width: float) -> Tuple[List[str], float]:
+    """Greedy line breaking, returning the lines and the widest one's width.
+
+    Widths are in size-1 units, so one tokenization serves every font size.
+    """
+    lines = []
+    widest = 0.0
+    for joiner, joiner_width, words in paragraphs:
+        current: List[str] = []
+        width = 0.0
+        for word, word_width in words:
+            extra = word_width + (joiner_width if current else 0.0)
+            if current and width + extra > max_width:
+                lines.append(joiner.join(current))
+                widest = max(widest, width)
+                current = [word]
+                width = word_width
+            else:
+                current.append(word)
+                width += extra
+        lines.append(joiner.join(current))
+        widest = max(widest, width)
+    return lines, widest
+
+
+def _fits(paragraphs: List[Tuple[str, float, List[Tuple[str, float]]]], table: WidthTable,
+          rect_width: float, rect_height: float, fontsize: float) -> Tuple[bool, List[str]]:
+    max_width = rect_width + FIT_TOLERANCE
+    lines, widest = _wrap(paragraphs, max_width / fontsize)
+    height = fontsize * (table.ascender - table.descender) + (len(lines) - 1) * fontsize * LINE_SPACING
+    # A single word wider than the box still overflows, so the width is checked as well
+    return widest * fontsize <= max_width and height <= rect_height + FIT_TOLERANCE, lines
+
+
+@lru_cache(maxsize=4096)
+def fit_text(text: str, font_name: str, rect_width: float, rect_height: float,
+             max_size: float) -> Tuple[float, Tuple[str, ...]]:
+    """Largest font size, at most ``max_size``, at which ``text`` wraps into the box, and its lines.
+
+    Sizes are binary searched between ``FIT_MIN_FONT_SIZE`` and ``max_size``
+    to ``FIT_PRECISION``. Text that does not fit even at the minimum size is
+    returned wrapped at the minimum size. Results are cached, so repeated
+    headers and footers are fitted once.
+    """
+    table = width_table(font_name)
+    paragraphs = _tokenize(text, table)
+    high = max(FIT_MIN_FONT_SIZE, min(max_size, FIT_MAX_FONT_SIZE))
+
+    fits, lines = _fits(paragraphs, table, rect_width, rect_height, high)
+    if fits:
+        return high, tuple(lines)
+
+    low = FIT_MIN_FONT_SIZE
+    best_lines, _ = _wrap(paragraphs, (rect_width + FIT_TOLERANCE) / low)
+    while high - low > FIT_PRECISION:
+        size = (low + high) / 2
+        fits, lines = _fits(paragraphs, table, rect_width, rect_height, size)
+        if fits:
+            low, best_lines = size, lines
+        else:
+            high = size
+    return low, tuple(best_lines)
+
+
+def write_fitted(writer: fitz.TextWriter, text: str, rect: fitz.Rect, max_size: float) -> float:
+    """Append ``text`` to ``writer`` at the largest size that fits ``rect``; returns that size"""
+    font_name, right_to_left = font_for_text(text)
+    fontsize, lines = fit_text(text, font_name, rect.width, rect.height, max_size)
+    table = width_table(font_name)
+    font = table.font
+
+    y = rect.y0 + fontsize * table.ascender
+    for line in lines:
+        if line:
+            x = rect.x1 - table.width(line) * fontsize if right_to_left else rect.x0
+            writer.append((x, y), line, font=font, fontsize=fontsize, right_to_left=right_to_left)
+        y += fontsize * LINE_SPACING
+    return fontsize
@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import itertools
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Type
+
+import httpx
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+
+logger = logging.getLogger(__name__)
+
+TRANSLATION_BACKEND = os.getenv("TRANSLATION_BACKEND", "openai")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Comma-separated list of OpenAI-compatible base URLs, e.g. several Ollama hosts
+OPENAI_BASE_URLS = os.getenv("OPENAI_BASE_URLS", os.getenv("OPENAI_BASE_URL", ""))
+BACKEND_ROUTING = os.getenv("BACKEND_ROUTING", "least_loaded")
+BACKEND_MAX_CONNECTIONS = int(os.getenv("BACKEND_MAX_CONNECTIONS", "64"))
+BACKEND_MAX_RETRIES = int(os.getenv("BACKEND_MAX_RETRIES", "3"))
+BACKEND_TIMEOUT_SECONDS = float(os.getenv("BACKEND_TIMEOUT_SECONDS", "120"))
+# Seconds an endpoint is skipped after it fails
+BACKEND_COOLDOWN_SECONDS = float(os.getenv("BACKEND_COOLDOWN_SECONDS", "10"))
+FAKE_BACKEND_LATENCY_MS = float(os.getenv("FAKE_BACKEND_LATENCY_MS", "200"))
+FAKE_BACKEND_JITTER_MS = float(os.getenv("FAKE_BACKEND_JITTER_MS", "50"))
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+
+def retryable_errors() -> Tuple[Type[Exception], ...]:
+    """OpenAI client errors worth retrying; imported on first use since the client is slow to import"""
+    from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+    return (APIConnectionError, APITimeoutError, RateLimitError, InternalServerError)
+
+
+class TranslationBackend:
+    """Something that answers chat-completion requests with the reply text.
+
+    ``request`` holds the keyword arguments of an OpenAI
+    ``chat.completions.create`` call (model, messages, max_tokens, ...).
+    """
+
+    name = "base"
+
+    async def complete(self, request: Dict[str, Any]) -> str:
+        raise NotImplementedError
+
+    async def warm_up(self) -> None:
+        """Prepare connections ahead of the first request"""
+
+    async def close(self) -> None:
+        """Release connections"""
+
+
+class Endpoint:
+    def __init__(self, base_url: Optional[str], client: "AsyncOpenAI"):
+        self.base_url = base_url or "https://api.openai.com/v1"
+        self.client = client
+        self.in_flight = 0
+        self.failures = 0
+        self.unavailable_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.unavailable_until
+
+
+class OpenAICompatibleBackend(TranslationBackend):
+    """Routes requests across one or more OpenAI-compatible endpoints.
+
+    All endpoints share one pooled ``httpx.AsyncClient``. Each request goes to
+    the next endpoint in turn (``round_robin``) or to the one with the fewest
+    requests in flight (``least_loaded``); endpoints that just failed are
+    skipped for ``BACKEND_COOLDOWN_SECONDS``. Connection errors, timeouts,
+    rate limits and server errors are retried with exponential backoff, and a
+    retry is routed afresh so it can fail over to another endpoint.
+    """
+
+    name = "openai"
+
+    def __init__(self, base_urls: List[Optional[str]], api_key: Optional[str] = OPENAI_API_KEY,
+                 routing: str = BACKEND_ROUTING, max_connections: int = BACKEND_MAX_CONNECTIONS,
+                 max_retries: int = BACKEND_MAX_RETRIES, timeout: float = BACKEND_TIMEOUT_SECONDS):
+        from openai import AsyncOpenAI
+
+        self.routing = routing
+        self.max_retries = max_retries
+        self.retryable_errors = retryable_errors()
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(timeout, connect=10.0)
+        )
+        self.endpoints = [
+            Endpoint(base_url, AsyncOpenAI(
+                api_key=api_key or "not-needed",
+                base_url=base_url or None,
+                http_client=self.http_client,
+                max_retries=0
+            ))
+            for base_url in (base_urls or [None])
+        ]
+        self._cycle = itertools.cycle(self.endpoints)
+
+    def _pick(self) -> Endpoint:
+        candidates = [endpoint for endpoint in self.endpoints if endpoint.available] or self.endpoints
+        if self.routing == "round_robin":
+            for _ in range(len(self.endpoints)):
+                endpoint = next(self._cycle)
+                if endpoint in candidates:
+                    return endpoint
+        return min(candidates, key=lambda endpoint: endpoint.in_flight)
+
+    async def _complete_once(self, request: Dict[str, Any]) -> str:
+        endpoint = self._pick()
+        endpoint.in_flight += 1
+        try:
+            response = await endpoint.client.chat.completions.create(**request)
+        except self.retryable_errors as e:
+            endpoint.failures += 1
+            endpoint.unavailable_until = time.monotonic() + BACKEND_COOLDOWN_SECONDS
+            logger.warning(f"Endpoint {endpoint.base_url} failed: {e}")
+            raise
+        finally:
+            endpoint.in_flight -= 1
+
+        endpoint.failures = 0
+        content = response.choices[0].message.content
+        if isinstance(content, list):
+            content = content[0].text
+        return str(content) if content else ""
+
+    async def complete(self, request: Dict[str, Any]) -> str:
+        async for attempt in AsyncRetrying(
+            retry=retry_if_exception_type(self.retryable_errors),
+            stop=stop_after_attempt(self.max_retries + 1),
+            wait=wait_exponential_jitter(initial=0.5, max=20),
+            reraise=True
+        ):
+            with attempt:
+                return await self._complete_once(request)
+        return ""
+
+    async def warm_up(self) -> None:
+        # Open a pooled connection to each endpoint; any HTTP answer will do
+        for endpoint in self.endpoints:
+            try:
+                await endpoint.client.models.list()
+            except Exception as e:
+                logger.warning(f"Warm-up of {endpoint.base_url} failed: {e}")
+
+    async def close(self) -> None:
+        await self.http_client.aclose()
+
+
+class FakeBackend(TranslationBackend):
+    """In-process stand-in that answers without a network, for tests and benchmarks.
+
+    Replies are deterministic: segment requests come back with every text
+    prefixed by ``prefix``, requests with an image get one OCR block back,
+    anything else is answered with ``"en"``. Latency
+    is ``latency_ms`` plus a jitter derived from a hash of the request, so a
+    given request always takes the same time.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency_ms: float = FAKE_BACKEND_LATENCY_MS, jitter_ms: float = FAKE_BACKEND_JITTER_MS,
+                 prefix: str = "[translated] "):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.prefix = prefix
+        self.calls = 0
+
+    async def complete(self, request: Dict[str, Any]) -> str:
+        self.calls += 1
+        prompt = request["messages"][-1]["content"]
+        if isinstance(prompt, list):
+            await asyncio.sleep(self.latency_ms / 1000.0)
+            return json.dumps({"blocks": [{"text": "Scanned page text", "bbox": [0.1, 0.1, 0.9, 0.2]}]})
+
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        jitter = (digest[0] / 255.0) * self.jitter_ms
+        await asyncio.sleep((self.latency_ms + jitter) / 1000.0)
+
+        _, marker, payload = prompt.partition("Input:\n")
+        if not marker:
+            return "en"
+        segments = json.loads(payload)["segments"]
+        return json.dumps({
+            "segments": [
+                {"id": segment["id"], "text": self.prefix + segment["text"]}
+                for segment in segments
+            ]
+        }, ensure_ascii=False)
+
+
+def create_backend() -> TranslationBackend:
+    """Build the backend selected by ``TRANSLATION_BACKEND``"""
+    if TRANSLATION_BACKEND == "fake":
+        logger.info("Using fake in-process translation backend")
+        return FakeBackend()
+
+    base_urls: List[Optional[str]] = [url.strip() for url in OPENAI_BASE_URLS.split(",") if url.strip()]
+    return OpenAICompatibleBackend(base_urls or [None])
@@ -0,0 +1,146 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+import unicodedata
+from typing import Dict, List, Optional
+
+from sqlalchemy import Float, Integer, String, Text, create_engine, delete, func, select, update
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+logger = logging.getLogger(__name__)
+
+TRANSLATION_MEMORY_ENABLED = os.getenv("TRANSLATION_MEMORY_ENABLED", "true").lower() in ("1", "true", "yes")
+TRANSLATION_MEMORY_PATH = os.getenv("TRANSLATION_MEMORY_PATH", "translation_memory.db")
+TRANSLATION_MEMORY_MAX_ENTRIES = int(os.getenv("TRANSLATION_MEMORY_MAX_ENTRIES", "200000"))
+TRANSLATION_MEMORY_MAX_BYTES = int(os.getenv("TRANSLATION_MEMORY_MAX_BYTES", str(256 * 1024 * 1024)))
+
+LEVELS = ("page", "block", "line")
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class MemoryEntry(Base):
+    __tablename__ = "translation_memory"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    source_lang: Mapped[str] = mapped_column(String(16))
+    target_lang: Mapped[str] = mapped_column(String(16))
+    translated_text: Mapped[str] = mapped_column(Text)
+    size_bytes: Mapped[int] = mapped_column(Integer)
+    hits: Mapped[int] = mapped_column(Integer, default=0)
+    last_used: Mapped[float] = mapped_column(Float, index=True)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so that layout-only differences share a cache entry"""
+    text = unicodedata.normalize("NFC", text)
+    return "\n".join(" ".join(line.split()) for line in text.strip().split("\n"))
+
+
+class TranslationMemory:
+    """Persistent, content-addressed cache of model translations.
+
+    Entries are keyed on the normalized source text together with the language
+    pair, model and prompt version, so a change to any of those never serves a
+    stale translation. Least recently used entries are evicted once the store
+    exceeds its entry or byte budget.
+    """
+
+    def __init__(self, path: str = TRANSLATION_MEMORY_PATH, max_entries: int = TRANSLATION_MEMORY_MAX_ENTRIES,
+                 max_bytes: int = TRANSLATION_MEMORY_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(self.engine)
+        self._lock = threading.Lock()
+        self._hits = {level: 0 for level in LEVELS}
+        self._misses = {level: 0 for level in LEVELS}
+
+    @staticmethod
+    def make_key(text: str, source_lang: str, target_lang: str, model: Optional[str], prompt_version: str) -> str:
+        payload = "\x1f".join([prompt_version, model or "", source_lang, target_lang, normalize_text(text)])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str], level: str) -> Dict[str, str]:
+        """Look up several keys at once, recording hits and misses for ``level``"""
+        if not keys:
+            return {}
+
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock, Session(self.engine) as session:
+            rows = session.execute(
+                select(MemoryEntry.key, MemoryEntry.translated_text).where(MemoryEntry.key.in_(unique_keys))
+            ).all()
+            found = {row.key: row.translated_text for row in rows}
+            if found:
+                session.execute(
+                    update(MemoryEntry)
+                    .where(MemoryEntry.key.in_(list(found)))
+                    .values(hits=MemoryEntry.hits + 1, last_used=time.time())
+                )
+                session.commit()
+
+            hit_count = sum(1 for key in keys if key in found)
+            self._hits[level] += hit_count
+            self._misses[level] += len(keys) - hit_count
+        return found
+
+    def put_many(self, entries: Dict[str, str], source_lang: str, target_lang: str) -> None:
+        """Store translations and evict the least recently used entries if over budget"""
+        if not entries:
+            return
+
+        now = time.time()
+        with self._lock, Session(self.engine) as session:
+            for key, translated in entries.items():
+                session.merge(MemoryEntry(
+                    key=key,
+                    source_lang=source_lang,
+                    target_lang=target_lang,
+                    translated_text=translated,
+                    size_bytes=len(translated.encode("utf-8")),
+                    hits=0,
+                    last_used=now
+                ))
+            session.commit()
+            self._evict(session)
+
+    def _evict(self, session: Session) -> None:
+        count, total_bytes = session.execute(
+            select(func.count(MemoryEntry.key), func.coalesce(func.sum(MemoryEntry.size_bytes), 0))
+        ).one()
+
+        excess = max(0, count - self.max_entries)
+        if total_bytes > self.max_bytes and count:
+            # Drop enough of the oldest entries to get back under budget, assuming average size
+            average = total_bytes / count
+            excess = max(excess, int((total_bytes - self.max_bytes) / average) + 1)
+        if not excess:
+            return
+
+        oldest = select(MemoryEntry.key).order_by(MemoryEntry.last_used).limit(excess)
+        session.execute(delete(MemoryEntry).where(MemoryEntry.key.in_(oldest)))
+        session.commit()
+        logger.info(f"Translation memory evicted {excess} entries")
+
+    def stats(self) -> Dict[str, object]:
+        """Entry counts, size and hit rates per lookup level"""
+        with self._lock, Session(self.engine) as session:
+            count, total_bytes = session.execute(
+                select(func.count(MemoryEntry.key), func.coalesce(func.sum(MemoryEntry.size_bytes), 0))
+            ).one()
+
+            levels = {}
+            for level in LEVELS:
+                lookups = self._hits[level] + self._misses[level]
+                levels[level] = {
+                    "hits": self._hits[level],
+                    "misses": self._misses[level],
+                    "hit_rate": round(self._hits[level] / lookups, 4) if lookups else 0.0
+                }
+
+        return {"entries": count, "size_bytes": total_bytes, "levels": levels}
@@ -0,0 +1,120 @@
+import asyncio
+
+from services.batching import SEGMENT_OVERHEAD_TOKENS, RequestBatcher, TokenCounter, plan_batches, split_oversized
+
+
+class WordCounter(TokenCounter):
+    """One token per whitespace-separated word, so budgets are easy to reason about"""
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+
+def test_plan_batches_packs_in_order_within_budget():
+    items = [("a", 10), ("b", 10), ("c", 10), ("d", 10)]
+    budget = 2 * (10 + SEGMENT_OVERHEAD_TOKENS)
+    assert plan_batches(items, budget) == [[0, 1], [2, 3]]
+
+
+def test_plan_batches_gives_an_oversized_item_its_own_batch():
+    items = [("a", 5), ("big", 500), ("b", 5)]
+    assert plan_batches(items, 100) == [[0], [1], [2]]
+
+
+def test_plan_batches_empty():
+    assert plan_batches([], 100) == []
+
+
+def test_split_oversized_keeps_lines_that_fit():
+    assert split_oversized("one two three", 5, WordCounter()) == ["one two three"]
+
+
+def test_split_oversized_prefers_sentence_boundaries():
+    text = "One two three. Four five six. Seven eight nine."
+    parts = split_oversized(text, 6, WordCounter())
+    assert parts == ["One two three. Four five six.", "Seven eight nine."]
+
+
+def test_split_oversized_falls_back_to_words():
+    counter = WordCounter()
+    text = " ".join(f"w{i}" for i in range(10))
+    parts = split_oversized(text, 3, counter)
+    assert " ".join(parts) == text
+    assert all(counter.count(part) <= 3 for part in parts)
+
+
+def test_split_oversized_cuts_text_without_boundaries_by_characters():
+    class CharCounter(TokenCounter):
+        def count(self, text: str) -> int:
+            return len(text)
+
+    parts = split_oversized("x" * 25, 10, CharCounter())
+    assert "".join(parts) == "x" * 25
+    assert all(len(part) <= 10 for part in parts)
+
+
+def make_batcher(budget=1000, fail=False):
+    calls = []
+
+    async def translate_fn(lines, source_lang, target_lang, input_tokens):
+        calls.append(list(lines))
+        if fail:
+            raise RuntimeError("backend down")
+        return [f"T({line})" for line in lines]
+
+    return RequestBatcher(translate_fn, WordCounter(), budget=budget, linger_ms=5), calls
+
+
+def test_concurrent_pages_share_one_request():
+    batcher, calls = make_batcher()
+
+    async def run():
+        return await asyncio.gather(
+            batcher.translate(["hello world"], "en", "fr"),
+            batcher.translate(["good morning", "hello world"], "en", "fr"),
+        )
+
+    first, second = asyncio.run(run())
+    assert first == ["T(hello world)"]
+    assert second == ["T(good morning)", "T(hello world)"]
+    # Both pages went out together and the repeated line was sent once
+    assert calls == [["hello world", "good morning"]]
+    assert batcher.requests_sent == 1
+
+
+def test_language_pairs_are_not_mixed():
+    batcher, calls = make_batcher()
+
+    async def run():
+        return await asyncio.gather(
+            batcher.translate(["hello"], "en", "fr"),
+            batcher.translate(["hello"], "en", "de"),
+        )
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_dense_page_is_split_across_requests():
+    budget = 2 * (5 + SEGMENT_OVERHEAD_TOKENS)
+    batcher, calls = make_batcher(budget=budget)
+
+    lines = [f"one two three four {i}" for i in range(5)]
+    result = asyncio.run(batcher.translate(lines, "en", "fr"))
+    assert result == [f"T({line})" for line in lines]
+    assert len(calls) == 3
+    assert all(len(call) <= 2 for call in calls)
+
+
+def test_oversized_line_is_split_and_rejoined():
+    batcher, calls = make_batcher(budget=4)
+    text = "One two three. Four five six."
+
+    result = asyncio.run(batcher.translate([text], "en", "fr"))
+    assert result == ["T(One two three.) T(Four five six.)"]
+    assert sorted(line for call in calls for line in call) == ["Four five six.", "One two three."]
+
+
+def test_failed_request_returns_the_source_lines():
+    batcher, _ = make_batcher(fail=True)
+    assert asyncio.run(batcher.translate(["hello", "world"], "en", "fr")) == ["hello", "world"]
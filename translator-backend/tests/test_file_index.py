@@ -0,0 +1,107 @@
+import time
+
+import pytest
+
+from services.file_index import FileIndex
+
+DAY = 24 * 3600
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    upload_dir = tmp_path / "uploads"
+    translated_dir = tmp_path / "translated"
+    upload_dir.mkdir()
+    translated_dir.mkdir()
+    return upload_dir, translated_dir
+
+
+@pytest.fixture
+def index(tmp_path):
+    return FileIndex(str(tmp_path / "index.db"), retention_hours=24)
+
+
+def add_file(index, dirs, file_id, age_days=0.0, content_hash=None, detected_language="en", outputs=()):
+    """Index an upload, and its translated outputs, last used ``age_days`` ago"""
+    upload_dir, translated_dir = dirs
+    upload_name = f"{file_id}_report.pdf"
+    (upload_dir / upload_name).write_bytes(b"%PDF")
+    index.add(file_id, "report.pdf", upload_name, content_hash=content_hash,
+              detected_language=detected_language, created_at=time.time() - age_days * DAY)
+    for lang in outputs:
+        output_name = f"{file_id}_translated_{lang}.pdf"
+        (translated_dir / output_name).write_bytes(b"%PDF")
+        index.add_artifact(file_id, lang, output_name)
+        index.update(file_id, last_used=time.time() - age_days * DAY)
+
+
+def test_find_by_hash_returns_the_newest_processed_file(index, dirs):
+    add_file(index, dirs, "old", age_days=2, content_hash="abc", outputs=["fr"])
+    add_file(index, dirs, "new", age_days=1, content_hash="abc")
+    add_file(index, dirs, "pending", content_hash="abc", detected_language=None)
+
+    found = index.find_by_hash("abc")
+    assert found["file_id"] == "new"
+    assert index.find_by_hash("missing") is None
+
+
+def test_find_by_hash_includes_artifacts(index, dirs):
+    add_file(index, dirs, "doc", content_hash="abc", outputs=["fr", "de"])
+    assert index.find_by_hash("abc")["artifacts"] == {"doc_translated_fr.pdf": "fr", "doc_translated_de.pdf": "de"}
+
+
+def test_sweep_deletes_expired_files_and_outputs(index, dirs):
+    upload_dir, translated_dir = dirs
+    add_file(index, dirs, "stale", age_days=3, outputs=["fr"])
+    add_file(index, dirs, "fresh", outputs=["fr"])
+    deleted = []
+
+    assert index.sweep(upload_dir, translated_dir, on_delete=deleted.append) == 1
+    assert deleted == ["stale"]
+    assert index.get("stale") is None
+    assert index.get("fresh") is not None
+    assert sorted(path.name for path in upload_dir.iterdir()) == ["fresh_report.pdf"]
+    assert sorted(path.name for path in translated_dir.iterdir()) == ["fresh_translated_fr.pdf"]
+
+
+def test_sweep_skips_kept_files(index, dirs):
+    add_file(index, dirs, "busy", age_days=3)
+    add_file(index, dirs, "stale", age_days=3)
+
+    assert index.sweep(*dirs, keep={"busy"}) == 1
+    assert index.get("busy") is not None
+    assert index.get("stale") is None
+
+
+def test_touch_postpones_expiry(index, dirs):
+    add_file(index, dirs, "doc", age_days=3)
+    index.touch("doc")
+    assert index.sweep(*dirs) == 0
+
+
+def test_zero_retention_keeps_everything(tmp_path, dirs):
+    index = FileIndex(str(tmp_path / "forever.db"), retention_hours=0)
+    add_file(index, dirs, "ancient", age_days=365)
+    assert index.sweep(*dirs) == 0
+    assert index.get("ancient") is not None
+
+
+def test_delete_removes_the_row_and_artifacts_only(index, dirs):
+    upload_dir, translated_dir = dirs
+    add_file(index, dirs, "doc", outputs=["fr"])
+
+    index.delete("doc")
+    assert index.get("doc") is None
+    assert index.count() == 0
+    # Files on disk are left to the caller
+    assert (upload_dir / "doc_report.pdf").exists()
+    assert (translated_dir / "doc_translated_fr.pdf").exists()
+
+
+def test_list_pages_newest_first(index, dirs):
+    for age, file_id in enumerate(["c", "b", "a"]):
+        add_file(index, dirs, file_id, age_days=age)
+
+    page, total = index.list(offset=1, limit=1)
+    assert total == 3
+    assert [entry["file_id"] for entry in page] == ["b"]
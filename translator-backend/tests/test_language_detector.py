@@ -0,0 +1,48 @@
+import pytest
+
+from services.language_detector import LanguageDetector
+from services.pdf_processor import LANG_DETECT_MIN_CONFIDENCE
+
+PROSE = [
+    ("en", "The house is big and has a garden with many trees. My mother goes there every Sunday to read a book."),
+    ("en", "Last night we went to dinner at a restaurant near the station and ate a very good pizza."),
+    ("es", "La casa es grande y tiene un jardín con muchos árboles. Mi madre va cada domingo a leer un libro."),
+    ("es", "Anoche fuimos a cenar a un restaurante cerca de la estación y comimos una pizza buenísima."),
+    ("fr", "La maison est grande et a un jardin avec beaucoup d'arbres. Ma mère y va chaque dimanche pour lire un livre."),
+    ("fr", "Hier soir nous sommes allés dîner dans un restaurant près de la gare et nous avons mangé une très bonne pizza."),
+    ("de", "Das Haus ist groß und hat einen Garten mit vielen Bäumen. Meine Mutter geht jeden Sonntag dorthin, um ein Buch zu lesen."),
+    ("pt", "A casa é grande e tem um jardim com muitas árvores. Minha mãe vai todo domingo ler um livro."),
+    ("pt", "Ontem à noite fomos jantar num restaurante perto da estação e comemos uma pizza muito boa."),
+    ("it", "La casa è grande e ha un giardino con molti alberi. Mia madre ci va ogni domenica a leggere un libro."),
+    ("it", "Ieri sera siamo andati a cena in un ristorante vicino alla stazione e abbiamo mangiato una pizza buonissima."),
+    ("it", "Ogni anno la scuola organizza una festa per gli studenti e le loro famiglie, con musica, giochi e cibo."),
+    ("nl", "Het huis is groot en heeft een tuin met veel bomen. Mijn moeder gaat er elke zondag heen om een boek te lezen."),
+]
+
+SCRIPTS = [
+    ("ru", "Привет, мир! Это короткий пример текста."),
+    ("hi", "नमस्ते दुनिया, यह एक छोटा उदाहरण है।"),
+    ("el", "Γεια σου κόσμε, αυτό είναι ένα παράδειγμα."),
+]
+
+
+@pytest.fixture(scope="module")
+def detector():
+    return LanguageDetector()
+
+
+@pytest.mark.parametrize("lang, text", PROSE)
+def test_prose_is_confident_enough_to_skip_the_model(detector, lang, text):
+    detected, confidence = detector.detect(text)
+    assert detected == lang
+    assert confidence >= LANG_DETECT_MIN_CONFIDENCE
+
+
+@pytest.mark.parametrize("lang, text", SCRIPTS)
+def test_non_latin_scripts(detector, lang, text):
+    assert detector.detect(text)[0] == lang
+
+
+@pytest.mark.parametrize("text", ["", "12 / 2024", "Annual Report"])
+def test_short_or_empty_text_defers_to_the_model(detector, text):
+    assert detector.detect(text)[1] < LANG_DETECT_MIN_CONFIDENCE
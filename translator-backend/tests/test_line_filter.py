@@ -0,0 +1,55 @@
+import pytest
+
+from services.line_filter import passthrough_reason
+
+PASSTHROUGH_LINES = [
+    ("", "en", "fr", "blank"),
+    ("   ", "en", "fr", "blank"),
+    ("12", "en", "fr", "no_letters"),
+    ("- 7 -", "en", "fr", "no_letters"),
+    ("3.14%", "en", "fr", "no_letters"),
+    ("12/05/2024", "en", "fr", "no_letters"),
+    ("$1,250.00", "en", "fr", "no_letters"),
+    ("https://example.com/docs?page=2", "en", "fr", "url"),
+    ("www.example.org", "en", "fr", "url"),
+    ("jane.doe@example.com", "en", "fr", "email"),
+    ("mailto:support@example.co.uk", "en", "fr", "email"),
+    ("report_2024.pdf", "en", "fr", "file_name"),
+    ("src/main.py", "en", "fr", "file_name"),
+    ("INV-2024-0012", "en", "fr", "code"),
+    ("v2.3.1", "en", "fr", "code"),
+    ("Q3", "en", "fr", "code"),
+    ("ISO-9001", "en", "fr", "code"),
+    ("x86_64", "en", "fr", "code"),
+    ("#A12", "en", "fr", "code"),
+    ("नमस्ते दुनिया", "en", "hi", "target_script"),
+    ("Привет, мир", "en", "ru", "target_script"),
+    ("東京 2024", "en", "ja", "target_script"),
+]
+
+TRANSLATED_LINES = [
+    ("1.Introduction", "en", "fr"),
+    ("2.Results", "en", "fr"),
+    ("3.Materials-and-Methods", "en", "fr"),
+    ("Section-2.Overview", "en", "fr"),
+    ("Appendix:A1-Tables", "en", "fr"),
+    ("Introduction", "en", "fr"),
+    ("Hello world", "en", "fr"),
+    ("Table 3", "en", "fr"),
+    ("Q3 revenue grew by 12%", "en", "fr"),
+    ("See https://example.com for details", "en", "fr"),
+    ("Bonjour le monde", "fr", "en"),
+    ("Hello नमस्ते", "en", "hi"),
+    ("नमस्ते दुनिया", "hi", "en"),
+    ("東京", "zh", "ja"),
+]
+
+
+@pytest.mark.parametrize("line, source_lang, target_lang, reason", PASSTHROUGH_LINES)
+def test_passthrough_lines(line, source_lang, target_lang, reason):
+    assert passthrough_reason(line, source_lang, target_lang) == reason
+
+
+@pytest.mark.parametrize("line, source_lang, target_lang", TRANSLATED_LINES)
+def test_translated_lines(line, source_lang, target_lang):
+    assert passthrough_reason(line, source_lang, target_lang) is None
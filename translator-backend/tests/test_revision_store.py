@@ -0,0 +1,108 @@
+import pytest
+
+from services.revision_store import RevisionSnapshot, RevisionStore, block_fingerprint, page_fingerprint
+
+
+def make_snapshot(file_id, pages, source_lang="en", target_lang="fr", version="v1"):
+    """Snapshot whose pages hold the given blocks, each translated to its upper-case text"""
+    snapshot = RevisionSnapshot(file_id, source_lang, target_lang, version)
+    for page_number, blocks in enumerate(pages, start=1):
+        fingerprints = [block_fingerprint(text) for text in blocks]
+        snapshot.add_page(page_number, fingerprints, [text.upper() for text in blocks], [True] * len(blocks))
+    return snapshot
+
+
+def fingerprints_of(pages):
+    return [page_fingerprint([block_fingerprint(text) for text in blocks]) for blocks in pages]
+
+
+PAGES = [["Intro", "Scope"], ["Terms"], ["Pricing", "Contact"]]
+
+
+def test_block_fingerprint_ignores_layout_whitespace():
+    assert block_fingerprint("Hello   world\n") == block_fingerprint("Hello world")
+    assert block_fingerprint("Hello world") != block_fingerprint("Hello there")
+
+
+def test_add_page_records_pages_and_blocks():
+    snapshot = make_snapshot("doc", PAGES)
+    assert snapshot.page_fingerprints == fingerprints_of(PAGES)
+    assert snapshot.pages[snapshot.page_fingerprints[0]] == ["INTRO", "SCOPE"]
+    assert snapshot.blocks[block_fingerprint("Terms")] == "TERMS"
+
+
+def test_add_page_leaves_out_untranslated_blocks_and_their_page():
+    snapshot = RevisionSnapshot("doc", "en", "fr", "v1")
+    fingerprints = [block_fingerprint("Hello"), block_fingerprint("World")]
+    snapshot.add_page(2, fingerprints, ["BONJOUR", "World"], [True, False])
+
+    assert snapshot.page_fingerprints == ["", page_fingerprint(fingerprints)]
+    assert snapshot.pages == {}
+    assert snapshot.blocks == {fingerprints[0]: "BONJOUR"}
+
+
+def test_snapshot_round_trips_through_the_store(tmp_path):
+    store = RevisionStore(str(tmp_path))
+    snapshot = make_snapshot("doc", PAGES)
+    store.save(snapshot)
+
+    loaded = RevisionStore(str(tmp_path)).load("doc", "en", "fr")
+    assert loaded.to_json() == snapshot.to_json()
+    assert store.load("doc", "en", "de") is None
+
+
+def test_find_base_picks_the_best_overlap(tmp_path):
+    store = RevisionStore(str(tmp_path))
+    store.save(make_snapshot("old", [["Intro", "Scope"], ["Other"], ["Pricing", "Contact"]]))
+    store.save(make_snapshot("closest", PAGES))
+
+    revised = [["Intro", "Scope"], ["Terms"], ["Pricing", "Contact v2"]]
+    assert store.find_base(fingerprints_of(revised), "en", "fr", "v1") == "closest"
+
+
+def test_find_base_requires_matching_languages_version_and_overlap(tmp_path):
+    store = RevisionStore(str(tmp_path))
+    store.save(make_snapshot("doc", PAGES))
+    sample = fingerprints_of(PAGES)
+
+    assert store.find_base(sample, "en", "de", "v1") is None
+    assert store.find_base(sample, "en", "fr", "v2") is None
+    assert store.find_base(fingerprints_of([["Unrelated"], ["Pages"], ["Pricing", "Contact"]]), "en", "fr", "v1") is None
+    assert store.find_base([], "en", "fr", "v1") is None
+
+
+def test_find_base_skips_the_excluded_document(tmp_path):
+    store = RevisionStore(str(tmp_path))
+    store.save(make_snapshot("earlier", PAGES))
+    store.save(make_snapshot("self", PAGES))
+    sample = fingerprints_of(PAGES)
+
+    assert store.find_base(sample, "en", "fr", "v1") == "self"
+    assert store.find_base(sample, "en", "fr", "v1", exclude_file_id="self") == "earlier"
+    assert store.find_base(sample, "en", "fr", "v1", exclude_file_id="earlier") == "self"
+
+
+def test_history_limit_evicts_the_oldest_snapshot(tmp_path):
+    store = RevisionStore(str(tmp_path), history_limit=2)
+    for file_id in ("a", "b", "c"):
+        store.save(make_snapshot(file_id, PAGES))
+
+    assert store.load("a", "en", "fr") is None
+    assert not (tmp_path / "a.en-fr.json").exists()
+    assert store.find_base(fingerprints_of(PAGES), "en", "fr", "v1", exclude_file_id="c") == "b"
+
+
+@pytest.mark.parametrize("file_id", ["../escape", "nested/doc", "/etc/passwd"])
+def test_snapshot_names_cannot_leave_the_store(tmp_path, file_id):
+    store = RevisionStore(str(tmp_path / "revisions"))
+    assert store.load(file_id, "en", "fr") is None
+    with pytest.raises(ValueError):
+        store.save(make_snapshot(file_id, PAGES))
+    assert not (tmp_path / "escape.en-fr.json").exists()
+
+
+def test_unreadable_snapshot_is_discarded(tmp_path):
+    store = RevisionStore(str(tmp_path))
+    (tmp_path / "doc.en-fr.json").write_bytes(b"{not json")
+    assert store.load("doc", "en", "fr") is None
+    assert not (tmp_path / "doc.en-fr.json").exists()
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from services import pdf_processor
+from services.pdf_processor import PDFProcessor
+from services.translation_backend import FakeBackend
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return PDFProcessor(backend=FakeBackend(latency_ms=0, jitter_ms=0))
+
+
+def scripted_model(processor, replies, calls):
+    """Answer each segment request with the next reply builder from ``replies``"""
+    async def translate_segments(segments, source_lang, target_lang, max_tokens):
+        calls.append(dict(segments))
+        return replies[len(calls) - 1](segments)
+    processor._translate_segments = translate_segments
+
+
+def upper(segments):
+    return {segment_id: text.upper() for segment_id, text in segments.items()}
+
+
+def test_validate_segments_drops_unknown_empty_and_non_text_replies():
+    sent = {"0": "a", "1": "b", "2": "c", "3": "d"}
+    received = {"0": "A", "1": "   ", "2": 7, "9": "stray", "3": "line one\nline two"}
+    assert PDFProcessor._validate_segments(sent, received) == {"0": "A", "3": "line one line two"}
+
+
+@pytest.mark.parametrize("content, expected", [
+    ('{"segments": [{"id": 0, "text": "Bonjour"}]}', {"0": "Bonjour"}),
+    ('```json\n{"segments": [{"id": "1", "text": "Monde"}]}\n```', {"1": "Monde"}),
+    ('Sure! {"segments": [{"id": "1"}, {"id": "2", "text": "x"}]} Hope this helps', {"2": "x"}),
+    ("not json at all", {}),
+    ('{"segments": [', {}),
+    ('["segments"]', {}),
+])
+def test_parse_segments(content, expected):
+    assert PDFProcessor._parse_segments(content) == expected
+
+
+def test_only_missing_segments_are_retried(processor):
+    calls = []
+    scripted_model(processor, [
+        lambda segments: {"0": "HELLO", "2": "AGAIN"},
+        upper,
+    ], calls)
+
+    result = asyncio.run(processor._translate_batch(["hello", "world", "again"], "en", "fr", 3))
+    assert result == ["HELLO", "WORLD", "AGAIN"]
+    assert calls[1] == {"1": "world"}
+
+
+def test_mismatched_ids_are_retried(processor):
+    calls = []
+    scripted_model(processor, [
+        lambda segments: {"5": "HELLO", "6": "WORLD"},
+        upper,
+    ], calls)
+
+    assert asyncio.run(processor._translate_batch(["hello", "world"], "en", "fr", 2)) == ["HELLO", "WORLD"]
+    assert calls[1] == {"0": "hello", "1": "world"}
+
+
+def test_segments_keep_their_text_after_the_last_retry(processor, monkeypatch):
+    monkeypatch.setattr(pdf_processor, "TRANSLATION_MAX_RETRIES", 2)
+    calls = []
+    scripted_model(processor, [lambda segments: {"0": "HELLO"}] + [lambda segments: {}] * 2, calls)
+
+    assert asyncio.run(processor._translate_batch(["hello", "world"], "en", "fr", 2)) == ["HELLO", "world"]
+    assert len(calls) == 3
+
+
+def test_blank_lines_are_not_sent(processor):
+    calls = []
+    scripted_model(processor, [upper], calls)
+
+    assert asyncio.run(processor._translate_batch(["hello", "  ", ""], "en", "fr", 1)) == ["HELLO", "  ", ""]
+    assert calls == [{"0": "hello"}]
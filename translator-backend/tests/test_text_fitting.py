@@ -0,0 +1,68 @@
+import pytest
+
+from services.text_fitting import (
+    FIT_MIN_FONT_SIZE, FIT_PRECISION, _fits, _tokenize, fit_text, font_for_text, width_table
+)
+
+SENTENCE = "The quarterly results exceeded expectations across every region and product line."
+
+
+def fits_at(text, font_name, width, height, size):
+    table = width_table(font_name)
+    return _fits(_tokenize(text, table), table, width, height, size)[0]
+
+
+def test_short_text_keeps_the_requested_size():
+    size, lines = fit_text("Hello", "helv", 200, 40, 12)
+    assert size == 12
+    assert lines == ("Hello",)
+
+
+@pytest.mark.parametrize("width, height, max_size", [
+    (150, 60, 24),
+    (300, 20, 18),
+    (80, 200, 40),
+])
+def test_search_finds_the_largest_fitting_size(width, height, max_size):
+    size, lines = fit_text(SENTENCE, "helv", width, height, max_size)
+    assert FIT_MIN_FONT_SIZE <= size < max_size
+    assert fits_at(SENTENCE, "helv", width, height, size)
+    assert not fits_at(SENTENCE, "helv", width, height, size + FIT_PRECISION)
+    assert " ".join(lines) == SENTENCE
+
+
+def test_wrapped_lines_stay_within_the_box():
+    size, lines = fit_text(SENTENCE, "helv", 120, 80, 30)
+    table = width_table("helv")
+    assert len(lines) > 1
+    assert all(table.width(line) * size <= 120.5 for line in lines)
+
+
+def test_text_too_long_for_the_box_falls_back_to_the_minimum_size():
+    size, lines = fit_text(SENTENCE * 5, "helv", 40, 10, 12)
+    assert size == FIT_MIN_FONT_SIZE
+    assert " ".join(lines) == SENTENCE * 5
+
+
+def test_paragraph_breaks_are_kept():
+    _, lines = fit_text("Title\nBody text", "helv", 400, 100, 12)
+    assert lines == ("Title", "Body text")
+
+
+def test_text_without_spaces_wraps_by_character():
+    text = "東京都の人口は増え続けています"
+    size, lines = fit_text(text, "cjk", 60, 100, 20)
+    assert "".join(lines) == text
+    assert len(lines) > 1
+    assert fits_at(text, "cjk", 60, 100, size)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Bonjour le monde", ("helv", False)),
+    ("Привет мир", ("helv", False)),
+    ("नमस्ते दुनिया", ("devanagari", False)),
+    ("مرحبا بالعالم", ("arabic", True)),
+    ("こんにちは", ("cjk", False)),
+])
+def test_font_for_text(text, expected):
+    assert font_for_text(text) == expected
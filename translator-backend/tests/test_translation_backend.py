@@ -0,0 +1,114 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import APIConnectionError
+from tenacity import wait_none
+
+from services import translation_backend
+from services.translation_backend import FakeBackend, OpenAICompatibleBackend, create_backend
+
+
+class FakeEndpointClient:
+    """Stands in for ``AsyncOpenAI``; fails the first ``failures`` requests with a connection error"""
+
+    def __init__(self, name, failures=0, delay=0.0):
+        self.name = name
+        self.failures = failures
+        self.delay = delay
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **request):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise APIConnectionError(request=httpx.Request("POST", f"http://{self.name}/v1/chat/completions"))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.name))])
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(translation_backend, "wait_exponential_jitter", lambda **kwargs: wait_none())
+
+
+def make_backend(clients, routing="round_robin", max_retries=3):
+    backend = OpenAICompatibleBackend([f"http://{client.name}/v1" for client in clients], api_key="test",
+                                      routing=routing, max_retries=max_retries)
+    for endpoint, client in zip(backend.endpoints, clients):
+        endpoint.client = client
+    return backend
+
+
+def complete_many(backend, count):
+    async def run():
+        try:
+            return [await backend.complete({"messages": []}) for _ in range(count)]
+        finally:
+            await backend.close()
+    return asyncio.run(run())
+
+
+def test_round_robin_alternates_endpoints():
+    clients = [FakeEndpointClient("a"), FakeEndpointClient("b")]
+    assert complete_many(make_backend(clients), 4) == ["a", "b", "a", "b"]
+
+
+def test_least_loaded_avoids_busy_endpoint():
+    clients = [FakeEndpointClient("slow", delay=0.05), FakeEndpointClient("fast")]
+    backend = make_backend(clients, routing="least_loaded")
+
+    async def run():
+        try:
+            slow = asyncio.ensure_future(backend.complete({"messages": []}))
+            await asyncio.sleep(0.01)
+            return await backend.complete({"messages": []}), await slow
+        finally:
+            await backend.close()
+
+    assert asyncio.run(run()) == ("fast", "slow")
+
+
+def test_failed_endpoint_fails_over_and_cools_down():
+    clients = [FakeEndpointClient("down", failures=100), FakeEndpointClient("up")]
+    backend = make_backend(clients)
+
+    assert complete_many(backend, 3) == ["up", "up", "up"]
+    # The failing endpoint was tried once, then skipped while cooling down
+    assert clients[0].calls == 1
+    assert backend.endpoints[0].failures == 1
+    assert not backend.endpoints[0].available
+
+
+def test_error_is_raised_when_every_retry_fails():
+    clients = [FakeEndpointClient("down", failures=100)]
+    backend = make_backend(clients, max_retries=2)
+
+    with pytest.raises(APIConnectionError):
+        complete_many(backend, 1)
+    assert clients[0].calls == 3
+
+
+def test_create_backend_selects_fake(monkeypatch):
+    monkeypatch.setattr(translation_backend, "TRANSLATION_BACKEND", "fake")
+    assert isinstance(create_backend(), FakeBackend)
+
+
+def test_create_backend_splits_base_urls(monkeypatch):
+    monkeypatch.setattr(translation_backend, "TRANSLATION_BACKEND", "openai")
+    monkeypatch.setattr(translation_backend, "OPENAI_BASE_URLS", "http://a:11434/v1, ,http://b:11434/v1")
+    backend = create_backend()
+    try:
+        assert [endpoint.base_url for endpoint in backend.endpoints] == ["http://a:11434/v1", "http://b:11434/v1"]
+    finally:
+        asyncio.run(backend.close())
+
+
+def test_fake_backend_prefixes_segments():
+    backend = FakeBackend(latency_ms=0, jitter_ms=0, prefix="> ")
+    prompt = "Translate.\nInput:\n" + json.dumps({"segments": [{"id": "0", "text": "Hello"}]})
+    reply = asyncio.run(backend.complete({"messages": [{"role": "user", "content": prompt}]}))
+    assert json.loads(reply) == {"segments": [{"id": "0", "text": "> Hello"}]}
+    assert backend.calls == 1
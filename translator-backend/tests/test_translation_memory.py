@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from services.pdf_processor import PDFProcessor
+from services.translation_backend import FakeBackend
+from services.translation_memory import TranslationMemory
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    processor = PDFProcessor(backend=FakeBackend(latency_ms=0, jitter_ms=0))
+    processor.memory = TranslationMemory(str(tmp_path / "memory.db"))
+    return processor
+
+
+def fake_model(processor, translations, calls):
+    """Answer batcher requests from ``translations``, leaving unknown lines unchanged as a failed request does"""
+    async def translate(lines, source_lang, target_lang):
+        calls.append(list(lines))
+        return [translations.get(line, line) for line in lines]
+    processor.batcher.translate = translate
+
+
+def translate_page(processor, blocks):
+    page_blocks = [{"text": text} for text in blocks]
+    page_lines = [line for text in blocks for line in text.split("\n")]
+    return asyncio.run(processor._translate_lines_with_memory(page_blocks, page_lines, "en", "fr"))
+
+
+def test_full_page_is_answered_from_memory(processor):
+    calls = []
+    fake_model(processor, {"Hello": "Bonjour", "World": "Monde"}, calls)
+    assert translate_page(processor, ["Hello\nWorld"]) == ["Bonjour", "Monde"]
+    assert translate_page(processor, ["Hello\nWorld"]) == ["Bonjour", "Monde"]
+    assert calls == [["Hello", "World"]]
+
+
+def test_failed_line_is_retried_instead_of_cached_with_its_block(processor):
+    calls = []
+    fake_model(processor, {"Hello": "Bonjour"}, calls)
+    assert translate_page(processor, ["Hello\nWorld", "Page 3 of 9"]) == ["Bonjour", "World", "Page 3 of 9"]
+
+    fake_model(processor, {"Hello": "Bonjour", "World": "Monde", "Page 3 of 9": "Page 3 sur 9"}, calls)
+    assert translate_page(processor, ["Hello\nWorld", "Page 3 of 9"]) == ["Bonjour", "Monde", "Page 3 sur 9"]
+    # "Hello" came from the line memory; only the lines that failed went back to the model
+    assert calls[1] == ["World", "Page 3 of 9"]
+
+
+def test_passthrough_lines_do_not_block_caching(processor):
+    calls = []
+    fake_model(processor, {"Revenue": "Chiffre d'affaires"}, calls)
+    assert translate_page(processor, ["Revenue\n12.5%"]) == ["Chiffre d'affaires", "12.5%"]
+    assert translate_page(processor, ["Revenue\n12.5%"]) == ["Chiffre d'affaires", "12.5%"]
+    assert calls == [["Revenue"]]
@@ -1,8 +1,8 @@
 
 import { Injectable } from '@angular/core';
-import { HttpClient, HttpHeaders } from '@angular/common/http';
+import { HttpClient, HttpHeaders, HttpParams } from '@angular/common/http';
 import { Observable, BehaviorSubject } from 'rxjs';
-import { catchError, tap } from 'rxjs/operators';
+import { catchError, filter, map, switchMap, take, tap } from 'rxjs/operators';
 import { environment } from '../../environments/environment';
 
 export interface UploadResponse {
@@ -19,11 +19,26 @@ export interface TranslationResponse {
   message: string;
 }
 
+export interface TranslationJob {
+  job_id: string;
+  file_id: string;
+  status: 'queued' | 'running' | 'completed' | 'failed' | 'cancelled';
+  stage: string;
+  pages_total: number;
+  pages_done: number;
+  progress: number;
+  result: TranslationResponse | null;
+  error: string | null;
+  source_lang: string;
+  target_lang: string;
+}
+
 export interface PreviewResponse {
   success: boolean;
   pages: Array<{
     page_number: number;
-    image_data: string;
+    url: string;
+    image_data?: string;
   }>;
   total_pages: number;
 }
@@ -64,18 +79,60 @@ export class PdfTranslationService {
   }
 
   translatePdf(fileId: string, sourceLanguage: string, targetLanguage: string): Observable<TranslationResponse> {
+    return this.submitTranslationJob(fileId, sourceLanguage, targetLanguage).pipe(
+      switchMap(job => this.watchJob(job.job_id)),
+      tap(job => this.updateJobProgress(job)),
+      filter(job => job.status === 'completed' || job.status === 'failed' || job.status === 'cancelled'),
+      take(1),
+      map(job => {
+        if (job.status !== 'completed' || !job.result) {
+          throw new Error(job.error || `Translation ${job.status}`);
+        }
+        return job.result;
+      }),
+      catchError(this.handleError)
+    );
+  }
+
+  submitTranslationJob(fileId: string, sourceLanguage: string, targetLanguage: string): Observable<TranslationJob> {
     const formData = new FormData();
     formData.append('file_id', fileId);
     formData.append('source_lang', sourceLanguage);
     formData.append('target_lang', targetLanguage);
 
-    this.updateProgress('translate', 50, 'Translating content...');
+    this.updateProgress('translate', 35, 'Queued for translation...');
 
-    return this.http.post<TranslationResponse>(`${this.baseUrl}/translate`, formData)
-      .pipe(
-        tap(() => this.updateProgress('complete', 80, 'Generating translated PDF...')),
-        catchError(this.handleError)
-      );
+    return this.http.post<TranslationJob>(`${this.baseUrl}/jobs`, formData)
+      .pipe(catchError(this.handleError));
+  }
+
+  getJob(jobId: string): Observable<TranslationJob> {
+    return this.http.get<TranslationJob>(`${this.baseUrl}/jobs/${jobId}`)
+      .pipe(catchError(this.handleError));
+  }
+
+  watchJob(jobId: string): Observable<TranslationJob> {
+    return new Observable<TranslationJob>(subscriber => {
+      const source = new EventSource(`${this.baseUrl}/jobs/${jobId}/events`);
+      source.addEventListener('progress', event => {
+        const job: TranslationJob = JSON.parse((event as MessageEvent).data);
+        subscriber.next(job);
+        if (job.status === 'completed' || job.status === 'failed' || job.status === 'cancelled') {
+          source.close();
+          subscriber.complete();
+        }
+      });
+      source.onerror = error => {
+        source.close();
+        subscriber.error(error);
+      };
+      return () => source.close();
+    });
+  }
+
+  cancelJob(jobId: string): Observable<any> {
+    return this.http.delete(`${this.baseUrl}/jobs/${jobId}`)
+      .pipe(catchError(this.handleError));
   }
 
   getPreview(fileId: string, fileType: 'original' | 'translated'): Observable<Blob> {
@@ -86,6 +143,19 @@ export class PdfTranslationService {
     );
   }
 
+  getPagePreviews(fileId: string, fileType: 'original' | 'translated', start = 1, end?: number,
+                  zoom = 1): Observable<PreviewResponse> {
+    let params = new HttpParams()
+      .set('variant', fileType)
+      .set('start', start)
+      .set('zoom', zoom);
+    if (end !== undefined) {
+      params = params.set('end', end);
+    }
+    return this.http.get<PreviewResponse>(`${this.baseUrl}/preview/${fileId}/pages`, { params })
+      .pipe(catchError(this.handleError));
+  }
+
   downloadTranslatedPdf(fileId: string): Observable<Blob> {
     return this.http.get(`${this.baseUrl}/download/${fileId}`, {
       responseType: 'blob'
@@ -104,6 +174,25 @@ export class PdfTranslationService {
     this.translationProgressSubject.next({ stage, progress, message });
   }
 
+  private updateJobProgress(job: TranslationJob) {
+    // Map job progress onto the 35-95% band between upload and download
+    switch (job.stage) {
+      case 'queued':
+        this.updateProgress('translate', 35, 'Queued for translation...');
+        break;
+      case 'extracting':
+        this.updateProgress('translate', 40, 'Extracting text...');
+        break;
+      case 'translating':
+        this.updateProgress('translate', 40 + Math.round(job.progress * 45),
+          `Translating page ${job.pages_done} of ${job.pages_total}...`);
+        break;
+      case 'completed':
+        this.updateProgress('complete', 95, 'Translation finished');
+        break;
+    }
+  }
+
   private handleError(error: any): Observable<never> {
     console.error('PDF Translation Service Error:', error);
     throw error;